@@ -22,6 +22,12 @@ forecasts alongside observations.
 
 .. automodule:: forest.presets
 
+.. automodule:: forest.cache
+
+.. automodule:: forest.pyramid
+
+.. automodule:: forest.prefetch
+
 """
 __version__ = '0.17.1'
 
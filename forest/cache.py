@@ -0,0 +1,176 @@
+"""
+Image cache
+-----------
+
+Rendered image data is shared by every Bokeh session and layer in
+the server process. Entries are keyed by dataset, variable,
+times, level and any parameters that change the rendered result,
+and the cache is bounded by the total number of bytes held in
+numpy arrays rather than by number of entries. The least recently
+used entries are evicted first. Requests for an entry that is
+still being computed wait for that result instead of computing it
+again, e.g. when playback and prefetch ask for the same frame.
+
+The default budget of 512 MB can be changed by setting an
+environment variable before the server starts
+
+.. code-block:: sh
+
+    export FOREST_IMAGE_CACHE_BYTES=1000000000
+
+.. autoclass:: ImageCache
+    :members:
+
+.. autofunction:: image_cache
+
+.. autofunction:: nbytes
+
+"""
+import collections
+import concurrent.futures
+import os
+import threading
+import numpy as np
+
+
+__all__ = [
+    "ImageCache",
+    "image_cache",
+    "nbytes",
+]
+
+
+MAX_BYTES = 512 * 10**6
+
+
+def nbytes(data):
+    """Approximate size of bokeh image data in bytes
+
+    >>> import numpy as np
+    >>> nbytes({"image": [np.zeros((2, 2))], "name": ["label"]})
+    32
+    """
+    total = 0
+    for values in data.values():
+        if isinstance(values, np.ndarray):
+            total += values.nbytes
+            continue
+        for value in values:
+            if isinstance(value, np.ndarray):
+                total += value.nbytes
+    return total
+
+
+class ImageCache:
+    """Least recently used cache bounded by total size in bytes
+
+    :param max_bytes: entries are evicted once this size is exceeded
+    :param size: function returning size of a value in bytes
+    """
+    def __init__(self, max_bytes=MAX_BYTES, size=nbytes):
+        self.max_bytes = max_bytes
+        self.size = size
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.waits = 0
+        self._entries = collections.OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, func):
+        """Cached value of func(), computed on first request
+
+        Values are shared between callers so should not be modified.
+        Concurrent requests for the same key call func once, errors
+        are passed to every caller but not cached
+
+        :param key: hashable tuple, e.g. (dataset, variable, times, level)
+        :param func: function called without arguments on a miss
+        """
+        with self._lock:
+            try:
+                value, _ = self._entries[key]
+            except KeyError:
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    future = concurrent.futures.Future()
+                    self._pending[key] = future
+                else:
+                    self.waits += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        if pending is not None:
+            return pending.result()
+        try:
+            value = func()
+        except BaseException as error:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(error)
+            raise
+        self.put(key, value)
+        with self._lock:
+            del self._pending[key]
+        future.set_result(value)
+        return value
+
+    def put(self, key, value):
+        """Store value and evict least recently used entries"""
+        size = self.size(value)
+        with self._lock:
+            if key in self._entries:
+                _, previous = self._entries.pop(key)
+                self.bytes -= previous
+            if size > self.max_bytes:
+                # Larger than the whole cache, do not keep
+                return
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries, counters are kept"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Counters suitable for logging or monitoring"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+_IMAGE_CACHE = None
+_IMAGE_CACHE_LOCK = threading.Lock()
+
+
+def image_cache():
+    """Process-wide :class:`ImageCache` shared by all drivers"""
+    global _IMAGE_CACHE
+    with _IMAGE_CACHE_LOCK:
+        if _IMAGE_CACHE is None:
+            max_bytes = int(os.environ.get(
+                "FOREST_IMAGE_CACHE_BYTES", MAX_BYTES))
+            _IMAGE_CACHE = ImageCache(max_bytes=max_bytes)
+        return _IMAGE_CACHE
@@ -2,15 +2,27 @@
 Command line interface to FOREST application
 """
 import os
+import sys
 import argparse
 import bokeh.command.bootstrap
+from forest import pyramid
 from forest.parse_args import add_arguments
 
 
 APP_PATH = os.path.join(os.path.dirname(__file__), "..")
 
 
+# Sub-commands, e.g. forest pyramid --output DIR FILE
+COMMANDS = {
+    "pyramid": pyramid.main,
+}
+
+
 def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if (len(argv) > 0) and (argv[0] in COMMANDS):
+        return COMMANDS[argv[0]](argv[1:])
     bokeh.command.bootstrap.main(bokeh_command(APP_PATH, argv=argv))
 
 
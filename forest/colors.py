@@ -505,8 +505,9 @@ class SourceLimits(Observable):
                 continue
             images.append(source.data["image"][0])
         if len(images) > 0:
-            low = np.min([np.min(x) for x in images])
-            high = np.max([np.max(x) for x in images])
+            # Missing data may be masked or NaN
+            low = np.nanmin([np.nanmin(x) for x in images])
+            high = np.nanmax([np.nanmax(x) for x in images])
             return low, high
         else:
             return 0, 1
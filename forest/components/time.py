@@ -1,6 +1,10 @@
 """Time navigation component"""
+import collections
+import time
 from forest import rx
 from forest.observe import Observable
+from forest.old_state import _to_old
+from forest.prefetch import layer_states, thread_pool
 from forest.util import to_datetime as _to_datetime
 import forest.db.control
 import bokeh.plotting
@@ -45,9 +49,15 @@ class _Axis:
 
 
 class TimeUI(Observable):
-    """Allow navigation through time"""
-    def __init__(self):
+    """Allow navigation through time
+
+    :param playback: optional :class:`Playback` driven by the play and
+                     pause buttons, by default frames are stepped in
+                     the browser
+    """
+    def __init__(self, playback=None):
         self._axis = _Axis()
+        self.playback = playback
         self.source = bokeh.models.ColumnDataSource(dict(
             x=[],
             y=[],
@@ -195,14 +205,20 @@ class TimeUI(Observable):
             };
             setTimeout(nextFrame, interval);
         """)
-        self.buttons["play"].js_on_click(custom_js)
+        if self.playback is None:
+            self.buttons["play"].js_on_click(custom_js)
+        else:
+            self.buttons["play"].on_click(self.playback.play)
 
         # Pause behaviour
         custom_js = bokeh.models.CustomJS(args=dict(source=self.source), code="""
             console.log('Pause');
             window.playing = false;
         """)
-        self.buttons["pause"].js_on_click(custom_js)
+        if self.playback is None:
+            self.buttons["pause"].js_on_click(custom_js)
+        else:
+            self.buttons["pause"].on_click(self.playback.pause)
 
         # Previous behaviour
         custom_js = bokeh.models.CustomJS(args=dict(source=self.source), code="""
@@ -229,14 +245,18 @@ class TimeUI(Observable):
         """)
         self.buttons["next"].js_on_click(custom_js)
 
+        controls = [
+            self.buttons["previous"],
+            self.buttons["play"],
+            self.buttons["pause"],
+            self.buttons["next"]]
+        if self.playback is not None:
+            controls += self.playback.layout.children
         self.layout = bokeh.layouts.column(
             bokeh.layouts.row(
                 self.figure, sizing_mode="stretch_width"),
             bokeh.layouts.row(
-                self.buttons["previous"],
-                self.buttons["play"],
-                self.buttons["pause"],
-                self.buttons["next"],
+                *controls,
                 sizing_mode="stretch_width"
             ),
             sizing_mode="stretch_width")
@@ -302,3 +322,208 @@ class TimeUI(Observable):
             upper=upper,
             lower=lower
         )
+
+
+class FrameBuffer:
+    """Ring buffer of frames loading or loaded ahead of the playhead
+
+    :param size: number of frames held, the oldest is discarded
+    """
+    def __init__(self, size):
+        self.size = size
+        self._frames = collections.OrderedDict()
+
+    def put(self, index, future):
+        if index in self._frames:
+            self._frames.pop(index).cancel()
+        self._frames[index] = future
+        while len(self._frames) > self.size:
+            _, old = self._frames.popitem(last=False)
+            old.cancel()
+
+    def ready(self, index):
+        """True if frame has finished loading"""
+        future = self._frames.get(index)
+        return (future is not None) and future.done() and (
+            not future.cancelled())
+
+    def keep(self, indices):
+        """Discard frames not in indices"""
+        for index in list(self._frames):
+            if index not in indices:
+                self._frames.pop(index).cancel()
+
+    def clear(self):
+        self.keep(set())
+
+    def __contains__(self, index):
+        return index in self._frames
+
+    def __len__(self):
+        return len(self._frames)
+
+
+class Playback(Observable):
+    """Play through valid times at a fixed frame rate
+
+    Frames ahead of the playhead are loaded into the shared
+    image cache by background threads. Each tick advances to the
+    furthest frame due that has finished loading, frames that are
+    not ready in time are dropped rather than shown late
+
+    :param loaders: dict mapping dataset label to loader with a
+                    ``prefetch(state)`` method
+    :param fps: frames per second
+    :param size: number of frames buffered ahead of the playhead
+    :param executor: thread pool, defaults to the pool shared with
+                     :class:`forest.prefetch.Prefetcher`
+    :param clock: function returning seconds, used for testing
+    """
+    def __init__(self, loaders, fps=4, size=8, executor=None,
+                 clock=time.monotonic):
+        self.loaders = loaders
+        self.fps = fps
+        self.buffer = FrameBuffer(size)
+        if executor is None:
+            executor = thread_pool()
+        self.executor = executor
+        self.clock = clock
+        self.state = {}
+        self.times = []
+        self.index = None
+        self.playing = False
+        self.dropped = 0
+        self.shown = collections.deque(maxlen=2 * size)
+        self._start = None
+        self._steps = 0
+        self._callback = None
+        self._document = None
+        self.slider = bokeh.models.Slider(
+            start=1, end=20, step=1, value=fps,
+            title="Frames per second", width=150)
+        self.slider.on_change("value", self.on_fps)
+        self.div = bokeh.models.Div(text="", width=150)
+        self.layout = bokeh.layouts.row(self.slider, self.div)
+        super().__init__()
+
+    def connect(self, store):
+        self.add_subscriber(store.dispatch)
+        store.add_subscriber(self.on_state)
+        return self
+
+    def on_state(self, state):
+        """Track valid times and playhead from application state"""
+        self.state = state
+        times = sorted(state.get("valid_times", []))
+        changed = [str(t) for t in times] != [str(t) for t in self.times]
+        if changed:
+            self.buffer.clear()
+            self.times = times
+        if changed or (not self.playing):
+            self.index = self._find(state.get("valid_time"))
+        if self.playing and (self.index is None):
+            self.index = 0
+
+    def _find(self, time):
+        keys = [str(_to_datetime(t)) for t in self.times]
+        try:
+            return keys.index(str(_to_datetime(time)))
+        except Exception:
+            return None
+
+    def play(self, event=None):
+        """Start playback from current valid time"""
+        if self.playing or (len(self.times) == 0):
+            return
+        if self.index is None:
+            self.index = 0
+        self.playing = True
+        self.dropped = 0
+        self.shown.clear()
+        self._restart()
+        self.fill()
+        self._schedule()
+
+    def pause(self, event=None):
+        """Stop playback at current frame"""
+        self.playing = False
+        if self._callback is not None:
+            try:
+                self._document.remove_periodic_callback(self._callback)
+            except ValueError:
+                pass
+            self._callback = None
+
+    def stop(self):
+        """Pause and cancel frames that have not started loading"""
+        self.pause()
+        self.buffer.clear()
+
+    def on_fps(self, attr, old, new):
+        self.fps = new
+        if self.playing:
+            self.pause()
+            self.play()
+
+    def _restart(self):
+        self._start = self.clock()
+        self._steps = 0
+
+    def _schedule(self):
+        self._document = bokeh.plotting.curdoc()
+        self._callback = self._document.add_periodic_callback(
+            self.tick, int(1000 / self.fps))
+
+    def upcoming(self):
+        """Indices of frames after the playhead, nearest first"""
+        n = len(self.times)
+        size = min(self.buffer.size, n - 1)
+        return [(self.index + i) % n for i in range(1, size + 1)]
+
+    def fill(self):
+        """Load frames ahead of the playhead that are not buffered"""
+        upcoming = self.upcoming()
+        self.buffer.keep(set(upcoming))
+        for index in upcoming:
+            if index not in self.buffer:
+                state = dict(self.state, valid_time=self.times[index])
+                self.buffer.put(index, self.executor.submit(
+                    self._load, state))
+
+    def _load(self, state):
+        for label, layer_state in layer_states(state, self.loaders):
+            self.loaders[label].prefetch(_to_old(layer_state))
+
+    def tick(self):
+        """Advance playhead to the furthest ready frame that is due"""
+        if (not self.playing) or (len(self.times) == 0):
+            return
+        due = int((self.clock() - self._start) * self.fps) - self._steps
+        if due <= 0:
+            return
+        upcoming = self.upcoming()
+        step = None
+        for i in range(min(due, len(upcoming)), 0, -1):
+            if self.buffer.ready(upcoming[i - 1]):
+                step = i
+                break
+        if step is None:
+            return
+        self.dropped += step - 1
+        self._steps += due
+        self.index = upcoming[step - 1]
+        self.shown.append(self.clock())
+        self.notify(forest.db.control.set_value(
+            "valid_time", self.times[self.index]))
+        self.fill()
+        self.div.text = "{:.1f} fps, {} dropped".format(
+            self.achieved_fps(), self.dropped)
+
+    def achieved_fps(self):
+        """Frames shown per second over recent frames"""
+        if len(self.shown) < 2:
+            return 0.
+        elapsed = self.shown[-1] - self.shown[0]
+        if elapsed <= 0:
+            return 0.
+        return (len(self.shown) - 1) / elapsed
@@ -232,6 +232,14 @@ class FileGroup(object):
     :param locator: keyword describing search method (default: 'file_system')
     :param file_type: keyword describing file contents (default: 'unified_model')
     :param directory: leaf/absolute directory where file(s) are stored (default: None)
+    :param region: dict with lon_range and lat_range, loaders that support
+                   it only read data inside the region (default: None)
+    :param pyramid: directory of pre-computed image pyramids made by
+                    ``forest pyramid`` (default: None)
+    :param replica: answer database navigation queries from an in-memory
+                    copy (default: None)
+    :param metadata_cache: JSON file used to persist file system
+                           navigation meta-data (default: None)
     """
     def __init__(self,
             label,
@@ -239,13 +247,21 @@ class FileGroup(object):
             locator="file_system",
             file_type="unified_model",
             directory=None,
-            database_path=None):
+            database_path=None,
+            region=None,
+            pyramid=None,
+            replica=None,
+            metadata_cache=None):
         self.label = label
         self.pattern = pattern
         self.locator = locator
         self.file_type = file_type
         self.directory = directory
         self.database_path = database_path
+        self.region = region
+        self.pyramid = pyramid
+        self.replica = replica
+        self.metadata_cache = metadata_cache
 
     @property
     def full_pattern(self):
@@ -256,7 +272,8 @@ class FileGroup(object):
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             raise Exception("Can not compare")
-        attrs = ("label", "pattern", "locator", "file_type", "directory")
+        attrs = ("label", "pattern", "locator", "file_type", "directory",
+                 "region", "pyramid", "replica", "metadata_cache")
         return all(
                 getattr(self, attr) == getattr(other, attr)
                 for attr in attrs)
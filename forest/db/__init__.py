@@ -1,9 +1,11 @@
 import functools
 import os
 
+from .connection import *
 from .control import *
 from .database import *
 from .locate import *
+from .replica import *
 from .util import *
 
 
@@ -12,3 +14,11 @@ def get_database(database_path):
     if database_path != ':memory:' and not os.path.exists(database_path):
         raise ValueError(f'Database file {database_path!r} must exist')
     return Database.connect(database_path)
+
+
+@functools.lru_cache(maxsize=None)
+def get_replica(database_path):
+    """In-memory copy of database shared by all sessions"""
+    if not os.path.exists(database_path):
+        raise ValueError(f'Database file {database_path!r} must exist')
+    return Replica(database_path)
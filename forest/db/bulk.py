@@ -0,0 +1,262 @@
+"""
+Bulk indexing
+-------------
+
+Fast alternative to :meth:`Database.insert_netcdf` suitable for
+indexing large numbers of files. Only NetCDF headers and
+coordinate variables are read, files are spread across a pool
+of worker processes and each file is written to the database
+in a single transaction.
+
+.. autofunction:: read_header
+
+.. autofunction:: read_headers
+
+"""
+import os
+import hashlib
+import concurrent.futures
+from collections import namedtuple
+import numpy as np
+import netCDF4
+from forest import disk
+
+
+__all__ = [
+    "Grid",
+    "Header",
+    "VariableHeader",
+    "read_header",
+    "read_headers",
+]
+
+
+# Attributes that link data variables to auxiliary variables
+LINK_ATTRS = [
+    "coordinates",
+    "bounds",
+    "grid_mapping",
+    "cell_measures",
+    "ancillary_variables",
+    "formula_terms",
+]
+
+# Coordinates stored per file rather than per variable
+IGNORE = [
+    "forecast_reference_time",
+    "forecast_period",
+]
+
+
+Header = namedtuple("Header", (
+    "path",
+    "size",
+    "mtime",
+    "reference_time",
+    "variables"))
+
+
+VariableHeader = namedtuple("VariableHeader", (
+    "name",
+    "time_axis",
+    "pressure_axis",
+    "times",
+    "pressures",
+    "units",
+    "chunks",
+    "compression",
+    "grid"))
+# Storage details are optional, namedtuple(defaults=) needs Python 3.7
+VariableHeader.__new__.__defaults__ = (None, None, None, None)
+
+
+Grid = namedtuple("Grid", (
+    "hash",
+    "shape",
+    "lon_min",
+    "lon_max",
+    "lat_min",
+    "lat_max",
+    "regular"))
+
+
+def read_header(path):
+    """Coordinate and meta-data information taken from NetCDF header
+
+    .. note:: Data variables are never read, only coordinates
+
+    :returns: :class:`Header` suitable for :meth:`Database.insert_header`
+    """
+    stat = os.stat(path)
+    with netCDF4.Dataset(path) as dataset:
+        variables = [
+            _variable_header(dataset, name)
+            for name in _diagnostics(dataset)]
+        return Header(
+            path=path,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            reference_time=_reference_time(dataset),
+            variables=variables)
+
+
+def read_headers(paths, processes=None):
+    """Read headers in parallel using a pool of processes
+
+    Files that can not be read are reported and skipped
+
+    :param processes: number of worker processes, default os.cpu_count()
+    :returns: generator of :class:`Header` in the same order as paths
+    """
+    paths = list(paths)
+    if len(paths) == 0:
+        return
+    if processes == 1:
+        for header in map(_try_read_header, paths):
+            if header is not None:
+                yield header
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=processes) as executor:
+        chunksize = max(1, len(paths) // (4 * (processes or os.cpu_count())))
+        for header in executor.map(_try_read_header, paths,
+                                   chunksize=chunksize):
+            if header is not None:
+                yield header
+
+
+def _try_read_header(path):
+    try:
+        return read_header(path)
+    except Exception as e:
+        # Any decode error, e.g. RuntimeError from netCDF4, skips the file
+        print("skipping: '{}' {}".format(path, e))
+
+
+def _reference_time(dataset):
+    try:
+        obj = dataset.variables["forecast_reference_time"]
+    except KeyError:
+        return None
+    return str(netCDF4.num2date(
+        obj[:], units=obj.units, calendar=getattr(obj, "calendar", "standard")))
+
+
+def _diagnostics(dataset):
+    """Names of variables that are not coordinates or auxiliary data"""
+    linked = set(dataset.dimensions)
+    for var in dataset.variables.values():
+        for attr in LINK_ATTRS:
+            text = getattr(var, attr, "")
+            if isinstance(text, str):
+                linked |= set(word.rstrip(":") for word in text.split())
+    return [name for name in dataset.variables
+            if (name not in linked) and (name not in IGNORE)]
+
+
+def _variable_header(dataset, name):
+    var = dataset.variables[name]
+    dims = var.dimensions
+    coords = getattr(var, "coordinates", "")
+    time_axis, times = _coordinate(dataset, "time", dims, coords)
+    if times is not None:
+        obj = dataset.variables[disk.coord_var("time", dims, coords)]
+        times = [str(t) for t in netCDF4.num2date(
+            times, units=obj.units,
+            calendar=getattr(obj, "calendar", "standard"))]
+    pressure_axis, pressures = _coordinate(dataset, "pressure", dims, coords)
+    if pressures is not None:
+        pressures = [float(p) for p in pressures]
+    return VariableHeader(
+        name=name,
+        time_axis=time_axis,
+        pressure_axis=pressure_axis,
+        times=times,
+        pressures=pressures,
+        units=getattr(var, "units", None),
+        chunks=_chunks(var),
+        compression=_compression(var),
+        grid=_grid(dataset, dims, coords))
+
+
+def _chunks(var):
+    """HDF5 chunk shape or None if stored contiguously"""
+    chunking = var.chunking()
+    if (chunking is None) or (chunking == "contiguous"):
+        return None
+    return tuple(int(n) for n in chunking)
+
+
+def _compression(var):
+    """Enabled filters, e.g. 'zlib:4,shuffle', or None"""
+    filters = var.filters() or {}
+    names = []
+    for key, value in filters.items():
+        if (key == "complevel") or not value:
+            continue
+        if key == "zlib":
+            names.append("zlib:{}".format(filters.get("complevel", 0)))
+        else:
+            names.append(key)
+    if len(names) == 0:
+        return None
+    return ",".join(names)
+
+
+def _grid(dataset, dims, coords):
+    """Horizontal grid described by longitude/latitude coordinates
+
+    Regular grids have 1D coordinates with constant spacing,
+    curvilinear grids have 2D coordinates
+
+    :returns: :class:`Grid` or None if coordinates not found
+    """
+    arrays = []
+    for coord in ["longitude", "latitude"]:
+        name = disk.coord_var(coord, dims, coords)
+        if (name is None) or (name not in dataset.variables):
+            return None
+        arrays.append(np.ma.filled(
+            dataset.variables[name][:], np.nan).astype("float64"))
+    lons, lats = arrays
+    if (lons.ndim == 1) and (lats.ndim == 1):
+        shape = (lats.size, lons.size)
+        regular = _evenly_spaced(lons) and _evenly_spaced(lats)
+    else:
+        shape = lons.shape
+        regular = False
+    digest = hashlib.sha1(
+        str(shape).encode() + lons.tobytes() + lats.tobytes()).hexdigest()
+    return Grid(
+        hash=digest,
+        shape=tuple(int(n) for n in shape),
+        lon_min=float(np.nanmin(lons)),
+        lon_max=float(np.nanmax(lons)),
+        lat_min=float(np.nanmin(lats)),
+        lat_max=float(np.nanmax(lats)),
+        regular=bool(regular))
+
+
+def _evenly_spaced(values, rtol=1e-5):
+    if values.size < 3:
+        return True
+    steps = np.diff(values)
+    return bool(np.allclose(steps, steps[0], rtol=rtol))
+
+
+def _coordinate(dataset, coord, dims, coords):
+    """Axis and flattened values of a coordinate
+
+    Scalar coordinates have values but no axis
+
+    :returns: (axis, values) or (None, None) if not found
+    """
+    name = disk.coord_var(coord, dims, coords)
+    if (name is None) or (name not in dataset.variables):
+        return None, None
+    obj = dataset.variables[name]
+    if (len(obj.dimensions) > 0) and (obj.dimensions[0] in dims):
+        axis = dims.index(obj.dimensions[0])
+    else:
+        axis = None
+    return axis, obj[:].ravel()
@@ -0,0 +1,112 @@
+"""
+Query cache
+-----------
+
+Navigation queries are repeated by every session and every
+middleware action. Since :func:`forest.db.get_database` returns
+one :class:`Database` per file for the whole server process, a
+:class:`QueryCache` attached to it shares results between
+all sessions.
+
+Entries are discarded when ``PRAGMA data_version`` reports that
+another connection, e.g. the housekeeping cron job, has committed
+new rows or when this connection has made changes of its own.
+
+.. autoclass:: QueryCache
+    :members:
+
+.. autofunction:: cached_query
+
+"""
+import functools
+from collections import OrderedDict, namedtuple
+
+
+__all__ = [
+    "QueryCache",
+    "cached_query",
+]
+
+
+CacheInfo = namedtuple("CacheInfo", (
+    "hits",
+    "misses",
+    "invalidations",
+    "maxsize",
+    "currsize"))
+
+
+class QueryCache:
+    """Least recently used store of query results
+
+    :param connection: sqlite3 connection used to detect changes
+    :param maxsize: maximum number of stored results
+    """
+    def __init__(self, connection, maxsize=1024):
+        self.connection = connection
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._version = None
+        self._results = OrderedDict()
+
+    def version(self):
+        """Token that changes whenever the database is modified"""
+        row = self.connection.execute("PRAGMA data_version").fetchone()
+        return (row, self.connection.total_changes)
+
+    def get(self, key, func):
+        """Find result related to key or call func to compute it"""
+        version = self.version()
+        if version != self._version:
+            if len(self._results) > 0:
+                self.invalidations += 1
+            self._results.clear()
+            self._version = version
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            result = func()
+            self._results[key] = result
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+            return result
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def clear(self):
+        """Remove all entries"""
+        self._results.clear()
+
+    def info(self):
+        """Hit, miss and invalidation counters
+
+        :returns: CacheInfo namedtuple
+        """
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            invalidations=self.invalidations,
+            maxsize=self.maxsize,
+            currsize=len(self._results))
+
+
+def cached_query(method):
+    """Decorate a method to store its results in self.query_cache
+
+    Results are copied into a new list so callers can not modify
+    cached values. Calls with unhashable arguments bypass the cache
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return list(self.query_cache.get(
+            key, lambda: method(self, *args, **kwargs)))
+    return wrapper
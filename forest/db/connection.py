@@ -1,4 +1,63 @@
+"""
+Connection
+----------
+
+Databases on disk are switched to write-ahead logging (WAL) when
+opened by :meth:`Connection.connect`, so that readers are not blocked
+while the housekeeping job ingests new files.
+
+sqlite3 objects can only be used by the thread that created them.
+A :class:`ConnectionPool` opens one read-only connection per thread
+and :meth:`Connection.pool` wraps any :class:`Connection` subclass
+in a proxy that delegates to one instance per thread.
+
+.. autoclass:: Connection
+    :members:
+
+.. autoclass:: ConnectionPool
+    :members:
+
+.. autoclass:: ThreadLocal
+    :members:
+
+"""
+import os
 import sqlite3
+import threading
+import urllib.parse
+from . import profile
+
+
+__all__ = [
+    "ConnectionPool",
+    "ThreadLocal",
+]
+
+
+def enable_wal(connection):
+    """Use write-ahead logging so readers and a writer can run together"""
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+    except sqlite3.OperationalError:
+        # Read-only file system or database locked by another process
+        pass
+
+
+def connect_read_only(path, timeout=5.):
+    """Open database file without write access
+
+    Connections are only used by the thread that opened them but
+    may be closed by any thread, e.g. by :meth:`ConnectionPool.close`
+
+    :param timeout: seconds to wait for a lock before raising
+    """
+    if path == ":memory:":
+        return profile.wrap(sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False))
+    uri = "file:{}?mode=ro".format(urllib.parse.quote(os.path.abspath(path)))
+    return profile.wrap(sqlite3.connect(
+        uri, uri=True, timeout=timeout, check_same_thread=False))
 
 
 class Connection(object):
@@ -7,9 +66,20 @@ class Connection(object):
         self.cursor = self.connection.cursor()
 
     @classmethod
-    def connect(cls, path):
+    def connect(cls, path, **kwargs):
         """Create database instance from location on disk or :memory:"""
-        return cls(sqlite3.connect(path))
+        connection = sqlite3.connect(path)
+        if path != ":memory:":
+            enable_wal(connection)
+        return cls(profile.wrap(connection), **kwargs)
+
+    @classmethod
+    def pool(cls, path, **kwargs):
+        """Thread-safe proxy using one read-only connection per thread
+
+        :returns: :class:`ThreadLocal` proxy to instances of cls
+        """
+        return ThreadLocal(ConnectionPool(path), cls, **kwargs)
 
     def __enter__(self):
         return self
@@ -20,3 +90,75 @@ class Connection(object):
     def close(self):
         self.connection.commit()
         self.connection.close()
+
+
+class ConnectionPool:
+    """One read-only sqlite3 connection per thread
+
+    :param path: database file
+    :param factory: function to open a connection given path
+    """
+    def __init__(self, path, factory=connect_read_only):
+        self.path = path
+        self.factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def connection(self):
+        """Connection owned by the calling thread"""
+        try:
+            return self._local.connection
+        except AttributeError:
+            connection = self.factory(self.path)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+            return connection
+
+    def __len__(self):
+        with self._lock:
+            return len(self._connections)
+
+    def close(self):
+        """Close connections opened by every thread"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+class ThreadLocal:
+    """Delegate attribute access to one instance per thread
+
+    Each instance is created with a connection from the pool, so
+    per-instance state, e.g. cursors and lru_cache entries, is
+    never shared between threads
+
+    :param pool: :class:`ConnectionPool`
+    :param cls: class called with a connection and kwargs
+    """
+    def __init__(self, pool, cls, **kwargs):
+        self.pool = pool
+        self.cls = cls
+        self.kwargs = kwargs
+        self._local = threading.local()
+
+    def instance(self):
+        """Instance owned by the calling thread"""
+        try:
+            return self._local.instance
+        except AttributeError:
+            instance = self.cls(self.pool.connection(), **self.kwargs)
+            self._local.instance = instance
+            return instance
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.instance(), name)
+
+    def close(self):
+        self.pool.close()
+        self._local = threading.local()
@@ -367,15 +367,20 @@ class Controls(object):
         pattern = store.state["pattern"]
         variable = action["payload"]["value"]
         initial_time = store.state["initial_time"]
-        valid_times = self.navigator.valid_times(
-            pattern=pattern,
-            variable=variable,
-            initial_time=initial_time)
+        if hasattr(self.navigator, "dimensions"):
+            # Single query against the navigation table
+            valid_times, pressures = self.navigator.dimensions(
+                pattern, variable, initial_time)
+        else:
+            valid_times = self.navigator.valid_times(
+                pattern=pattern,
+                variable=variable,
+                initial_time=initial_time)
+            pressures = self.navigator.pressures(
+                pattern=pattern,
+                variable=variable,
+                initial_time=initial_time)
         valid_times = sorted(set(valid_times))
-        pressures = self.navigator.pressures(
-            pattern=pattern,
-            variable=variable,
-            initial_time=initial_time)
         pressures = list(reversed(pressures))
         yield action
         yield set_value("valid_times", valid_times)
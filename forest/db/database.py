@@ -1,11 +1,21 @@
+import os
+import sqlite3
+import hashlib
+import functools
+import datetime as dt
+import numpy as np
 try:
     import iris
 except ImportError:
     # ReadTheDocs can't install iris
     pass
 import netCDF4
+import cftime
 import jinja2
+from collections import namedtuple
 from .connection import Connection
+from .cache import QueryCache, cached_query
+from . import bulk
 
 
 __all__ = [
@@ -14,6 +24,249 @@ __all__ = [
 ]
 
 
+VariableMetadata = namedtuple("VariableMetadata", (
+    "units",
+    "chunks",
+    "compression",
+    "grid"))
+
+
+GLOB_CHARS = "*?["
+AXIS_DTYPES = {
+    "time": "datetime64[s]",
+    "pressure": "float32"
+}
+# Calendars whose dates are valid datetime64 values
+REAL_CALENDARS = ("standard", "gregorian", "proleptic_gregorian")
+ENVIRONMENT = jinja2.Environment(extensions=['jinja2.ext.do'])
+
+
+@functools.lru_cache(maxsize=None)
+def render(template, **kwargs):
+    """Compile and render SQL template once per set of arguments
+
+    .. note:: Arguments should be flags or SQL fragments with
+              few distinct values, never user-supplied values
+    """
+    return ENVIRONMENT.from_string(template).render(**kwargs)
+
+
+def pack_axis(coord, values):
+    """Pack coordinate values into bytes suitable for a BLOB column
+
+    >>> digest, dtype, data = pack_axis("pressure", [1000., 850.])
+    >>> dtype
+    'float32'
+    >>> unpack_axis(dtype, data)
+    array([1000.,  850.], dtype=float32)
+
+    :returns: (digest, dtype, data) where digest identifies
+              identical axes shared between files
+    """
+    return pack_values(values, dtype=AXIS_DTYPES[coord])
+
+
+def pack_values(values, dtype=None):
+    """Pack values of any coordinate into bytes
+
+    Numbers keep their dtype, dates in real-world calendars are
+    stored as datetime64[s]
+
+    >>> pack_values([0, 1, 2])[1]
+    'int64'
+    >>> pack_values(["north", "south"])
+    Traceback (most recent call last):
+    ...
+    ValueError: can not pack values of type <U5
+
+    :returns: (digest, dtype, data)
+    :raises ValueError: if values are neither numbers nor dates
+    """
+    if dtype is None:
+        dtype = _axis_dtype(values)
+    if dtype.startswith("datetime64"):
+        array = np.array([_pack_date(value) for value in values],
+                         dtype=dtype)
+    else:
+        array = np.asarray(values, dtype=dtype)
+    data = array.tobytes()
+    digest = hashlib.sha1(dtype.encode() + data).hexdigest()
+    return digest, dtype, data
+
+
+def _axis_dtype(values):
+    array = np.asarray(values)
+    if array.dtype.kind in "biuf":
+        return array.dtype.name
+    if array.dtype.kind == "M":
+        return "datetime64[s]"
+    if (array.dtype.kind == "O") and (array.size > 0) and all(
+            isinstance(value, (dt.datetime, cftime.datetime))
+            for value in array.flat):
+        return "datetime64[s]"
+    raise ValueError("can not pack values of type {}".format(array.dtype))
+
+
+def _pack_date(value):
+    """Date as datetime64[s], strings are parsed
+
+    :raises ValueError: for dates in other calendars, e.g. 360_day
+    """
+    calendar = getattr(value, "calendar", None)
+    if calendar and (calendar not in REAL_CALENDARS):
+        raise ValueError("can not pack {} calendar date {}".format(
+            calendar, value))
+    return np.datetime64(str(value), "s")
+
+
+def unpack_axis(dtype, data):
+    """Read packed coordinate values without copying"""
+    return np.frombuffer(data, dtype=dtype)
+
+
+def to_epoch(time):
+    """Seconds since 1970-01-01 or None
+
+    >>> to_epoch("2019-01-01 00:00:00")
+    1546300800
+    """
+    if time is None:
+        return None
+    return int(np.datetime64(str(time), 's').astype("int64"))
+
+
+def _epoch(time):
+    """SQL function version of to_epoch that tolerates bad values"""
+    try:
+        return to_epoch(time)
+    except ValueError:
+        return None
+
+
+def navigation_rows(time_axis, pressure_axis, times, pressures):
+    """Denormalised (valid, pressure, time_index, pressure_index) rows
+
+    Variables whose time and pressure share the leading axis are
+    indexed by time_index alone, as in :meth:`Locator.locate`. Pressure is None for variables without
+    a pressure axis
+
+    >>> times = np.array(["2019-01-01"], dtype="datetime64[s]")
+    >>> navigation_rows(0, None, times, None)
+    [(1546300800, None, 0, None)]
+
+    :param times: datetime64[s] array or None
+    :param pressures: float array or None
+    """
+    if times is None:
+        return []
+    valids = [int(t) for t in times.astype("int64")]
+    if time_axis is None:
+        # Scalar time coordinate
+        valids = valids[:1]
+    if pressure_axis is None:
+        if time_axis is None:
+            return [(valids[0], None, None, None)]
+        return [(v, None, i, None) for i, v in enumerate(valids)]
+    pressures = [float(p) for p in pressures]
+    if time_axis is None:
+        return [(valids[0], p, None, j) for j, p in enumerate(pressures)]
+    if (time_axis == 0) and (pressure_axis == 0):
+        return [(v, p, i, None)
+                for i, (v, p) in enumerate(zip(valids, pressures))]
+    return [(v, p, i, j)
+            for i, v in enumerate(valids)
+            for j, p in enumerate(pressures)]
+
+
+def _datetime64(epochs):
+    """Convert integer epoch seconds to datetime64[s] array"""
+    return np.array(epochs, dtype="int64").astype("datetime64[s]")
+
+
+def _shape(text):
+    """Parse comma separated integers stored in TEXT columns"""
+    if text is None:
+        return None
+    return tuple(int(n) for n in text.split(","))
+
+
+def _flag(value):
+    """Reduce value to the information needed by templates"""
+    if value is None:
+        return None
+    return True
+
+
+def split_pattern(pattern):
+    """Split GLOB pattern into literal directory and basename pattern
+
+    Patterns whose directory contains wildcards, or that have no
+    directory, can not be split
+
+    >>> split_pattern("/data/*ga7*.nc")
+    ('/data', '*ga7*.nc')
+    >>> split_pattern("*ga7*.nc")
+    (None, '*ga7*.nc')
+
+    :returns: (directory, basename) where directory may be None
+    """
+    directory, basename = os.path.split(pattern)
+    if (directory == "") or _has_wildcard(directory):
+        return None, pattern
+    return directory, basename
+
+
+def literal_prefix(pattern):
+    """Characters before the first GLOB wildcard
+
+    >>> literal_prefix("ga7_*.nc")
+    'ga7_'
+    """
+    for i, c in enumerate(pattern):
+        if c in GLOB_CHARS:
+            return pattern[:i]
+    return pattern
+
+
+def _has_wildcard(text):
+    return any(c in text for c in GLOB_CHARS)
+
+
+def glob_clause(pattern, table="file"):
+    """SQL condition and parameters that select file names by pattern
+
+    A literal directory is matched against the indexed directory
+    column and GLOB is only applied to the basename. Literal
+    prefixes become range conditions so that SQLite can use an
+    index rather than scan every file name.
+
+    .. note:: A split pattern follows file system glob rules,
+              e.g. '/data/*.nc' does not match '/data/sub/x.nc'
+
+    :returns: (sql, params) where sql uses named placeholders
+    """
+    directory, basename = split_pattern(pattern)
+    if directory is None:
+        column = "{}.name".format(table)
+        clauses = ["{} GLOB :pattern".format(column)]
+        params = dict(pattern=pattern)
+    else:
+        column = "{}.basename".format(table)
+        clauses = [
+            "{}.directory = :directory".format(table),
+            "{} GLOB :basename".format(column)]
+        params = dict(pattern=pattern, directory=directory, basename=basename)
+    prefix = literal_prefix(basename)
+    if prefix != "":
+        clauses += [
+            "{} >= :prefix_lo".format(column),
+            "{} < :prefix_hi".format(column)]
+        params.update(
+            prefix_lo=prefix,
+            prefix_hi=prefix[:-1] + chr(ord(prefix[-1]) + 1))
+    return " AND ".join(clauses), params
+
+
 class CoordinateDB(Connection):
     def __init__(self, connection):
         self.connection = connection
@@ -169,15 +422,32 @@ class CoordinateDB(Connection):
 
 
 class Database(Connection):
-    """Stores index and paths of forecast diagnostics"""
-    def __init__(self, connection):
+    """Stores index and paths of forecast diagnostics
+
+    Coordinates are stored either one row per value or, if
+    columnar is True when the database is created, as one packed
+    array per axis shared by all variables with identical axes.
+    Only the representation chosen when the database was created
+    is written.
+
+    :param connection: sqlite3 connection
+    :param columnar: store coordinates as packed arrays only
+    """
+    def __init__(self, connection, columnar=None):
         self.connection = connection
+        self.connection.create_function("epoch", 1, _epoch)
+        # Only takes effect before tables are created, see retention.vacuum
+        self.connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
         self.cursor = self.connection.cursor()
+        self.query_cache = QueryCache(self.connection)
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS file (
                     id INTEGER PRIMARY KEY,
                     name TEXT NOT NULL,
                     reference TEXT,
+                    directory TEXT,
+                    basename TEXT,
+                    reference_epoch INTEGER,
                     UNIQUE(name))
         """)
         self.cursor.execute("""
@@ -186,10 +456,31 @@ class Database(Connection):
                     name TEXT,
                     time_axis INTEGER,
                     pressure_axis INTEGER,
+                    time_data_id INTEGER,
+                    pressure_data_id INTEGER,
+                    units TEXT,
+                    chunks TEXT,
+                    compression TEXT,
+                    grid_id INTEGER,
                     file_id INTEGER,
                     FOREIGN KEY(file_id) REFERENCES file(id),
+                    FOREIGN KEY(grid_id) REFERENCES grid(id),
+                    FOREIGN KEY(time_data_id) REFERENCES axis_data(id),
+                    FOREIGN KEY(pressure_data_id) REFERENCES axis_data(id),
                     UNIQUE(name, file_id))
         """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS grid (
+                    id INTEGER PRIMARY KEY,
+                    hash TEXT NOT NULL,
+                    shape TEXT,
+                    lon_min REAL,
+                    lon_max REAL,
+                    lat_min REAL,
+                    lat_max REAL,
+                    regular INTEGER,
+                    UNIQUE(hash))
+        """)
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS pressure (
                     id INTEGER PRIMARY KEY,
@@ -211,6 +502,7 @@ class Database(Connection):
                     id INTEGER PRIMARY KEY,
                     i INTEGER,
                     value TEXT,
+                    epoch INTEGER,
                     UNIQUE(i, value))
         """)
         self.cursor.execute("""
@@ -221,15 +513,141 @@ class Database(Connection):
                     FOREIGN KEY(variable_id) REFERENCES variable(id),
                     FOREIGN KEY(time_id) REFERENCES time(id))
         """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS file_stat (
+                    file_id INTEGER PRIMARY KEY,
+                    size INTEGER,
+                    mtime REAL,
+                    FOREIGN KEY(file_id) REFERENCES file(id))
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS axis_data (
+                    id INTEGER PRIMARY KEY,
+                    hash TEXT NOT NULL,
+                    dtype TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    UNIQUE(hash))
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS setting (
+                    name TEXT PRIMARY KEY,
+                    value TEXT)
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS navigation (
+                    variable TEXT,
+                    reference INTEGER,
+                    valid INTEGER,
+                    pressure REAL,
+                    file_id INTEGER,
+                    time_index INTEGER,
+                    pressure_index INTEGER,
+                    FOREIGN KEY(file_id) REFERENCES file(id))
+        """)
+        self.migrate()
+        # Backfills must not hold a write lock open on shared catalogues
+        self.connection.commit()
+        self.columnar = self._storage(columnar) == "packed"
+
+    def _storage(self, columnar):
+        """Coordinate storage format recorded in the database"""
+        self.cursor.execute("""
+            SELECT value FROM setting WHERE name = 'coordinates'
+        """)
+        rows = self.cursor.fetchall()
+        if len(rows) == 0:
+            storage = "packed" if columnar else "rows"
+            self.cursor.execute("""
+                INSERT INTO setting (name, value)
+                VALUES ('coordinates', :storage)
+            """, dict(storage=storage))
+            self.connection.commit()
+            return storage
+        storage = rows[0][0]
+        if (columnar is not None) and (columnar != (storage == "packed")):
+            msg = "Database stores coordinates as {!r}".format(storage)
+            raise ValueError(msg)
+        return storage
+
+    def _add_columns(self, table, columns):
+        """Add columns to table if not present
+
+        :returns: True if columns were added
+        """
+        try:
+            for column in columns:
+                self.cursor.execute("""
+                    ALTER TABLE {} ADD COLUMN {}
+                """.format(table, column))
+        except sqlite3.OperationalError:
+            # Columns already present
+            return False
+        return True
+
+    def migrate(self):
+        """Add columns and indexes missing from older databases"""
+        self._add_columns("variable", [
+            "time_data_id INTEGER",
+            "pressure_data_id INTEGER"])
+        self._add_columns("variable", [
+            "units TEXT",
+            "chunks TEXT",
+            "compression TEXT",
+            "grid_id INTEGER"])
+        if self._add_columns("file", ["directory TEXT", "basename TEXT"]):
+            self.connection.create_function("dirname", 1, os.path.dirname)
+            self.connection.create_function("basename", 1, os.path.basename)
+            self.cursor.execute("""
+                UPDATE file
+                   SET directory = dirname(name),
+                       basename = basename(name)
+            """)
+        if self._add_columns("file", ["reference_epoch INTEGER"]):
+            self.cursor.execute("""
+                UPDATE file SET reference_epoch = epoch(reference)
+            """)
+        if self._add_columns("time", ["epoch INTEGER"]):
+            self.cursor.execute("""
+                UPDATE time SET epoch = epoch(value)
+            """)
+        for name, table, columns in [
+                ("file_reference", "file", "reference, name"),
+                ("file_directory", "file", "directory, basename"),
+                ("file_reference_epoch", "file", "reference_epoch, name"),
+                ("time_epoch", "time", "epoch, id"),
+                ("variable_file", "variable",
+                    "file_id, name, time_axis, pressure_axis"),
+                ("variable_to_time_time", "variable_to_time",
+                    "time_id, variable_id"),
+                ("variable_to_pressure_pressure", "variable_to_pressure",
+                    "pressure_id, variable_id"),
+                ("navigation_lookup", "navigation",
+                    "variable, reference, valid, pressure, "
+                    "file_id, time_index, pressure_index"),
+                ("navigation_file", "navigation", "file_id")]:
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS {} ON {} ({})
+            """.format(name, table, columns))
 
     def insert_netcdf(self, path):
         """Coordinate and meta-data information taken from NetCDF file"""
-        with netCDF4.Dataset(path) as dataset:
-            try:
-                obj = dataset.variables["forecast_reference_time"]
-                reference_time = netCDF4.num2date(obj[:], units=obj.units)
-            except KeyError:
-                reference_time = None
+        try:
+            header = bulk.read_header(path)
+        except (KeyError, ValueError, AttributeError) as e:
+            print("skipping metadata: '{}' {}".format(path, e))
+            header = None
+
+        if header is None:
+            with netCDF4.Dataset(path) as dataset:
+                try:
+                    obj = dataset.variables["forecast_reference_time"]
+                    reference_time = netCDF4.num2date(
+                        obj[:], units=obj.units,
+                        calendar=getattr(obj, "calendar", "standard"))
+                except KeyError:
+                    reference_time = None
+        else:
+            reference_time = header.reference_time
 
         self.insert_file_name(path, reference_time=reference_time)
 
@@ -253,6 +671,453 @@ class Database(Connection):
                 self.insert_pressures(path, variable, pressures)
             except iris.exceptions.CoordinateNotFoundError:
                 pass
+        file_id = self._file_id(path)
+        self.update_navigation(file_id)
+        if header is not None:
+            self._update_metadata(file_id, header.variables)
+
+    def insert_header(self, header):
+        """Write rows related to a file in a single transaction
+
+        Rows left over from a previous version of the file are
+        replaced so that changed files can be re-indexed
+
+        :param header: :class:`forest.db.bulk.Header`
+        """
+        self.insert_headers([header])
+
+    def insert_headers(self, headers):
+        """Write rows related to several files in a single transaction
+
+        :param headers: iterable of :class:`forest.db.bulk.Header`
+        """
+        with self.connection:
+            for header in headers:
+                self._insert_header(header)
+
+    def _insert_header(self, header):
+        self.insert_file_name(header.path)
+        self.cursor.execute("""
+            UPDATE file
+               SET reference = :reference,
+                   reference_epoch = epoch(:reference)
+             WHERE name = :path
+        """, dict(path=header.path, reference=header.reference_time))
+        file_id = self._file_id(header.path)
+        self._delete_variables(file_id)
+        self.cursor.executemany("""
+            INSERT INTO variable (name, time_axis, pressure_axis, file_id)
+                 VALUES (:name, :time_axis, :pressure_axis, :file_id)
+        """, [dict(name=v.name,
+                    time_axis=v.time_axis,
+                    pressure_axis=v.pressure_axis,
+                    file_id=file_id) for v in header.variables])
+        self._update_metadata(file_id, header.variables)
+        for table in ["time", "pressure"]:
+            axes = [(v.name, getattr(v, table + "s"))
+                    for v in header.variables]
+            axes = [(name, values) for name, values in axes
+                    if values is not None]
+            if self.columnar:
+                self._insert_axis_data(file_id, table, axes)
+                continue
+            rows = [dict(file_id=file_id, variable=name, i=i, value=value)
+                    for name, values in axes
+                    for i, value in enumerate(values)]
+            if table == "time":
+                self.cursor.executemany("""
+                    INSERT OR IGNORE INTO time (i, value, epoch)
+                    VALUES (:i, :value, epoch(:value))
+                """, rows)
+            else:
+                self.cursor.executemany("""
+                    INSERT OR IGNORE INTO {0} (i, value)
+                    VALUES (:i, :value)
+                """.format(table), rows)
+            self.cursor.executemany("""
+                INSERT OR IGNORE INTO variable_to_{0} (variable_id, {0}_id)
+                VALUES(
+                    (SELECT id FROM variable
+                      WHERE file_id = :file_id AND name = :variable),
+                    (SELECT id FROM {0} WHERE value = :value AND i = :i))
+            """.format(table), rows)
+        self.update_navigation(file_id)
+        self.cursor.execute("""
+            INSERT OR REPLACE INTO file_stat (file_id, size, mtime)
+            VALUES (:file_id, :size, :mtime)
+        """, dict(file_id=file_id, size=header.size, mtime=header.mtime))
+
+    def _update_metadata(self, file_id, variables):
+        """Record units, chunking, compression and grid of variables
+
+        :param variables: list of :class:`forest.db.bulk.VariableHeader`
+        """
+        rows = []
+        for v in variables:
+            chunks = None
+            if v.chunks is not None:
+                chunks = ",".join(str(n) for n in v.chunks)
+            rows.append(dict(
+                file_id=file_id,
+                name=v.name,
+                units=v.units,
+                chunks=chunks,
+                compression=v.compression,
+                grid_id=self._insert_grid(v.grid)))
+        self.cursor.executemany("""
+            UPDATE variable
+               SET units = :units,
+                   chunks = :chunks,
+                   compression = :compression,
+                   grid_id = :grid_id
+             WHERE file_id = :file_id
+               AND name = :name
+        """, rows)
+
+    def _insert_grid(self, grid):
+        if grid is None:
+            return None
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO grid (
+                   hash,
+                   shape,
+                   lon_min,
+                   lon_max,
+                   lat_min,
+                   lat_max,
+                   regular)
+            VALUES (
+                   :hash,
+                   :shape,
+                   :lon_min,
+                   :lon_max,
+                   :lat_min,
+                   :lat_max,
+                   :regular)
+        """, dict(
+            grid._asdict(),
+            shape=",".join(str(n) for n in grid.shape)))
+        self.cursor.execute("""
+            SELECT id FROM grid WHERE hash = :hash
+        """, dict(hash=grid.hash))
+        grid_id, = self.cursor.fetchone()
+        return grid_id
+
+    def variable_metadata(self, path, variable):
+        """Units, chunking, compression and grid recorded by the indexer
+
+        Loaders can use the grid hash to reuse projected coordinates
+        and the chunk shape to choose a read strategy without
+        opening the file
+
+        :returns: :class:`VariableMetadata` or None if not indexed
+        """
+        self.cursor.execute("""
+            SELECT v.units,
+                   v.chunks,
+                   v.compression,
+                   g.hash,
+                   g.shape,
+                   g.lon_min,
+                   g.lon_max,
+                   g.lat_min,
+                   g.lat_max,
+                   g.regular
+              FROM variable AS v
+              JOIN file AS f
+                ON f.id = v.file_id
+              LEFT JOIN grid AS g
+                ON g.id = v.grid_id
+             WHERE f.name = :path
+               AND v.name = :variable
+        """, dict(path=path, variable=variable))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        units, chunks, compression, digest, shape = row[:5]
+        grid = None
+        if digest is not None:
+            grid = bulk.Grid(
+                digest,
+                _shape(shape),
+                *row[5:9],
+                regular=bool(row[9]))
+        return VariableMetadata(
+            units=units,
+            chunks=_shape(chunks),
+            compression=compression,
+            grid=grid)
+
+    def _file_id(self, path):
+        self.cursor.execute("""
+            SELECT id FROM file WHERE name = :path
+        """, dict(path=path))
+        file_id, = self.cursor.fetchone()
+        return file_id
+
+    def update_navigation(self, file_id):
+        """Materialise navigation rows of a file from its stored axes"""
+        self.cursor.execute("""
+            DELETE FROM navigation WHERE file_id = :file_id
+        """, dict(file_id=file_id))
+        self.cursor.execute("""
+            SELECT f.reference,
+                   v.id,
+                   v.name,
+                   v.time_axis,
+                   v.pressure_axis,
+                   t.dtype,
+                   t.data,
+                   p.dtype,
+                   p.data
+              FROM variable AS v
+              JOIN file AS f
+                ON f.id = v.file_id
+              LEFT JOIN axis_data AS t
+                ON t.id = v.time_data_id
+              LEFT JOIN axis_data AS p
+                ON p.id = v.pressure_data_id
+             WHERE v.file_id = :file_id
+        """, dict(file_id=file_id))
+        rows = []
+        for (reference, variable_id, variable, time_axis, pressure_axis,
+             t_dtype, t_data, p_dtype, p_data) in self.cursor.fetchall():
+            if t_data is not None:
+                times = unpack_axis(t_dtype, t_data)
+            else:
+                times = self._axis_rows(variable_id, "time")
+            if p_data is not None:
+                pressures = unpack_axis(p_dtype, p_data)
+            else:
+                pressures = self._axis_rows(variable_id, "pressure")
+            if (pressures is None) and (pressure_axis is not None):
+                # Pressure axis not recorded, can not materialise
+                continue
+            for valid, pressure, i, j in navigation_rows(
+                    time_axis, pressure_axis, times, pressures):
+                rows.append(dict(
+                    variable=variable,
+                    reference=to_epoch(reference),
+                    valid=valid,
+                    pressure=pressure,
+                    file_id=file_id,
+                    time_index=i,
+                    pressure_index=j))
+        self.cursor.executemany("""
+            INSERT INTO navigation (
+                   variable,
+                   reference,
+                   valid,
+                   pressure,
+                   file_id,
+                   time_index,
+                   pressure_index)
+            VALUES (
+                   :variable,
+                   :reference,
+                   :valid,
+                   :pressure,
+                   :file_id,
+                   :time_index,
+                   :pressure_index)
+        """, rows)
+
+    def _axis_rows(self, variable_id, coord):
+        """Coordinate values stored one row per value or None"""
+        column = "epoch" if coord == "time" else "value"
+        self.cursor.execute("""
+            SELECT c.{1}
+              FROM variable_to_{0} AS vc
+              JOIN {0} AS c
+                ON c.id = vc.{0}_id
+             WHERE vc.variable_id = :variable_id
+             ORDER BY c.i
+        """.format(coord, column), dict(variable_id=variable_id))
+        values = [value for value, in self.cursor.fetchall()]
+        if (len(values) == 0) or (None in values):
+            return None
+        if coord == "time":
+            return _datetime64(values)
+        return np.array(values, dtype="f8")
+
+    def rebuild_navigation(self):
+        """Materialise navigation rows for every file"""
+        self.cursor.execute("SELECT id FROM file")
+        for file_id, in self.cursor.fetchall():
+            self.update_navigation(file_id)
+
+    @cached_query
+    def dimensions(self, pattern, variable, initial_time):
+        """Valid times and pressures using a single query
+
+        Falls back to :meth:`valid_times` and :meth:`pressures`
+        if the navigation table has no matching rows
+
+        :returns: (valid_times, pressures) tuples
+        """
+        clause, params = self._glob_clause(pattern)
+        query = render("""
+            SELECT DISTINCT n.valid, n.pressure
+              FROM navigation AS n
+             {% if pattern is not none %}
+              JOIN file
+                ON file.id = n.file_id
+             {% endif %}
+             WHERE n.variable = :variable
+               AND n.reference = :reference
+             {% if pattern is not none %}
+               AND {{ clause }}
+             {% endif %}
+        """, pattern=_flag(pattern), clause=clause)
+        self.cursor.execute(query, dict(
+            params,
+            variable=variable,
+            reference=to_epoch(initial_time)))
+        rows = self.cursor.fetchall()
+        if len(rows) == 0:
+            kwargs = dict(
+                pattern=pattern,
+                variable=variable,
+                initial_time=initial_time)
+            return (tuple(self.valid_times(**kwargs)),
+                    tuple(self.pressures(**kwargs)))
+        valids = np.unique([v for v, _ in rows]).astype("datetime64[s]")
+        valid_times = tuple(str(t) for t in valids.astype(dt.datetime))
+        pressures = tuple(sorted({p for _, p in rows if p is not None}))
+        return valid_times, pressures
+
+    def insert_axis_data(self, path, variable, coord, values):
+        """Store coordinate values as a single packed array"""
+        self.insert_variable(path, variable)
+        self.cursor.execute("""
+            SELECT id FROM file WHERE name = :path
+        """, dict(path=path))
+        file_id, = self.cursor.fetchone()
+        self._insert_axis_data(file_id, coord, [(variable, values)])
+        self._delete_navigation(path)
+
+    def _delete_navigation(self, path):
+        """Materialised rows are stale until update_navigation"""
+        self.cursor.execute("""
+            DELETE FROM navigation
+             WHERE file_id = (SELECT id FROM file WHERE name = :path)
+        """, dict(path=path))
+
+    def _insert_axis_data(self, file_id, coord, axes):
+        """Insert de-duplicated packed arrays and link them to variables
+
+        :param axes: list of (variable, values) tuples
+        """
+        rows = []
+        for variable, values in axes:
+            try:
+                digest, dtype, data = pack_axis(coord, values)
+            except ValueError as error:
+                # Times in calendars without a datetime64 equivalent
+                print("skipping {} axis of {}: {}".format(
+                    coord, variable, error))
+                continue
+            rows.append(dict(
+                file_id=file_id,
+                variable=variable,
+                hash=digest,
+                dtype=dtype,
+                data=data))
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO axis_data (hash, dtype, data)
+            VALUES (:hash, :dtype, :data)
+        """, rows)
+        self.cursor.executemany("""
+            UPDATE variable
+               SET {}_data_id = (SELECT id FROM axis_data WHERE hash = :hash)
+             WHERE file_id = :file_id AND name = :variable
+        """.format(coord), rows)
+
+    def _delete_variables(self, file_id):
+        self.cursor.execute("""
+            DELETE FROM navigation WHERE file_id = :file_id
+        """, dict(file_id=file_id))
+        for table in ["time", "pressure"]:
+            self.cursor.execute("""
+                DELETE FROM variable_to_{0}
+                 WHERE variable_id IN (
+                       SELECT id FROM variable WHERE file_id = :file_id)
+            """.format(table), dict(file_id=file_id))
+        self.cursor.execute("""
+            DELETE FROM variable WHERE file_id = :file_id
+        """, dict(file_id=file_id))
+
+    def delete_files(self, names):
+        """Remove files and their variables, coordinates and statistics
+
+        :param names: file names as stored in the database
+        :returns: number of files removed
+        """
+        count = 0
+        for name in names:
+            self.cursor.execute("""
+                SELECT id FROM file WHERE name = :name
+            """, dict(name=name))
+            row = self.cursor.fetchone()
+            if row is None:
+                continue
+            file_id, = row
+            self._delete_variables(file_id)
+            for table, column in [("file_stat", "file_id"), ("file", "id")]:
+                self.cursor.execute("""
+                    DELETE FROM {} WHERE {} = :file_id
+                """.format(table, column), dict(file_id=file_id))
+            count += 1
+        return count
+
+    def delete_orphans(self):
+        """Remove coordinate and grid rows no longer referenced by any variable
+
+        :returns: number of rows removed
+        """
+        before = self.connection.total_changes
+        for table in ["time", "pressure"]:
+            self.cursor.execute("""
+                DELETE FROM {0}
+                 WHERE id NOT IN (SELECT {0}_id FROM variable_to_{0})
+            """.format(table))
+        self.cursor.execute("""
+            DELETE FROM axis_data
+             WHERE id NOT IN (
+                   SELECT time_data_id FROM variable
+                    WHERE time_data_id IS NOT NULL
+                   UNION
+                   SELECT pressure_data_id FROM variable
+                    WHERE pressure_data_id IS NOT NULL)
+        """)
+        self.cursor.execute("""
+            DELETE FROM grid
+             WHERE id NOT IN (
+                   SELECT grid_id FROM variable
+                    WHERE grid_id IS NOT NULL)
+        """)
+        return self.connection.total_changes - before
+
+    def insert_file_stat(self, path, size, mtime):
+        """Record size and modification time of an indexed file"""
+        self.cursor.execute("""
+            INSERT OR REPLACE INTO file_stat (file_id, size, mtime)
+            VALUES ((SELECT id FROM file WHERE name = :path), :size, :mtime)
+        """, dict(path=path, size=size, mtime=mtime))
+
+    def file_stats(self):
+        """Size and modification time of indexed files
+
+        :returns: dict mapping file name to (size, mtime)
+        """
+        self.cursor.execute("""
+            SELECT file.name, file_stat.size, file_stat.mtime
+              FROM file_stat
+              JOIN file
+                ON file.id = file_stat.file_id
+        """)
+        return {name: (size, mtime)
+                for name, size, mtime in self.cursor.fetchall()}
 
     @staticmethod
     def _axis(cube, coord):
@@ -265,6 +1130,7 @@ class Database(Connection):
         except iris.exceptions.CoordinateNotFoundError:
             return None
 
+    @cached_query
     def initial_times(self, pattern=None, variable=None):
         """Distinct initialisation times"""
         if pattern is None:
@@ -274,18 +1140,21 @@ class Database(Connection):
                  WHERE reference IS NOT NULL
                  ORDER BY reference
             """
+            params = dict(pattern=pattern)
         else:
+            clause, params = glob_clause(pattern)
             query = """
                 SELECT DISTINCT reference
                   FROM file
                  WHERE reference IS NOT NULL
-                   AND name GLOB :pattern
+                   AND {}
                  ORDER BY reference;
-            """
-        self.cursor.execute(query, dict(pattern=pattern))
+            """.format(clause)
+        self.cursor.execute(query, params)
         rows = self.cursor.fetchall()
         return [r for r, in rows]
 
+    @cached_query
     def files(self, pattern=None):
         """File names"""
         if pattern is None:
@@ -294,42 +1163,67 @@ class Database(Connection):
                   FROM file
                  ORDER BY name;
             """
+            params = dict(pattern=pattern)
         else:
+            clause, params = glob_clause(pattern)
             query = """
                 SELECT name
                   FROM file
-                 WHERE name GLOB :pattern
+                 WHERE {}
                  ORDER BY name;
-            """
-        self.cursor.execute(query, dict(pattern=pattern))
+            """.format(clause)
+        self.cursor.execute(query, params)
         rows = self.cursor.fetchall()
         return [r for r, in rows]
 
+    @cached_query
     def variables(self, pattern=None):
         # Note: SQL injection possible if not properly escaped
         #       use ? and :name syntax in template
-        environment = jinja2.Environment(extensions=['jinja2.ext.do'])
-        query = environment.from_string("""
+        clause, params = self._glob_clause(pattern)
+        query = render("""
             SELECT DISTINCT variable.name
               FROM variable
               {% if pattern is not none %}
               JOIN file
                 ON file.id = variable.file_id
-             WHERE file.name GLOB :pattern
+             WHERE {{ clause }}
               {% endif %}
              ORDER BY variable.name;
-        """).render(pattern=pattern)
-        self.cursor.execute(query, dict(pattern=pattern))
+        """, pattern=_flag(pattern), clause=clause)
+        self.cursor.execute(query, params)
         rows = self.cursor.fetchall()
         return [r for r, in rows]
 
+    @staticmethod
+    def _glob_clause(pattern):
+        if pattern is None:
+            return None, dict(pattern=pattern)
+        return glob_clause(pattern)
+
     def insert_file_name(self, path, reference_time=None):
         if reference_time is not None:
             reference_time = str(reference_time)
+        directory, basename = os.path.split(path)
         self.cursor.execute("""
-            INSERT OR IGNORE INTO file (name, reference)
-            VALUES (:path, :reference)
-        """, dict(path=path, reference=reference_time))
+            INSERT OR IGNORE INTO file (
+                   name,
+                   reference,
+                   reference_epoch,
+                   directory,
+                   basename)
+            VALUES (
+                   :path,
+                   :reference,
+                   :reference_epoch,
+                   :directory,
+                   :basename)
+        """, dict(
+            path=path,
+            reference=reference_time,
+            reference_epoch=_epoch(reference_time),
+            directory=directory,
+            basename=basename))
 
     def insert_variable(
             self,
@@ -354,8 +1248,12 @@ class Database(Connection):
 
     def insert_pressures(self, path, variable, values):
         """Helper method to insert a coordinate related to a variable"""
+        if self.columnar:
+            self.insert_axis_data(path, variable, "pressure", values)
+            return
         for i, value in enumerate(values):
             self.insert_pressure(path, variable, value, i)
+        self._delete_navigation(path)
 
     def insert_pressure(self, path, variable, pressure, i):
         self.insert_variable(path, variable)
@@ -371,21 +1269,25 @@ class Database(Connection):
                 (SELECT id FROM pressure WHERE value=:pressure AND i=:i))
         """, dict(path=path, variable=variable, pressure=pressure, i=i))
 
+    @cached_query
     def valid_times(self,
                     pattern=None,
                     variable=None,
                     initial_time=None):
         """Valid times associated with search criteria"""
+        if self.columnar:
+            times = self._packed_values("time", pattern, variable, initial_time)
+            return [str(time) for time in times.astype(dt.datetime)]
         # Note: SQL injection possible if not properly escaped
         #       use ? and :name syntax in template
-        environment = jinja2.Environment(extensions=['jinja2.ext.do'])
-        query = environment.from_string("""
+        clause, params = self._glob_clause(pattern)
+        query = render("""
             {% set EQNS = [] %}
             {% if initial_time is not none %}
                {% do EQNS.append('file.reference = :initial_time') %}
             {% endif %}
             {% if pattern is not none %}
-               {% do EQNS.append('file.name GLOB :pattern') %}
+               {% do EQNS.append(clause) %}
             {% endif %}
             {% if variable is not none %}
                {% do EQNS.append('v.name = :variable') %}
@@ -401,29 +1303,35 @@ class Database(Connection):
                 ON v.file_id = file.id
              WHERE {{ EQNS | join(' AND ') }}
              {% endif %}
-        """).render(
-            initial_time=initial_time,
-            variable=variable,
-            pattern=pattern)
+        """,
+            initial_time=_flag(initial_time),
+            variable=_flag(variable),
+            pattern=_flag(pattern),
+            clause=clause)
         self.cursor.execute(query, dict(
+            params,
             variable=variable,
-            pattern=pattern,
             initial_time=initial_time))
         rows = self.cursor.fetchall()
         return [time for time, in rows]
 
+    @cached_query
     def pressures(self, pattern=None, variable=None, initial_time=None):
         """Select pressures from database"""
+        if self.columnar:
+            pressures = self._packed_values(
+                "pressure", pattern, variable, initial_time)
+            return [float(pressure) for pressure in pressures]
         # Note: SQL injection possible if not properly escaped
         #       use ? and :name syntax in template
-        environment = jinja2.Environment(extensions=['jinja2.ext.do'])
-        query = environment.from_string("""
+        clause, params = self._glob_clause(pattern)
+        query = render("""
             {% set EQNS = [] %}
             {% if variable is not none %}
                {% do EQNS.append('v.name = :variable') %}
             {% endif %}
             {% if pattern is not none %}
-               {% do EQNS.append('file.name GLOB :pattern') %}
+               {% do EQNS.append(clause) %}
             {% endif %}
             {% if initial_time is not none %}
                {% do EQNS.append('file.reference = :initial_time') %}
@@ -444,17 +1352,170 @@ class Database(Connection):
               FROM pressure
              ORDER BY value
              {% endif %}
-        """).render(
-            variable=variable,
-            pattern=pattern,
-            initial_time=initial_time)
+        """,
+            variable=_flag(variable),
+            pattern=_flag(pattern),
+            initial_time=_flag(initial_time),
+            clause=clause)
         self.cursor.execute(query, dict(
+            params,
             variable=variable,
-            pattern=pattern,
             initial_time=initial_time))
         rows = self.cursor.fetchall()
         return [time for time, in rows]
 
+    def _packed_values(self, coord, pattern, variable, initial_time):
+        """Distinct values of packed axes matching search criteria"""
+        clause, params = self._glob_clause(pattern)
+        query = render("""
+            {% set EQNS = [] %}
+            {% if variable is not none %}
+               {% do EQNS.append('v.name = :variable') %}
+            {% endif %}
+            {% if pattern is not none %}
+               {% do EQNS.append(clause) %}
+            {% endif %}
+            {% if initial_time is not none %}
+               {% do EQNS.append('file.reference = :initial_time') %}
+            {% endif %}
+            SELECT DISTINCT a.dtype, a.data
+              FROM axis_data AS a
+              JOIN variable AS v
+                ON v.{{ coord }}_data_id = a.id
+              JOIN file
+                ON v.file_id = file.id
+             {% if EQNS %}
+             WHERE {{ EQNS | join(' AND ') }}
+             {% endif %}
+        """,
+            coord=coord,
+            variable=_flag(variable),
+            pattern=_flag(pattern),
+            initial_time=_flag(initial_time),
+            clause=clause)
+        self.cursor.execute(query, dict(
+            params,
+            variable=variable,
+            initial_time=initial_time))
+        arrays = [unpack_axis(dtype, data)
+                  for dtype, data in self.cursor.fetchall()]
+        if len(arrays) == 0:
+            return np.array([], dtype=AXIS_DTYPES[coord])
+        return np.unique(np.concatenate(arrays))
+
+    def valid_times_between(
+            self,
+            start=None,
+            end=None,
+            pattern=None,
+            variable=None,
+            initial_time=None):
+        """Distinct valid times in the closed interval [start, end]
+
+        :returns: sorted datetime64[s] array
+        """
+        if self.columnar:
+            times = self._packed_values("time", pattern, variable, initial_time)
+            mask = np.ones(times.shape, dtype=bool)
+            if start is not None:
+                mask &= times >= np.datetime64(to_epoch(start), 's')
+            if end is not None:
+                mask &= times <= np.datetime64(to_epoch(end), 's')
+            return times[mask]
+        clause, params = self._glob_clause(pattern)
+        query = render("""
+            {% set EQNS = ['time.epoch IS NOT NULL'] %}
+            {% if start is not none %}
+               {% do EQNS.append('time.epoch >= :start') %}
+            {% endif %}
+            {% if end is not none %}
+               {% do EQNS.append('time.epoch <= :end') %}
+            {% endif %}
+            {% set FILTERS = [] %}
+            {% if initial_time is not none %}
+               {% do FILTERS.append('file.reference_epoch = :initial_time') %}
+            {% endif %}
+            {% if pattern is not none %}
+               {% do FILTERS.append(clause) %}
+            {% endif %}
+            {% if variable is not none %}
+               {% do FILTERS.append('v.name = :variable') %}
+            {% endif %}
+            SELECT DISTINCT time.epoch
+              FROM time
+             {% if FILTERS %}
+              JOIN variable_to_time AS vt
+                ON vt.time_id = time.id
+              JOIN variable AS v
+                ON vt.variable_id = v.id
+              JOIN file
+                ON v.file_id = file.id
+             {% endif %}
+             WHERE {{ (EQNS + FILTERS) | join(' AND ') }}
+             ORDER BY time.epoch
+        """,
+            start=_flag(start),
+            end=_flag(end),
+            initial_time=_flag(initial_time),
+            variable=_flag(variable),
+            pattern=_flag(pattern),
+            clause=clause)
+        self.cursor.execute(query, dict(
+            params,
+            start=to_epoch(start),
+            end=to_epoch(end),
+            variable=variable,
+            initial_time=to_epoch(initial_time)))
+        return _datetime64([epoch for epoch, in self.cursor.fetchall()])
+
+    def initial_times_between(self, start=None, end=None, pattern=None):
+        """Distinct initial times in the closed interval [start, end]
+
+        :returns: sorted datetime64[s] array
+        """
+        return self._reference_epochs(start=start, end=end, pattern=pattern)
+
+    def latest_initial_times(self, n, pattern=None):
+        """Most recent n initial times
+
+        :returns: sorted datetime64[s] array
+        """
+        return self._reference_epochs(pattern=pattern, limit=n)
+
+    def _reference_epochs(self, start=None, end=None, pattern=None, limit=None):
+        clause, params = self._glob_clause(pattern)
+        query = render("""
+            {% set EQNS = ['reference_epoch IS NOT NULL'] %}
+            {% if start is not none %}
+               {% do EQNS.append('reference_epoch >= :start') %}
+            {% endif %}
+            {% if end is not none %}
+               {% do EQNS.append('reference_epoch <= :end') %}
+            {% endif %}
+            {% if pattern is not none %}
+               {% do EQNS.append(clause) %}
+            {% endif %}
+            SELECT DISTINCT reference_epoch
+              FROM file
+             WHERE {{ EQNS | join(' AND ') }}
+             ORDER BY reference_epoch DESC
+             {% if limit is not none %}
+             LIMIT :limit
+             {% endif %}
+        """,
+            start=_flag(start),
+            end=_flag(end),
+            pattern=_flag(pattern),
+            limit=_flag(limit),
+            clause=clause)
+        self.cursor.execute(query, dict(
+            params,
+            start=to_epoch(start),
+            end=to_epoch(end),
+            limit=limit))
+        epochs = [epoch for epoch, in self.cursor.fetchall()]
+        return _datetime64(epochs[::-1])
+
     def fetch_times(self, path, variable):
         """Helper method to find times related to a variable"""
         self.cursor.execute("""
@@ -464,15 +1525,20 @@ class Database(Connection):
 
     def insert_times(self, path, variable, times):
         """Helper method to insert a time coordinate related to a variable"""
+        if self.columnar:
+            self.insert_axis_data(path, variable, "time", times)
+            return
         for i, time in enumerate(times):
             self.insert_time(path, variable, time, i)
+        self._delete_navigation(path)
 
     def insert_time(self, path, variable, time, i):
         time = str(time)
         self.insert_variable(path, variable)
         self.cursor.execute("""
-            INSERT OR IGNORE INTO time (i, value) VALUES (:i,:value)
-        """, dict(i=i, value=time))
+            INSERT OR IGNORE INTO time (i, value, epoch)
+            VALUES (:i, :value, :epoch)
+        """, dict(i=i, value=time, epoch=_epoch(time)))
         self.cursor.execute("""
             INSERT OR IGNORE INTO variable_to_time (variable_id, time_id)
             VALUES(
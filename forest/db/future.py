@@ -1,8 +1,41 @@
+"""
+Generic coordinate index
+------------------------
+
+Every named coordinate of a variable, e.g. ``time``, ``pressure``,
+``realization``, ``height`` or ``model_level_number``, is stored
+with the position of its dimension and its values packed into a
+single array shared by all variables with identical values.
+
+:meth:`Database.locate` turns a dict of selections into a path and
+an N-dimensional index tuple without opening the file
+
+>>> database = Database.connect(":memory:")
+>>> database.insert_variable("file.nc", "air_temperature", ndim=3)
+>>> database.insert_coordinate(
+...     "file.nc", "air_temperature", "realization", axis=0,
+...     values=[0, 1, 2])
+>>> database.locate("*.nc", "air_temperature", {"realization": 2})
+('file.nc', (2, slice(None, None, None), slice(None, None, None)))
+
+.. autoclass:: Database
+    :members:
+
+"""
 import sqlite3
+import numpy as np
 import iris
+from forest.exceptions import SearchFail
+from .database import pack_values, unpack_axis
+
+
+__all__ = [
+    "Database",
+]
 
 
 class Database(object):
+    """Index of named coordinates of any dimension"""
     def __init__(self, connection):
         self.connection = connection
         self.cursor = self.connection.cursor()
@@ -17,8 +50,10 @@ class Database(object):
             CREATE TABLE IF NOT EXISTS variable (
                       id INTEGER PRIMARY KEY,
                     name TEXT,
+                    ndim INTEGER,
                  file_id INTEGER,
-                         FOREIGN KEY(file_id) REFERENCES file(id))
+                         FOREIGN KEY(file_id) REFERENCES file(id),
+                         UNIQUE(name, file_id))
         """)
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS coordinate (
@@ -26,7 +61,32 @@ class Database(object):
                     name TEXT,
                     axis INTEGER,
              variable_id INTEGER,
-                         FOREIGN KEY(variable_id) REFERENCES variable(id))
+                 data_id INTEGER,
+                         FOREIGN KEY(variable_id) REFERENCES variable(id),
+                         FOREIGN KEY(data_id) REFERENCES coordinate_data(id),
+                         UNIQUE(name, variable_id))
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS coordinate_data (
+                      id INTEGER PRIMARY KEY,
+                    hash TEXT NOT NULL,
+                   dtype TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                         UNIQUE(hash))
+        """)
+        for table, column in [
+                ("variable", "ndim INTEGER"),
+                ("coordinate", "data_id INTEGER")]:
+            try:
+                self.cursor.execute("""
+                    ALTER TABLE {} ADD COLUMN {}
+                """.format(table, column))
+            except sqlite3.OperationalError:
+                # Column already present
+                pass
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS coordinate_variable
+                ON coordinate (variable_id, name, axis, data_id)
         """)
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS pressure (
@@ -51,11 +111,23 @@ class Database(object):
 
     def insert_netcdf(self, path):
         for cube in iris.load(path):
+            self.insert_variable(path, cube.var_name, ndim=cube.ndim)
             for coord in cube.coords():
+                if coord.ndim > 1:
+                    # Only 1D coordinates can be searched by value
+                    continue
+                dims = cube.coord_dims(coord)
+                axis = dims[0] if len(dims) > 0 else None
+                if coord.units.is_time_reference():
+                    values = [cell.point for cell in coord.cells()]
+                else:
+                    values = coord.points
                 self.insert_coordinate(
                     path,
                     cube.var_name,
-                    coord.name())
+                    coord.name(),
+                    axis=axis,
+                    values=values)
 
     def insert_pressure(self, path, variable, values):
         self.cursor.executemany("""
@@ -75,13 +147,23 @@ class Database(object):
             path,
             variable,
             name,
-            axis=None):
+            axis=None,
+            values=None):
+        """Store coordinate, its dimension and optionally its values"""
         self.insert_variable(path, variable)
+        data_id = None
+        if values is not None:
+            try:
+                data_id = self._insert_data(values)
+            except ValueError:
+                # Labels and non-standard calendars are not searchable
+                data_id = None
         self.cursor.execute("""
-            INSERT INTO coordinate (name, axis, variable_id)
+            INSERT OR REPLACE INTO coordinate (name, axis, data_id, variable_id)
             VALUES(
                 :name,
                 :axis,
+                :data_id,
                 (SELECT v.id
                    FROM variable AS v
                    JOIN file AS f
@@ -92,7 +174,142 @@ class Database(object):
             path=path,
             variable=variable,
             name=name,
-            axis=axis))
+            axis=axis,
+            data_id=data_id))
+
+    def _insert_data(self, values):
+        digest, dtype, data = pack_values(values)
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO coordinate_data (hash, dtype, data)
+            VALUES (:hash, :dtype, :data)
+        """, dict(hash=digest, dtype=dtype, data=data))
+        self.cursor.execute("""
+            SELECT id FROM coordinate_data WHERE hash = :hash
+        """, dict(hash=digest))
+        data_id, = self.cursor.fetchone()
+        return data_id
+
+    def values(self, path, variable, coordinate):
+        """Coordinate values related to a variable in a file
+
+        :returns: numpy array or None if values not stored
+        """
+        self.cursor.execute("""
+            SELECT d.dtype, d.data
+              FROM coordinate AS c
+              JOIN variable AS v
+                ON c.variable_id = v.id
+              JOIN file AS f
+                ON v.file_id = f.id
+              JOIN coordinate_data AS d
+                ON d.id = c.data_id
+             WHERE f.name = :path
+               AND v.name = :variable
+               AND c.name = :coordinate
+        """, dict(path=path, variable=variable, coordinate=coordinate))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        return unpack_axis(*row)
+
+    def coordinate_values(self, pattern, variable, coordinate):
+        """Distinct values of a coordinate across files matching pattern
+
+        :returns: sorted numpy array
+        """
+        self.cursor.execute("""
+            SELECT DISTINCT d.dtype, d.data
+              FROM coordinate AS c
+              JOIN variable AS v
+                ON c.variable_id = v.id
+              JOIN file AS f
+                ON v.file_id = f.id
+              JOIN coordinate_data AS d
+                ON d.id = c.data_id
+             WHERE f.name GLOB :pattern
+               AND v.name = :variable
+               AND c.name = :coordinate
+        """, dict(pattern=pattern, variable=variable, coordinate=coordinate))
+        arrays = [unpack_axis(dtype, data)
+                  for dtype, data in self.cursor.fetchall()]
+        if len(arrays) == 0:
+            return np.array([])
+        return np.unique(np.concatenate(arrays))
+
+    def locate(self, pattern, variable, selections, tolerance=0.001):
+        """Find file and index given values of any coordinates
+
+        Coordinates that share a dimension, e.g. time and pressure
+        stored along one axis, must all match at the same index.
+        Dimensions without a selection are returned as full slices
+
+        :param selections: dict mapping coordinate name to value
+        :param tolerance: absolute tolerance used to compare numbers
+        :returns: (path, tuple of ints and slices)
+        :raises SearchFail: if no file contains the selection
+        """
+        names = sorted(selections)
+        placeholders = ", ".join(":c{}".format(i) for i in range(len(names)))
+        self.cursor.execute("""
+            SELECT f.name, v.ndim, c.name, c.axis, d.dtype, d.data
+              FROM file AS f
+              JOIN variable AS v
+                ON v.file_id = f.id
+              LEFT JOIN coordinate AS c
+                ON c.variable_id = v.id
+               AND c.name IN ({})
+              LEFT JOIN coordinate_data AS d
+                ON d.id = c.data_id
+             WHERE f.name GLOB :pattern
+               AND v.name = :variable
+             ORDER BY f.name
+        """.format(placeholders or "NULL"), dict(
+            {"c{}".format(i): name for i, name in enumerate(names)},
+            pattern=pattern,
+            variable=variable))
+        files = {}
+        for path, ndim, name, axis, dtype, data in self.cursor.fetchall():
+            coords = files.setdefault(path, (ndim, {}))[1]
+            if name is not None:
+                coords[name] = (axis, dtype, data)
+        for path, (ndim, coords) in files.items():
+            index = self._index(ndim, coords, selections, tolerance)
+            if index is not None:
+                return path, index
+        raise SearchFail("Could not locate: {} {}".format(pattern, selections))
+
+    @staticmethod
+    def _index(ndim, coords, selections, tolerance):
+        """N-dimensional index of selections or None if not present"""
+        masks = {}
+        for name, value in selections.items():
+            if name not in coords:
+                return None
+            axis, dtype, data = coords[name]
+            if data is None:
+                return None
+            values = unpack_axis(dtype, data)
+            if values.dtype.kind == "M":
+                mask = values == np.datetime64(str(value), "s")
+            else:
+                mask = np.abs(values - value) < tolerance
+            if axis is None:
+                # Scalar coordinate must match but adds no dimension
+                if not mask.any():
+                    return None
+                continue
+            if axis in masks:
+                mask = masks[axis] & mask
+            masks[axis] = mask
+        if ndim is None:
+            ndim = max(masks, default=-1) + 1
+        index = [slice(None)] * ndim
+        for axis, mask in masks.items():
+            points = np.flatnonzero(mask)
+            if len(points) == 0:
+                return None
+            index[axis] = int(points[0])
+        return tuple(index)
 
     def coordinates(self, path, variable):
         self.cursor.execute("""
@@ -104,6 +321,7 @@ class Database(object):
                 ON v.file_id = f.id
              WHERE f.name = :path
                AND v.name = :variable
+             ORDER BY c.id
         """, dict(path=path, variable=variable))
         rows = self.cursor.fetchall()
         return [name for name, in rows]
@@ -134,12 +352,18 @@ class Database(object):
             name=name,
             initial_time=initial_time))
 
-    def insert_variable(self, path, variable):
+    def insert_variable(self, path, variable, ndim=None):
         self.insert_file_name(path)
         self.cursor.execute("""
-            INSERT INTO variable (name, file_id)
+            INSERT OR IGNORE INTO variable (name, file_id)
             VALUES(:variable, (SELECT id FROM file WHERE name = :path))
         """, dict(path=path, variable=variable))
+        if ndim is not None:
+            self.cursor.execute("""
+                UPDATE variable SET ndim = :ndim
+                 WHERE name = :variable
+                   AND file_id = (SELECT id FROM file WHERE name = :path)
+            """, dict(path=path, variable=variable, ndim=ndim))
 
     def file_names(self, initial_time=None):
         if initial_time is None:
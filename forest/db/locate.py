@@ -1,7 +1,9 @@
 import os
+import sqlite3
 from functools import lru_cache
 import numpy as np
 from .connection import Connection
+from .database import glob_clause, unpack_axis, to_epoch
 from forest.exceptions import SearchFail
 
 
@@ -16,6 +18,20 @@ class Locator(Connection):
         self.directory = directory
         self.connection = connection
         self.cursor = self.connection.cursor()
+        self.columnar = self._storage() == "packed"
+
+    def _storage(self):
+        try:
+            self.cursor.execute("""
+                SELECT value FROM setting WHERE name = 'coordinates'
+            """)
+        except sqlite3.OperationalError:
+            # Database created before storage setting introduced
+            return "rows"
+        row = self.cursor.fetchone()
+        if row is None:
+            return "rows"
+        return row[0]
 
     def locate(
             self,
@@ -25,49 +41,124 @@ class Locator(Connection):
             valid_time,
             pressure=None,
             tolerance=0.001):
+        row = self.navigate(
+            pattern,
+            variable,
+            initial_time,
+            valid_time,
+            pressure,
+            tolerance)
+        if row is not None:
+            file_name, i, j = row
+            return self._path(file_name), tuple(
+                int(k) for k in (i, j) if k is not None)
         valid_time64 = np.datetime64(valid_time, 's')
         for file_name in self.file_names(
                 pattern,
                 variable,
                 initial_time,
                 valid_time):
-            if self.directory is not None:
-                # HACK: consider refactor
-                path = os.path.join(self.directory, os.path.basename(file_name))
-            else:
-                path = file_name
-            ta, pa = self.axes(file_name, variable)
+            path = self._path(file_name)
+            ta, pa, times, pressures = self.coordinates(file_name, variable)
+            if times is not None:
+                time_mask = times == valid_time64
+                if not time_mask.any():
+                    continue
             if (ta is None) and (pa is None):
                 return path, ()
-            elif (ta is None) and (pa is not None):
+            if pa is not None:
                 if pressure is None:
                     raise SearchFail("Need pressure to search pressure axis")
-                pressures = self.coordinate(file_name, variable, "pressure")
-                i = np.where(np.abs(pressures - pressure) < tolerance)[0][0]
+                pressure_mask = np.abs(pressures - pressure) < tolerance
+                if not pressure_mask.any():
+                    continue
+            if (ta is None) and (pa is not None):
+                i = np.where(pressure_mask)[0][0]
                 return path, (i,)
             elif (ta is not None) and (pa is None):
-                times = self.coordinate(file_name, variable, "time")
-                i = np.where(times == valid_time64)[0][0]
+                i = np.where(time_mask)[0][0]
                 return path, (i,)
             elif (ta is not None) and (pa is not None):
-                if pressure is None:
-                    raise SearchFail("Need pressure to search pressure axis")
-                times = self.coordinate(file_name, variable, "time")
-                pressures = self.coordinate(file_name, variable, "pressure")
                 if (ta == 0) and (pa == 0):
-                    pts = np.where(
-                        (times == valid_time64) &
-                        (np.abs(pressures - pressure) < tolerance))
+                    pts = np.where(time_mask & pressure_mask)
                     i = pts[0][0]
                     return path, (i,)
                 else:
-                    ti = np.where(times == valid_time64)[0][0]
-                    pi = np.where(np.abs(pressures - pressure) < tolerance)[0][0]
+                    ti = np.where(time_mask)[0][0]
+                    pi = np.where(pressure_mask)[0][0]
                     return path, (ti, pi)
         raise SearchFail("Could not locate: {}".format(pattern))
 
+    def _path(self, file_name):
+        if self.directory is not None:
+            # HACK: consider refactor
+            return os.path.join(self.directory, os.path.basename(file_name))
+        return file_name
+
+    def navigate(
+            self,
+            pattern,
+            variable,
+            initial_time,
+            valid_time,
+            pressure=None,
+            tolerance=0.001):
+        """Single indexed lookup in the materialised navigation table
+
+        :returns: (file_name, time_index, pressure_index) or None
+        """
+        clause, params = glob_clause(pattern, table="f")
+        if pressure is None:
+            pressure_clause = "n.pressure IS NULL"
+        else:
+            # Surface variables have no pressure to match
+            pressure_clause = ("(n.pressure BETWEEN :lower AND :upper"
+                               " OR n.pressure IS NULL)")
+            params = dict(
+                params,
+                lower=pressure - tolerance,
+                upper=pressure + tolerance)
+        try:
+            self.cursor.execute("""
+                SELECT f.name, n.time_index, n.pressure_index
+                  FROM navigation AS n
+                  JOIN file AS f
+                    ON f.id = n.file_id
+                 WHERE n.variable = :variable
+                   AND n.reference = :reference
+                   AND n.valid = :valid
+                   AND {}
+                   AND {}
+                 LIMIT 1
+            """.format(pressure_clause, clause), dict(
+                params,
+                variable=variable,
+                reference=to_epoch(initial_time),
+                valid=to_epoch(valid_time)))
+        except sqlite3.OperationalError:
+            # Database created before navigation table introduced
+            return None
+        return self.cursor.fetchone()
+
     @lru_cache()
     def file_names(self, pattern, variable, initial_time, valid_time):
+        clause, params = glob_clause(pattern, table="f")
+        if self.columnar:
+            # Valid time checked against packed axis by locate
+            self.cursor.execute("""
+                SELECT f.name
+                  FROM file AS f
+                  JOIN variable AS v
+                    ON v.file_id = f.id
+                 WHERE {}
+                   AND f.reference = :initial_time
+                   AND v.name = :variable
+            """.format(clause), dict(
+                params,
+                variable=variable,
+                initial_time=initial_time,
+            ))
+            return [file_name for file_name, in self.cursor.fetchall()]
         self.cursor.execute("""
             SELECT DISTINCT(f.name)
               FROM file AS f
@@ -77,18 +168,62 @@ class Locator(Connection):
                 ON vt.variable_id = v.id
               JOIN time AS t
                 ON t.id = vt.time_id
-             WHERE f.name GLOB :pattern
+             WHERE {}
                AND f.reference = :initial_time
                AND v.name = :variable
                AND t.value = :valid_time
-        """, dict(
-            pattern=pattern,
+        """.format(clause), dict(
+            params,
             variable=variable,
             initial_time=initial_time,
             valid_time=valid_time,
         ))
         return [file_name for file_name, in self.cursor.fetchall()]
 
+    @lru_cache()
+    def coordinates(self, file_name, variable):
+        """Axes and coordinate values related to a variable
+
+        Packed axes are read in a single query, axes stored one
+        row per value are assembled by :meth:`coordinate`
+
+        :returns: (time_axis, pressure_axis, times, pressures)
+        """
+        self.cursor.execute("""
+            SELECT v.time_axis,
+                   v.pressure_axis,
+                   t.dtype,
+                   t.data,
+                   p.dtype,
+                   p.data
+              FROM file AS f
+              JOIN variable AS v
+                ON v.file_id = f.id
+              LEFT JOIN axis_data AS t
+                ON t.id = v.time_data_id
+              LEFT JOIN axis_data AS p
+                ON p.id = v.pressure_data_id
+             WHERE f.name = :file_name
+               AND v.name = :variable
+        """, dict(
+            file_name=file_name,
+            variable=variable
+        ))
+        ta, pa, t_dtype, t_data, p_dtype, p_data = self.cursor.fetchone()
+        if t_data is not None:
+            times = unpack_axis(t_dtype, t_data)
+        elif ta is not None:
+            times = self.coordinate(file_name, variable, "time")
+        else:
+            times = None
+        if p_data is not None:
+            pressures = unpack_axis(p_dtype, p_data)
+        elif pa is not None:
+            pressures = self.coordinate(file_name, variable, "pressure")
+        else:
+            pressures = None
+        return ta, pa, times, pressures
+
     @lru_cache()
     def coordinate(self, file_name, variable, coord):
         if coord == "pressure":
@@ -1,6 +1,20 @@
 #!/usr/bin/env python3
 import argparse
+import os
+import sys
 from . import database as db
+from . import bulk
+from . import profile
+from . import retention
+from . import watch
+
+
+# Sub-commands, e.g. forestdb watch --database file.db PATTERN
+COMMANDS = {
+    "prune": retention.main,
+    "report": profile.main,
+    "watch": watch.main,
+}
 
 
 def parse_args(argv=None, parser=None):
@@ -14,16 +28,61 @@ def add_arguments(parser):
         "--database", required=True,
         help="database file to write/extend")
     parser.add_argument(
-        "paths", nargs="+", metavar="FILE",
+        "--bulk", action="store_true",
+        help="read NetCDF headers only and write one transaction per file")
+    parser.add_argument(
+        "--processes", type=int, metavar="N",
+        help="number of worker processes used by --bulk")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="skip files whose size and mtime are unchanged")
+    parser.add_argument(
+        "--columnar", action="store_true",
+        help="store coordinates as packed arrays when creating database")
+    parser.add_argument(
+        "--rebuild-navigation", action="store_true",
+        help="re-materialise navigation table for all files")
+    parser.add_argument(
+        "paths", nargs="*", metavar="FILE",
         help="unified model netcdf files")
 
 
 def main(argv=None, args=None):
     if args is None:
+        if argv is None:
+            argv = sys.argv[1:]
+        if (len(argv) > 0) and (argv[0] in COMMANDS):
+            return COMMANDS[argv[0]](argv[1:])
         args = parse_args(argv=argv)
-    with db.Database.connect(args.database) as database:
-        for path in args.paths:
-            database.insert_netcdf(path)
+    columnar = True if args.columnar else None
+    with db.Database.connect(args.database, columnar=columnar) as database:
+        paths = args.paths
+        if args.incremental:
+            paths = changed_paths(paths, database.file_stats())
+        if args.bulk:
+            for header in bulk.read_headers(paths,
+                                            processes=args.processes):
+                database.insert_header(header)
+        else:
+            for path in paths:
+                database.insert_netcdf(path)
+                stat = os.stat(path)
+                database.insert_file_stat(path, stat.st_size, stat.st_mtime)
+        if args.rebuild_navigation:
+            database.rebuild_navigation()
+
+
+def changed_paths(paths, stats):
+    """Paths that are new or whose size/mtime differs from stats
+
+    :param stats: dict mapping path to (size, mtime)
+    """
+    result = []
+    for path in paths:
+        stat = os.stat(path)
+        if stats.get(path) != (stat.st_size, stat.st_mtime):
+            result.append(path)
+    return result
 
 
 if __name__ == '__main__':
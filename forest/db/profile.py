@@ -0,0 +1,388 @@
+"""
+Query profiling
+---------------
+
+Opt-in instrumentation of the SQL run by :mod:`forest.db` and the
+EIDA50 driver. Every statement is timed from ``execute`` until its
+rows have been fetched. Latencies are collected in a histogram per
+query shape, i.e. the SQL text with whitespace collapsed. Statements
+slower than a threshold are logged with their bound parameters and
+``EXPLAIN QUERY PLAN`` output.
+
+Profiling is enabled by setting environment variables before the
+server starts
+
+.. code-block:: sh
+
+    export FOREST_DB_PROFILE=/tmp/forest-sql.json
+    export FOREST_DB_SLOW_QUERY=0.05  # seconds, default 0.1
+
+The statistics are written to ``FOREST_DB_PROFILE`` by a background
+thread once a minute and at exit, never while a query is being
+recorded, and summarised by
+
+.. code-block:: sh
+
+    forestdb report /tmp/forest-sql.json
+
+.. autoclass:: Profiler
+    :members:
+
+.. autofunction:: enable
+
+.. autofunction:: wrap
+
+"""
+import argparse
+import atexit
+import bisect
+import collections
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+
+__all__ = [
+    "Profiler",
+]
+
+
+# Upper bounds of histogram buckets in seconds
+BUCKETS = [
+    0.0001, 0.0003,
+    0.001, 0.003,
+    0.01, 0.03,
+    0.1, 0.3,
+    1., 3.,
+    float("inf")]
+
+
+PROFILER = None
+
+
+def shape(sql):
+    """Query text with whitespace collapsed
+
+    >>> shape('''
+    ...     SELECT name
+    ...       FROM file''')
+    'SELECT name FROM file'
+    """
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+class Profiler:
+    """Latency histograms per query shape and a log of slow queries
+
+    :param threshold: seconds above which statements are logged
+    :param path: JSON file written by :meth:`dump`
+    :param interval: seconds between dumps made by :meth:`start`
+    :param maxlen: number of slow queries kept
+    """
+    def __init__(self, threshold=0.1, path=None, interval=60., maxlen=100):
+        self.threshold = threshold
+        self.path = path
+        self.interval = interval
+        self.stats = {}
+        self.slow = collections.deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, connection, sql, params, seconds):
+        """Add a timed statement, explain it if it was slow"""
+        key = shape(sql)
+        with self._lock:
+            try:
+                stats = self.stats[key]
+            except KeyError:
+                stats = {
+                    "count": 0,
+                    "total": 0.,
+                    "max": 0.,
+                    "histogram": [0] * len(BUCKETS)}
+                self.stats[key] = stats
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["histogram"][bisect.bisect_left(BUCKETS, seconds)] += 1
+        if seconds >= self.threshold:
+            plan = explain(connection, sql, params)
+            entry = {
+                "sql": key,
+                "params": _jsonable(params),
+                "seconds": seconds,
+                "plan": plan}
+            with self._lock:
+                self.slow.append(entry)
+            print("slow query: {:.3f}s {} {}".format(
+                seconds, key, entry["params"]))
+            for line in plan:
+                print("    {}".format(line))
+
+    def start(self):
+        """Dump statistics every interval from a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop background dumps"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.dump()
+            except OSError as error:
+                print("profile dump failed: {}".format(error))
+
+    def data(self):
+        """Statistics and slow queries suitable for JSON"""
+        with self._lock:
+            return {
+                "buckets": [str(b) for b in BUCKETS],
+                "stats": {k: dict(v) for k, v in self.stats.items()},
+                "slow": list(self.slow)}
+
+    def dump(self, path=None):
+        """Write statistics to JSON file"""
+        if path is None:
+            path = self.path
+        data = self.data()
+        # Unique name so the periodic and exit dumps do not collide
+        with tempfile.NamedTemporaryFile(
+                "w", dir=os.path.dirname(os.path.abspath(path)),
+                suffix=".tmp", delete=False) as stream:
+            json.dump(data, stream)
+        os.replace(stream.name, path)
+
+
+def explain(connection, sql, params):
+    """EXPLAIN QUERY PLAN output as a list of lines"""
+    if not shape(sql).upper().startswith(("SELECT", "WITH")):
+        return []
+    try:
+        rows = connection.execute(
+            "EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+    except Exception as error:
+        return ["explain failed: {}".format(error)]
+    return [row[-1] for row in rows]
+
+
+def _jsonable(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {k: _jsonable_value(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_jsonable_value(v) for v in params]
+    return str(params)
+
+
+def _jsonable_value(value):
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    if isinstance(value, bytes):
+        return "<{} bytes>".format(len(value))
+    return str(value)
+
+
+class ProfiledCursor:
+    """Cursor that reports statement times to a :class:`Profiler`"""
+    def __init__(self, cursor, connection, profiler):
+        self._cursor = cursor
+        self._connection = connection
+        self._profiler = profiler
+        self._pending = None
+
+    def execute(self, sql, params=()):
+        self._finish()
+        start = time.perf_counter()
+        self._cursor.execute(sql, params)
+        self._pending = [sql, params, time.perf_counter() - start]
+        return self
+
+    def executemany(self, sql, seq):
+        self._finish()
+        start = time.perf_counter()
+        self._cursor.executemany(sql, seq)
+        self._profiler.record(
+            self._connection, sql, None, time.perf_counter() - start)
+        return self
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone, done=False)
+
+    def fetchmany(self, *args):
+        return self._fetch(lambda: self._cursor.fetchmany(*args), done=False)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall, done=True)
+
+    def _fetch(self, method, done):
+        start = time.perf_counter()
+        result = method()
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - start
+            if done:
+                self._finish()
+        return result
+
+    def _finish(self):
+        if self._pending is None:
+            return
+        sql, params, seconds = self._pending
+        self._pending = None
+        self._profiler.record(self._connection, sql, params, seconds)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __del__(self):
+        # Statements read with fetchone are recorded when discarded
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._cursor, name)
+
+
+class ProfiledConnection:
+    """Connection whose cursors report to a :class:`Profiler`"""
+    def __init__(self, connection, profiler):
+        self._connection = connection
+        self._profiler = profiler
+
+    def cursor(self):
+        return ProfiledCursor(
+            self._connection.cursor(), self._connection, self._profiler)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+    def __enter__(self):
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        return self._connection.__exit__(*args)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._connection, name)
+
+
+def enable(threshold=0.1, path=None):
+    """Profile connections created from now on
+
+    :returns: :class:`Profiler`
+    """
+    global PROFILER
+    PROFILER = Profiler(threshold=threshold, path=path)
+    if path is not None:
+        PROFILER.start()
+        atexit.register(PROFILER.dump)
+    return PROFILER
+
+
+def disable():
+    global PROFILER
+    if PROFILER is not None:
+        PROFILER.stop()
+    PROFILER = None
+
+
+def wrap(connection):
+    """Instrument sqlite3 connection if profiling is enabled"""
+    if PROFILER is None:
+        return connection
+    return ProfiledConnection(connection, PROFILER)
+
+
+def _from_environment(environ):
+    path = environ.get("FOREST_DB_PROFILE")
+    if path:
+        threshold = float(environ.get("FOREST_DB_SLOW_QUERY", 0.1))
+        enable(threshold=threshold, path=path)
+
+
+_from_environment(os.environ)
+
+
+def percentile(histogram, q):
+    """Upper bound of histogram bucket containing percentile q"""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    count = 0
+    for bound, n in zip(BUCKETS, histogram):
+        count += n
+        if count >= q * total:
+            return bound
+    return BUCKETS[-1]
+
+
+def report(data, top=20):
+    """Lines summarising data written by :meth:`Profiler.dump`"""
+    lines = ["{:>8} {:>10} {:>10} {:>10} {:>10}  {}".format(
+        "count", "mean ms", "p95 ms", "max ms", "total s", "query")]
+    items = sorted(data["stats"].items(),
+                   key=lambda item: item[1]["total"], reverse=True)
+    for sql, stats in items[:top]:
+        p95 = percentile(stats["histogram"], 0.95)
+        lines.append("{:>8} {:>10.3f} {:>10} {:>10.3f} {:>10.3f}  {}".format(
+            stats["count"],
+            1000 * stats["total"] / stats["count"],
+            "<{:g}".format(1000 * p95) if p95 is not None else "-",
+            1000 * stats["max"],
+            stats["total"],
+            sql))
+    if len(data["slow"]) > 0:
+        lines.append("")
+        lines.append("slow queries:")
+    for entry in data["slow"]:
+        lines.append("{:.3f}s {} {}".format(
+            entry["seconds"], entry["sql"], entry["params"]))
+        for line in entry["plan"]:
+            lines.append("    {}".format(line))
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="forestdb report")
+    parser.add_argument(
+        "path", metavar="FILE",
+        help="JSON file written when FOREST_DB_PROFILE is set")
+    parser.add_argument(
+        "--top", type=int, default=20, metavar="N",
+        help="number of query shapes to show ordered by total time")
+    return parser.parse_args(args=argv)
+
+
+def main(argv=None):
+    args = parse_args(argv=argv)
+    with open(args.path) as stream:
+        data = json.load(stream)
+    for line in report(data, top=args.top):
+        print(line)
@@ -0,0 +1,128 @@
+"""
+In-memory replica
+-----------------
+
+Navigation queries are answered many times per session. A
+:class:`Replica` copies the catalogue into an in-memory SQLite
+database using the backup API so that interactive queries never
+touch the disk or wait for the housekeeping job to release its lock.
+
+A background thread polls the size and modification time of the
+database file and its write-ahead log. If either changes a fresh
+copy is made and swapped in with a single assignment, queries in
+progress finish against the previous copy.
+
+.. autoclass:: Replica
+    :members:
+
+"""
+import os
+import sqlite3
+import threading
+from . import profile
+from .connection import connect_read_only
+from .database import Database
+
+
+__all__ = [
+    "Replica",
+]
+
+
+INTERVAL = 60.
+
+
+def load(path):
+    """Copy database file into a new in-memory connection"""
+    source = connect_read_only(path)
+    target = sqlite3.connect(":memory:", check_same_thread=False)
+    try:
+        if hasattr(source, "backup"):
+            source.backup(target)
+        else:
+            # Connection.backup needs Python 3.7
+            target.executescript("\n".join(source.iterdump()))
+    finally:
+        source.close()
+    return profile.wrap(target)
+
+
+def signature(path):
+    """Size and modification time of database file and write-ahead log"""
+    result = []
+    for name in [path, path + "-wal"]:
+        try:
+            stat = os.stat(name)
+        except FileNotFoundError:
+            result.append(None)
+            continue
+        if stat.st_size == 0:
+            # Empty log created by readers holds no changes
+            result.append(None)
+            continue
+        result.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(result)
+
+
+class Replica:
+    """In-memory copy of a database file kept up to date in the background
+
+    Attribute access is delegated to the current
+    :class:`forest.db.Database` copy, e.g. ``replica.valid_times(...)``
+
+    :param path: database file
+    :param interval: seconds between checks for changes, None disables
+                     background refresh
+    """
+    def __init__(self, path, interval=INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.database = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refresh()
+        if interval is not None:
+            self.start()
+
+    def refresh(self):
+        """Copy database if it has changed since the last copy
+
+        :returns: True if a new copy was made
+        """
+        with self._lock:
+            current = signature(self.path)
+            if (self.database is not None) and (current == self._signature):
+                return False
+            database = Database(load(self.path))
+            self.database = database
+            self._signature = current
+            return True
+
+    def start(self):
+        """Poll for changes in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except sqlite3.Error as error:
+                print("replica refresh failed: {}".format(error))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.database, name)
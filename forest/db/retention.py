@@ -0,0 +1,179 @@
+"""
+Retention
+---------
+
+Old forecast runs are removed from the catalogue so that query
+times stay bounded on long-running deployments. Files can be
+expired by age of their initial time, by keeping only the most
+recent runs of each pattern or both.
+
+.. code-block:: sh
+
+    forestdb prune --database file.db --max-age 14 --keep 8 "*ga7*.nc"
+
+.. autofunction:: expired
+
+.. autofunction:: prune
+
+.. autofunction:: vacuum
+
+"""
+import argparse
+import datetime as dt
+from .database import Database, glob_clause, to_epoch
+
+
+__all__ = [
+    "expired",
+    "prune",
+    "vacuum",
+]
+
+
+def expired(database, pattern=None, max_age=None, keep=None, now=None):
+    """File names that fall outside the retention policy
+
+    Files without an initial time are never expired
+
+    :param database: :class:`forest.db.Database`
+    :param pattern: glob pattern, None matches all files
+    :param max_age: datetime.timedelta, files with older initial times
+                    are expired
+    :param keep: number of most recent initial times to keep
+    :param now: datetime used to compute age, defaults to utcnow
+    :returns: sorted list of file names
+    """
+    if now is None:
+        now = dt.datetime.utcnow()
+    clause, params = ("1", {}) if pattern is None else glob_clause(pattern)
+    conditions = []
+    if max_age is not None:
+        conditions.append("file.reference_epoch < :oldest")
+        params["oldest"] = to_epoch(now - max_age)
+    if keep is not None:
+        conditions.append("""
+            file.reference_epoch NOT IN (
+                SELECT DISTINCT reference_epoch
+                  FROM file
+                 WHERE reference_epoch IS NOT NULL
+                   AND {}
+                 ORDER BY reference_epoch DESC
+                 LIMIT :keep)""".format(clause))
+        params["keep"] = keep
+    if len(conditions) == 0:
+        return []
+    database.cursor.execute("""
+        SELECT file.name
+          FROM file
+         WHERE file.reference_epoch IS NOT NULL
+           AND {}
+           AND ({})
+         ORDER BY file.name
+    """.format(clause, " OR ".join(conditions)), params)
+    return [name for name, in database.cursor.fetchall()]
+
+
+def prune(database, patterns=None, max_age=None, keep=None, now=None,
+          dry_run=False):
+    """Remove expired files and coordinates no longer in use
+
+    :param patterns: list of glob patterns, each keeps its own runs
+    :param dry_run: report expired files without removing them
+    :returns: list of expired file names
+    """
+    if patterns is None:
+        patterns = [None]
+    names = set()
+    for pattern in patterns:
+        names.update(expired(
+            database,
+            pattern=pattern,
+            max_age=max_age,
+            keep=keep,
+            now=now))
+    names = sorted(names)
+    if dry_run:
+        return names
+    with database.connection:
+        database.delete_files(names)
+        database.delete_orphans()
+    return names
+
+
+def vacuum(connection, pages=None, full=False):
+    """Return free pages to the file system
+
+    Only an incremental vacuum runs by default. Databases created
+    before incremental vacuum was enabled need a one-off full
+    VACUUM, which rewrites the whole file while holding an
+    exclusive lock, so it only runs if asked for
+
+    :param connection: sqlite3 connection
+    :param pages: maximum number of pages to free, None frees all
+    :param full: convert to incremental vacuum with a full VACUUM
+    """
+    mode, = connection.execute("PRAGMA auto_vacuum").fetchone()
+    connection.commit()
+    if full:
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("VACUUM")
+        return
+    if mode != 2:
+        print("incremental vacuum not enabled, run with --vacuum once")
+    if pages is None:
+        connection.execute("PRAGMA incremental_vacuum").fetchall()
+    else:
+        connection.execute(
+            "PRAGMA incremental_vacuum({:d})".format(pages)).fetchall()
+    connection.commit()
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--database", required=True,
+        help="database file to prune")
+    parser.add_argument(
+        "--max-age", type=float, metavar="DAYS",
+        help="remove files with initial times older than DAYS")
+    parser.add_argument(
+        "--keep", type=int, metavar="N",
+        help="keep the N most recent initial times of each pattern")
+    parser.add_argument(
+        "--vacuum", action="store_true",
+        help="rewrite the database with a full VACUUM, locks the file")
+    parser.add_argument(
+        "--vacuum-pages", type=int, metavar="N",
+        help="maximum number of free pages returned to the file system")
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="list files that would be removed")
+    parser.add_argument(
+        "patterns", nargs="*", metavar="PATTERN",
+        help="glob patterns whose runs are counted separately")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="forestdb prune")
+    add_arguments(parser)
+    return parser.parse_args(args=argv)
+
+
+def main(argv=None, args=None):
+    if args is None:
+        args = parse_args(argv=argv)
+    max_age = None
+    if args.max_age is not None:
+        max_age = dt.timedelta(days=args.max_age)
+    with Database.connect(args.database) as database:
+        names = prune(
+            database,
+            patterns=args.patterns or None,
+            max_age=max_age,
+            keep=args.keep,
+            dry_run=args.dry_run)
+        for name in names:
+            print("{}: {}".format(
+                "expired" if args.dry_run else "removed", name))
+        if not args.dry_run:
+            vacuum(database.connection, pages=args.vacuum_pages,
+                   full=args.vacuum)
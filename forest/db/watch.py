@@ -0,0 +1,183 @@
+"""
+Watch
+-----
+
+Long-running alternative to the housekeeping cron job. Directories
+matching the watched patterns are polled, only directories whose
+modification time has changed are listed again and only files
+that are new, still pending or previously unreadable are checked,
+so the cost of a poll does not grow with the number of indexed
+files. Files rewritten in place under an indexed name are picked
+up by the housekeeping job, e.g. ``forestdb --incremental``.
+
+Files are indexed once their size and modification time have
+not changed for ``settle`` seconds, so that partially written
+files are skipped until complete. Ready files are written in
+batches, one transaction per batch. Files that can not be read
+are tried again only once their size or modification time change.
+
+.. code-block:: sh
+
+    forestdb watch --database file.db "/data/*ga7*.nc"
+
+.. autoclass:: Watcher
+    :members:
+
+"""
+import argparse
+import glob
+import os
+import time
+from . import bulk
+from .database import Database, split_pattern
+
+
+__all__ = [
+    "Watcher",
+]
+
+
+class Watcher:
+    """Detect new or changed files matching glob patterns
+
+    :param patterns: list of glob patterns
+    :param stats: dict mapping path to (size, mtime) of indexed files
+    :param settle: seconds a file must be unchanged before it is ready
+    :param clock: function returning seconds, used for testing
+    """
+    def __init__(self, patterns, stats=None, settle=30., clock=time.monotonic):
+        if stats is None:
+            stats = {}
+        self.patterns = patterns
+        self.stats = dict(stats)
+        self.settle = settle
+        self.clock = clock
+        self.pending = {}
+        self.failures = {}
+        self._directories = {}
+        self._paths = {}
+
+    def poll(self):
+        """Check directories and pending files for changes
+
+        :returns: list of paths that have settled and need indexing
+        """
+        now = self.clock()
+        for pattern in self.patterns:
+            for path in self._glob(pattern):
+                if (path in self.pending) or (path in self.stats):
+                    continue
+                self._observe(path, now)
+        ready = []
+        for path in list(self.pending):
+            stat = self._observe(path, now)
+            if stat is None:
+                continue
+            _, since = self.pending[path]
+            if (now - since) >= self.settle:
+                del self.pending[path]
+                ready.append(path)
+        return sorted(ready)
+
+    def _glob(self, pattern):
+        """Paths matching pattern, listed again only if directory changed"""
+        directory, _ = split_pattern(pattern)
+        if directory is None:
+            # Wildcards in directory names, no cheap way to detect changes
+            return glob.glob(pattern)
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        if self._directories.get(pattern) != mtime:
+            self._directories[pattern] = mtime
+            self._paths[pattern] = glob.glob(pattern)
+        return self._paths[pattern]
+
+    def _observe(self, path, now):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.pending.pop(path, None)
+            return None
+        key = (stat.st_size, stat.st_mtime)
+        if key in (self.stats.get(path), self.failures.get(path)):
+            self.pending.pop(path, None)
+            return None
+        previous = self.pending.get(path)
+        if (previous is None) or (previous[0] != key):
+            # New file or still being written
+            self.pending[path] = (key, now)
+        return key
+
+    def done(self, header):
+        """Record that a file has been indexed"""
+        self.stats[header.path] = (header.size, header.mtime)
+        self.failures.pop(header.path, None)
+
+    def fail(self, path):
+        """Record that a file could not be read in its current state"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        self.failures[path] = (stat.st_size, stat.st_mtime)
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--database", required=True,
+        help="database file to write/extend")
+    parser.add_argument(
+        "--interval", type=float, default=5., metavar="SECONDS",
+        help="time between polls")
+    parser.add_argument(
+        "--settle", type=float, default=30., metavar="SECONDS",
+        help="time a file must be unchanged before it is indexed")
+    parser.add_argument(
+        "--batch-size", type=int, default=100, metavar="N",
+        help="number of files written per transaction")
+    parser.add_argument(
+        "--processes", type=int, metavar="N",
+        help="number of worker processes used to read headers")
+    parser.add_argument(
+        "patterns", nargs="+", metavar="PATTERN",
+        help="glob patterns of files to index, e.g. '/data/*ga7*.nc'")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="forestdb watch")
+    add_arguments(parser)
+    return parser.parse_args(args=argv)
+
+
+def main(argv=None, args=None, iterations=None):
+    """Poll for new files until interrupted
+
+    :param iterations: number of polls, None polls forever
+    """
+    if args is None:
+        args = parse_args(argv=argv)
+    with Database.connect(args.database) as database:
+        watcher = Watcher(
+            args.patterns,
+            stats=database.file_stats(),
+            settle=args.settle)
+        count = 0
+        while (iterations is None) or (count < iterations):
+            if count > 0:
+                time.sleep(args.interval)
+            count += 1
+            paths = watcher.poll()
+            for i in range(0, len(paths), args.batch_size):
+                batch = paths[i:i + args.batch_size]
+                headers = list(bulk.read_headers(
+                    batch, processes=args.processes))
+                database.insert_headers(headers)
+                for header in headers:
+                    watcher.done(header)
+                indexed = {header.path for header in headers}
+                for path in batch:
+                    if path not in indexed:
+                        watcher.fail(path)
+                print("indexed: {} files".format(len(headers)))
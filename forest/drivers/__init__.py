@@ -25,7 +25,9 @@ def _uid(driver_name, settings):
 
 def _maybe_hashable(value):
     if isinstance(value, list):
-        return tuple(value)
+        return tuple(_maybe_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple((k, _maybe_hashable(v)) for k, v in sorted(value.items()))
     return value
 
 
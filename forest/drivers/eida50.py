@@ -2,6 +2,7 @@ import re
 import sqlite3
 import os
 import glob
+import threading
 import datetime as dt
 import bokeh.models
 import xarray
@@ -14,6 +15,7 @@ from forest import (
         geo,
         locate,
         view)
+from forest.db import profile
 
 
 ENGINE = "h5netcdf"
@@ -47,8 +49,9 @@ class Database:
     def __init__(self, path=":memory:"):
         self.fmt = "%Y-%m-%d %H:%M:%S"
         self.path = path
-        self.connection = sqlite3.connect(self.path)
+        self.connection = profile.wrap(sqlite3.connect(self.path))
         self.cursor = self.connection.cursor()
+        self._paths = None
 
         # Schema
         query = """
@@ -86,6 +89,8 @@ class Database:
         """
         self.cursor.execute(query, {"path": path})
         self.connection.commit()
+        if self._paths is not None:
+            self._paths.add(path)
 
         # Update time table
         query = """
@@ -128,6 +133,90 @@ class Database:
         texts = [text for text, in rows]
         return list(sorted(texts))
 
+    def has_path(self, path):
+        """Membership test against an in-memory copy of the file table
+
+        The copy is read on first use and kept up to date by
+        :meth:`insert_times`
+
+        .. note:: Only inserts made through this instance are seen,
+                  rows added by other processes or connections after
+                  the first call are not
+        """
+        if self._paths is None:
+            self._paths = set(self.fetch_paths())
+        return path in self._paths
+
+
+class TimestampIndex:
+    """Sorted timestamps parsed from file names
+
+    Only paths not seen by a previous :meth:`update` are parsed, so
+    refreshing after a glob costs a set difference rather than a
+    regex per file. Lookups use a binary search.
+
+    Sorted times and paths are replaced together under a lock so
+    that :meth:`find` never pairs new times with old paths.
+
+    :param parse: function returning datetime or None given a path
+    """
+    def __init__(self, parse):
+        self.parse = parse
+        self._sorted = (np.array([], dtype="datetime64[s]"), [])
+        self._seen = {}
+        self._last = None
+        self._lock = threading.Lock()
+
+    @property
+    def times(self):
+        return self._sorted[0]
+
+    @property
+    def paths(self):
+        return self._sorted[1]
+
+    def update(self, paths):
+        """Add new paths and forget paths no longer present"""
+        with self._lock:
+            if paths is self._last:
+                # Cached glob result, nothing changed
+                return
+            current = set(paths)
+            changed = False
+            for path in current - self._seen.keys():
+                self._seen[path] = self.parse(path)
+                changed = True
+            for path in self._seen.keys() - current:
+                del self._seen[path]
+                changed = True
+            if changed:
+                items = sorted((time, path)
+                               for path, time in self._seen.items()
+                               if time is not None)
+                times = np.array([time for time, _ in items],
+                                 dtype="datetime64[s]")
+                self._sorted = (times, [path for _, path in items])
+            self._last = paths
+
+    def time(self, path):
+        """Timestamp of a path passed to :meth:`update` or None"""
+        return self._seen.get(path)
+
+    def find(self, date):
+        """Path with the latest timestamp at or before date
+
+        :raises FileNotFound: if every timestamp is after date
+        """
+        times, paths = self._sorted
+        date = np.datetime64(date, "s")
+        i = np.searchsorted(times, date, side="right")
+        if i == 0:
+            msg = "No file for {}".format(date)
+            raise FileNotFound(msg)
+        # Equal timestamps resolve to the first path in sort order
+        i = np.searchsorted(times, times[i - 1], side="left")
+        return paths[i]
+
 
 class Locator:
     """Locate EIDA50 satellite images"""
@@ -135,17 +224,18 @@ class Locator:
         self.pattern = pattern
         self._glob = forest.util.cached_glob(dt.timedelta(minutes=15))
         self.database = database
+        self.index = TimestampIndex(self.parse_date)
 
     def all_times(self, paths):
         """All available times"""
         # Parse times from file names not in database
         unparsed_paths = []
         filename_times = []
-        database_paths = set(self.database.fetch_paths())
+        self.index.update(paths)
         for path in paths:
-            if path in database_paths:
+            if self.database.has_path(path):
                 continue
-            time = self.parse_date(path)
+            time = self.index.time(path)
             if time is None:
                 unparsed_paths.append(path)
                 continue
@@ -174,7 +264,7 @@ class Locator:
         path = self.find_file(paths, date)
 
         # Load times from database
-        if path in self.database.fetch_paths():
+        if self.database.has_path(path):
             times = self.database.fetch_times(path)
             times = np.array(times, dtype='datetime64[s]')
         else:
@@ -200,19 +290,8 @@ class Locator:
 
         .. warning:: Not suitable for searching unparsable file names
         """
-        if isinstance(user_date, (dt.datetime, str)):
-            user_date = np.datetime64(user_date, 's')
-        dates = np.array([
-            self.parse_date(path) for path in paths],
-            dtype='datetime64[s]')
-        mask = ~(dates <= user_date)
-        if mask.all():
-            msg = "No file for {}".format(user_date)
-            raise FileNotFound(msg)
-        before_dates = np.ma.array(
-                dates, mask=mask, dtype='datetime64[s]')
-        i =  _natargmax(before_dates.filled())
-        return paths[i]
+        self.index.update(paths)
+        return self.index.find(user_date)
 
     @staticmethod
     def find_index(times, time, length):
@@ -314,7 +393,7 @@ class Navigator:
                 # Detect missing file
                 paths = self.locator.glob()
                 path = self.locator.find_file(paths, time)
-                if path not in self.database.fetch_paths():
+                if not self.database.has_path(path):
                     times = self.locator.load_time_axis(path)  # datetime64[s]
                     self.database.insert_times(times.astype(dt.datetime), path)
 
@@ -5,6 +5,24 @@ These conventions should conform the GDS 2.0 conventions (based on cf1.7)
 See:
 https://www.ghrsst.org/about-ghrsst/governance-documents/
 
+L4 grids are global and tens of thousands of pixels across, so
+frames are never read at full resolution. Each frame is read with
+a stride chosen to match the plot width, optionally restricted to a
+region of interest, e.g.
+
+.. code-block:: yaml
+
+    files:
+      - label: SST
+        pattern: "*GHRSST*.nc"
+        file_type: ghrsstl4
+        region:
+          lon_range: [-30, 60]
+          lat_range: [-40, 40]
+
+Windows are widened to the chunk boundaries of the file and the
+decimated images are held in :func:`forest.cache.image_cache`.
+
 """
 
 from datetime import datetime
@@ -18,11 +36,18 @@ except ModuleNotFoundError:
     iris = None
 
 import glob
+import forest.util
 from forest import geo
+from forest.cache import image_cache
 from forest.view import UMView
+from forest.drivers.gridded_forecast import Catalogue, _datetime64
 from forest.util import to_datetime as _to_datetime
 
 
+# Width in pixels of frames read when the plot size is not known
+PIXELS = 2000
+
+
 def empty_image():
     return {
         "x": [],
@@ -88,51 +113,139 @@ def _load(pattern):
         cube_mapping[name] = cube
     return cube_mapping
 
+
+def align(window, chunk, size):
+    """Widen a slice to chunk boundaries
+
+    Reading part of a chunk decodes all of it, so the extra
+    data costs no additional I/O
+
+    >>> align(slice(5, 13), 4, 14)
+    slice(4, 14, None)
+    """
+    start, stop, _ = window.indices(size)
+    if start >= stop:
+        return slice(start, start)
+    start = (start // chunk) * chunk
+    stop = min(-(-stop // chunk) * chunk, size)
+    return slice(start, stop)
+
+
+def stride(size, pixels):
+    """Step that reduces size points to at most pixels
+
+    >>> stride(36000, 2000)
+    18
+    """
+    if not pixels:
+        return 1
+    return max(1, -(-size // pixels))
+
+
+def decimate(cube, region=None, pixels=PIXELS):
+    """Strided subset of a 2D latitude/longitude cube
+
+    :param region: :class:`forest.util.Region` to read, None reads
+                   the whole grid
+    :param pixels: approximate number of points across the result
+    :returns: cube with data still lazy or None if region is outside grid
+    """
+    lons = cube.coord('longitude').points
+    lats = cube.coord('latitude').points
+    lon_slice, lat_slice = slice(None), slice(None)
+    if region is not None:
+        lon_slice, lat_slice = forest.util.region_slices(lons, lats, region)
+    if cube.has_lazy_data():
+        chunks = cube.lazy_data().chunks
+        lat_slice = align(lat_slice, chunks[0][0], len(lats))
+        lon_slice = align(lon_slice, chunks[1][0], len(lons))
+    lat_slice = slice(*lat_slice.indices(len(lats))[:2])
+    lon_slice = slice(*lon_slice.indices(len(lons))[:2])
+    width = lon_slice.stop - lon_slice.start
+    height = lat_slice.stop - lat_slice.start
+    if (width <= 0) or (height <= 0):
+        return None
+    step = stride(width, pixels)
+    return cube[lat_slice.start:lat_slice.stop:step,
+                lon_slice.start:lon_slice.stop:step]
+
+
 class Dataset:
     """High-level class to relate navigators, loaders and views"""
-    def __init__(self, label=None, pattern=None, **kwargs):
+    def __init__(self, label=None, pattern=None, region=None, **kwargs):
         self._label = label
         self.pattern = pattern
+        self.region = forest.util.parse_region(region)
         if pattern is not None:
             self._paths = glob.glob(pattern)
         else:
             self._paths = []
+        self._catalogue = Catalogue(self._paths, load=_load)
 
     def navigator(self):
         """Construct navigator"""
-        return Navigator(self._paths)
+        return Navigator(self._catalogue)
 
     def map_view(self, color_mapper):
         """Construct view"""
-        return UMView(ImageLoader(self._label, self._paths), color_mapper)
+        return UMView(self.loader(), color_mapper)
+
+    def loader(self):
+        """Construct image loader"""
+        return ImageLoader(self._label, self._catalogue, region=self.region)
 
 class ImageLoader:
-    def __init__(self, label, pattern):
+    """Decimated images of GHRSST fields
+
+    :param region: :class:`forest.util.Region` to read, None reads
+                   the whole grid
+    """
+    def __init__(self, label, catalogue, region=None):
         self._label = label
-        self._cubes = _load(pattern)
+        self._catalogue = catalogue
+        self.region = region
+        self.pixels = None
 
     def image(self, state):
-        cube = self._cubes[state.variable]
-        valid_datetime = _to_datetime(state.valid_time)
-        cube = cube.extract(iris.Constraint(time=valid_datetime))
-
-        if cube is None:
-            data = empty_image()
-        else:
-            data = geo.stretch_image(cube.coord('longitude').points,
-                                     cube.coord('latitude').points, cube.data)
+        # Cached data is shared between sessions, update a copy
+        data = dict(self._input_output(state.variable, state.valid_time))
+        if len(data["image"]) > 0:
             data.update(coordinates(state.valid_time, state.initial_time,
                                     state.pressures, state.pressure))
-            data.update({
-                'name': [self._label],
-                'units': [str(cube.units)]
-            })
+        return data
+
+    def prefetch(self, state):
+        """Load image into the shared cache ahead of time"""
+        self._input_output(state.variable, state.valid_time)
+
+    def _input_output(self, variable, valid_time):
+        key = ("ghrsstl4", self._label, variable, _datetime64(valid_time),
+               self.region, self.pixels)
+        return image_cache().get(key, lambda: self._read(variable, valid_time))
+
+    def _read(self, variable, valid_time):
+        cube = self._catalogue.frame(variable, valid_time)
+        if cube is not None:
+            cube = decimate(cube, region=self.region,
+                            pixels=self.pixels or PIXELS)
+        if cube is None:
+            return empty_image()
+        data = geo.stretch_image(cube.coord('longitude').points,
+                                 cube.coord('latitude').points, cube.data)
+        data.update({
+            'name': [self._label],
+            'units': [str(cube.units)]
+        })
         return data
 
 
 class Navigator:
-    def __init__(self, paths):
-        self._cubes = _load(paths)
+    def __init__(self, catalogue):
+        self._catalogue = catalogue
+
+    @property
+    def _cubes(self):
+        return self._catalogue.cubes
 
     def variables(self, pattern):
         return list(self._cubes.keys())
@@ -1,5 +1,6 @@
 from datetime import datetime
 import collections
+import threading
 
 import numpy as np
 try:
@@ -89,6 +90,79 @@ def _load(pattern):
     return cube_mapping
 
 
+def _datetime64(value):
+    """Valid time as datetime64 with one second resolution
+
+    cftime dates in any calendar are converted by their fields,
+    dates that do not exist in the real calendar raise ValueError
+    """
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[s]")
+    if isinstance(value, cftime.datetime):
+        return np.datetime64(value.isoformat(), "s")
+    return np.datetime64(_to_datetime(value), "s")
+
+
+class Catalogue:
+    """Cubes in a collection of files, loaded on first use
+
+    Shared by the navigator and every image loader of a dataset so
+    the files are only scanned once per server. Each variable has a
+    map from datetime64 valid time to position along the time axis,
+    selecting a frame slices the lazy cube directly and only the
+    selected 2D field is read when its data is accessed.
+
+    :param paths: files passed to ``load``
+    :param load: function returning a dict of name to cube
+    """
+    def __init__(self, paths, load=_load):
+        self.paths = paths
+        self._load = load
+        self._cubes = None
+        self._times = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cubes(self):
+        """Dict of name to cube"""
+        with self._lock:
+            if self._cubes is None:
+                self._cubes = self._load(self.paths)
+            return self._cubes
+
+    def time_index(self, variable):
+        """Dict of datetime64 valid time to index along the time axis"""
+        cube = self.cubes[variable]
+        with self._lock:
+            if variable not in self._times:
+                coord = cube.coord('time')
+                dates = coord.units.num2date(coord.points)
+                index = {}
+                for i, date in enumerate(np.ravel(dates)):
+                    try:
+                        index[_datetime64(date)] = i
+                    except ValueError:
+                        # e.g. 30 February in a 360_day calendar
+                        continue
+                self._times[variable] = index
+            return self._times[variable]
+
+    def frame(self, variable, valid_time):
+        """Cube at valid time with data still lazy, None if not found"""
+        cube = self.cubes[variable]
+        try:
+            i = self.time_index(variable)[_datetime64(valid_time)]
+        except KeyError:
+            return None
+        dims = cube.coord_dims('time')
+        if len(dims) == 0:
+            # Scalar time coordinate
+            return cube
+        keys = [slice(None)] * cube.ndim
+        keys[dims[0]] = i
+        return cube[tuple(keys)]
+
+
 class Dataset:
     """High-level class to relate navigators, loaders and views"""
     def __init__(self, label=None, pattern=None, **kwargs):
@@ -98,24 +172,23 @@ class Dataset:
             self._paths = glob.glob(pattern)
         else:
             self._paths = []
+        self._catalogue = Catalogue(self._paths)
 
     def navigator(self):
         """Construct navigator"""
-        return Navigator(self._paths)
+        return Navigator(self._catalogue)
 
     def map_view(self, color_mapper):
         """Construct view"""
-        return UMView(ImageLoader(self._label, self._paths), color_mapper)
+        return UMView(ImageLoader(self._label, self._catalogue), color_mapper)
 
 class ImageLoader:
-    def __init__(self, label, pattern):
+    def __init__(self, label, catalogue):
         self._label = label
-        self._cubes = _load(pattern)
+        self._catalogue = catalogue
 
     def image(self, state):
-        cube = self._cubes[state.variable]
-        valid_datetime = _to_datetime(state.valid_time)
-        cube = cube.extract(iris.Constraint(time=valid_datetime))
+        cube = self._catalogue.frame(state.variable, state.valid_time)
         if cube is None:
             data = empty_image()
         else:
@@ -131,8 +204,12 @@ class ImageLoader:
 
 
 class Navigator:
-    def __init__(self, paths):
-        self._cubes = _load(paths)
+    def __init__(self, catalogue):
+        self._catalogue = catalogue
+
+    @property
+    def _cubes(self):
+        return self._catalogue.cubes
 
     def variables(self, pattern):
         return list(self._cubes.keys())
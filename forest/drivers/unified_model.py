@@ -2,9 +2,15 @@ import xarray
 from functools import lru_cache
 import os
 import glob
+import json
 import re
 import fnmatch
+import threading
+import time
+import atexit
+import tempfile
 import datetime as dt
+from collections import OrderedDict
 import numpy as np
 import netCDF4
 import forest.util
@@ -13,6 +19,8 @@ from forest import (
     disk,
     geo,
     view)
+import forest.pyramid
+from forest.cache import image_cache
 from forest.exceptions import SearchFail, PressuresNotFound
 from forest.drivers import gridded_forecast
 import bokeh.models
@@ -34,14 +42,30 @@ class Dataset:
                  locator="file_system",
                  directory=None,
                  database_path=None,
+                 replica=False,
+                 metadata_cache=None,
+                 region=None,
+                 pyramid=None,
                  **kwargs):
         self.label = label
         self.pattern = pattern
+        self.region = forest.util.parse_region(region)
+        self.pyramid = pyramid
+        self.metadata_cache = metadata_cache
         self.use_database = locator == "database"
         if self.use_database:
-            self.database = db.get_database(database_path)
-            self.locator = db.Locator(self.database.connection,
-                                      directory=directory)
+            if replica:
+                # Navigation queries answered from memory
+                self.database = db.get_replica(database_path)
+            else:
+                self.database = db.get_database(database_path)
+            if database_path == ":memory:":
+                self.locator = db.Locator(self.database.connection,
+                                          directory=directory)
+            else:
+                # Loaders may run outside the Bokeh document thread
+                self.locator = db.Locator.pool(database_path,
+                                               directory=directory)
         else:
             self.locator = Locator.pattern(self.pattern)
 
@@ -49,16 +73,26 @@ class Dataset:
         if self.use_database:
             return self.database
         else:
-            return Navigator(self.pattern)
+            return Navigator(self.pattern,
+                             cache=get_metadata_cache(self.metadata_cache))
 
     def map_view(self, color_mapper=None):
-        loader = Loader(self.label, self.pattern, self.locator)
-        return view.map_view(loader, color_mapper)
+        return view.map_view(self.loader(), color_mapper)
+
+    def loader(self):
+        pyramid = None
+        if self.pyramid is not None:
+            pyramid = forest.pyramid.Pyramid(self.pyramid)
+        return Loader(self.label, self.pattern, self.locator,
+                      region=self.region, pyramid=pyramid)
 
 
 class Navigator:
-    def __init__(self, pattern):
+    def __init__(self, pattern, cache=None):
+        if cache is None:
+            cache = MetadataCache()
         self.pattern = pattern
+        self.cache = cache
         self._locators = {
             "initial": read_initial_time,
             "valid": read_valid_times,
@@ -66,13 +100,20 @@ class Navigator:
         }
 
     def variables(self, pattern):
-        cubes = iris.load(pattern)
-        return [cube.name() for cube in cubes]
+        names = []
+        for path in sorted(glob.glob(pattern)):
+            for name in self.cache.get(path, "variables", read_variables):
+                if name not in names:
+                    names.append(name)
+        self.cache.save()
+        return names
 
     def initial_times(self, pattern, variable):
         locator = self._locators["initial"]
-        return list(sorted(set(locator(path)
-                               for path in glob.glob(pattern))))
+        times = set(self.cache.get(path, "initial", locator)
+                    for path in glob.glob(pattern))
+        self.cache.save()
+        return list(sorted(times))
 
     def valid_times(self, pattern, variable, initial_time):
         return self._dimension("valid", pattern, variable, initial_time)
@@ -84,49 +125,276 @@ class Navigator:
         arrays = []
         locator = self._locators[keyword]
         for path in glob.glob(self.pattern):
-            arrays.append(locator(path, variable))
+            arrays.append(self.cache.get(
+                path, keyword, locator, variable=variable))
+        self.cache.save()
         if len(arrays) == 0:
             return []
         return np.unique(np.concatenate(arrays))
 
 
+def read_variables(path):
+    """Names of cubes stored in a file"""
+    return [cube.name() for cube in iris.load(path)]
+
+
+@lru_cache(maxsize=None)
+def get_metadata_cache(sidecar=None):
+    """Process-wide cache shared by all navigators using a sidecar file"""
+    return MetadataCache(sidecar)
+
+
+class MetadataCache:
+    """Navigation meta-data per file keyed by (path, size, mtime)
+
+    Values are computed on first use and discarded when a file
+    changes. If sidecar is given entries are stored as JSON so that
+    restarted servers do not re-open every file. New entries are
+    written at most once per interval and when the process exits
+
+    :param sidecar: JSON file used to persist entries
+    :param interval: minimum seconds between writes to sidecar
+    """
+    def __init__(self, sidecar=None, interval=60.):
+        self.sidecar = sidecar
+        self.interval = interval
+        self._entries = {}
+        self._dirty = False
+        self._saved = None
+        self._lock = threading.Lock()
+        if (sidecar is not None) and os.path.exists(sidecar):
+            self.load()
+        if sidecar is not None:
+            atexit.register(self.flush)
+
+    def get(self, path, field, func, variable=None):
+        """Cached value of func(path) or func(path, variable)"""
+        stat = os.stat(path)
+        key = [stat.st_size, stat.st_mtime]
+        name = field if variable is None else "{}:{}".format(field, variable)
+        with self._lock:
+            entry = self._entries.get(path)
+            if (entry is None) or (entry["key"] != key):
+                entry = {"key": key, "values": {}}
+                self._entries[path] = entry
+            if name in entry["values"]:
+                return entry["values"][name]
+        if variable is None:
+            value = func(path)
+        else:
+            value = func(path, variable)
+        with self._lock:
+            entry["values"][name] = value
+            self._dirty = True
+        return value
+
+    def save(self):
+        """Write entries to sidecar if any have been added and the
+        previous write was at least interval seconds ago"""
+        if (self._saved is not None) and (
+                time.monotonic() - self._saved < self.interval):
+            return
+        self.flush()
+
+    def flush(self):
+        """Write entries to sidecar if any have been added"""
+        if (self.sidecar is None) or (not self._dirty):
+            return
+        with self._lock:
+            data = {path: {"key": entry["key"],
+                           "values": {name: _encode(name, value)
+                                      for name, value in
+                                      entry["values"].items()}}
+                    for path, entry in self._entries.items()}
+            self._dirty = False
+            self._saved = time.monotonic()
+        # Unique name so processes sharing a sidecar do not collide
+        with tempfile.NamedTemporaryFile(
+                "w", dir=os.path.dirname(os.path.abspath(self.sidecar)),
+                suffix=".tmp", delete=False) as stream:
+            json.dump(data, stream)
+        os.replace(stream.name, self.sidecar)
+
+    def load(self):
+        """Read entries from sidecar"""
+        with open(self.sidecar) as stream:
+            data = json.load(stream)
+        with self._lock:
+            self._entries = {
+                path: {"key": entry["key"],
+                       "values": {name: _decode(name, value)
+                                  for name, value in
+                                  entry["values"].items()}}
+                for path, entry in data.items()}
+
+
+def _encode(name, value):
+    """JSON representation of cached meta-data"""
+    field = name.split(":")[0]
+    if field == "initial":
+        return str(value)
+    if field == "valid":
+        return [str(t) for t in np.asarray(value, dtype="datetime64[s]")]
+    if field == "pressure":
+        return [float(p) for p in np.ravel(value)]
+    return value
+
+
+def _decode(name, value):
+    field = name.split(":")[0]
+    if field == "initial":
+        if value == "None":
+            return None
+        return np.datetime64(value, "s").astype(dt.datetime)
+    if field == "valid":
+        return np.array(value, dtype="datetime64[s]")
+    if field == "pressure":
+        return np.array(value)
+    return value
+
+
+class ReaderCache:
+    """Remember which reader succeeded for each file
+
+    Readers are tried in order the first time a file is seen,
+    later calls go straight to the reader that worked. Calls,
+    failures and time spent are counted per reader
+
+    :param maxsize: maximum number of remembered choices, least
+                    recently used choices are forgotten first
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._choices = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def read(self, group, key, readers, errors=Exception):
+        """Result of first reader that does not raise
+
+        :param group: name of the operation, e.g. "load_image"
+        :param key: hashable identifying the file, e.g. (path, variable)
+        :param readers: list of (name, function) pairs
+        :param errors: exception type(s) that mean try the next reader
+        """
+        with self._lock:
+            choice = self._choices.get((group, key))
+            if choice is not None:
+                self._choices.move_to_end((group, key))
+        if choice is not None:
+            readers = sorted(readers, key=lambda reader: reader[0] != choice)
+        error = None
+        for name, func in readers:
+            start = time.perf_counter()
+            try:
+                result = func()
+            except errors as e:
+                self._record(group, name, time.perf_counter() - start, True)
+                error = e
+                continue
+            self._record(group, name, time.perf_counter() - start, False)
+            with self._lock:
+                self._choices[(group, key)] = name
+                self._choices.move_to_end((group, key))
+                if len(self._choices) > self.maxsize:
+                    self._choices.popitem(last=False)
+            return result
+        raise error
+
+    def _record(self, group, name, seconds, failed):
+        with self._lock:
+            stats = self._stats.setdefault("{}.{}".format(group, name), {
+                "calls": 0,
+                "failures": 0,
+                "seconds": 0.})
+            stats["calls"] += 1
+            stats["failures"] += int(failed)
+            stats["seconds"] += seconds
+
+    def stats(self):
+        """Calls, failures and seconds per group.reader"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+READERS = ReaderCache()
+
+
+def reader_stats():
+    """Metrics of file readers used by this driver"""
+    return READERS.stats()
+
+
 class Loader:
-    """Unified model formatted loader"""
-    def __init__(self, name, pattern, locator):
+    """Unified model formatted loader
+
+    :param region: :class:`forest.util.Region`, only the part of each
+                   field covering the region is read
+    :param pyramid: :class:`forest.pyramid.Pyramid` of pre-computed
+                    images, ignored if region is set
+    """
+    def __init__(self, name, pattern, locator, region=None, pyramid=None):
         self.name = name
         self.pattern = pattern
         self.locator = locator
+        self.region = region
+        self.pyramid = pyramid
+        self.pixels = None
 
     def image(self, state):
         if not self.valid(state):
             return gridded_forecast.empty_image()
-        data = self._input_output(
+        # Cached data is shared between sessions, update a copy
+        data = dict(self._input_output(
             self.pattern,
             state.variable,
             state.initial_time,
             state.valid_time,
-            state.pressure)
+            state.pressure))
         data.update(gridded_forecast.coordinates(state.valid_time,
                                                  state.initial_time,
                                                  state.pressures,
                                                  state.pressure))
         return data
 
-    @lru_cache(maxsize=100)
+    def prefetch(self, state):
+        """Load image into the shared cache ahead of time"""
+        if self.valid(state):
+            self._input_output(
+                self.pattern,
+                state.variable,
+                state.initial_time,
+                state.valid_time,
+                state.pressure)
+
     def _input_output(self, pattern, variable, initial_time, valid_time,
                       pressure):
-        """I/O needed to load an image and its metadata"""
+        """I/O needed to load an image and its metadata
+
+        Images are held in the process-wide :func:`forest.cache.image_cache`,
+        failed searches are not cached since files may arrive later
+        """
+        key = ("unified_model", self.name, pattern, variable,
+               initial_time, valid_time, pressure, self.region,
+               self.pixels if self.pyramid is not None else None)
         try:
-            path, pts = self.locator.locate(
-                pattern,
-                variable,
-                initial_time,
-                valid_time,
-                pressure)
+            return image_cache().get(key, lambda: self._read(
+                pattern, variable, initial_time, valid_time, pressure))
         except SearchFail:
             return gridded_forecast.empty_image()
 
-        data = self.load_image(path, variable, pts)
+    def _read(self, pattern, variable, initial_time, valid_time, pressure):
+        path, pts = self.locator.locate(
+            pattern,
+            variable,
+            initial_time,
+            valid_time,
+            pressure)
+        data = None
+        if (self.pyramid is not None) and (self.region is None):
+            data = self.pyramid.read(path, variable, pts, pixels=self.pixels)
+        if data is None:
+            data = self.load_image(path, variable, pts, region=self.region)
         data["name"] = [self.name]
         return data
 
@@ -152,27 +420,40 @@ class Loader:
         return any(np.abs(pressures - pressure) < tolerance)
 
     @classmethod
-    def load_image(cls, path, variable, pts):
-        """Load bokeh image glyph data from file using slices"""
-        try:
-            lons, lats, values, units = cls._load_xarray(path, variable, pts)
-        except:
-            lons, lats, values, units = cls._load_cube(path, variable, pts)
+    def load_image(cls, path, variable, pts, region=None, fraction=None):
+        """Load bokeh image glyph data from file using slices
+
+        :param region: :class:`forest.util.Region` to read, None reads
+                       the whole field
+        :param fraction: zoom factor, None reduces large fields to 1/4
+        """
+        lons, lats, values, units = READERS.read(
+            "load_image", (path, variable), [
+                ("xarray", lambda: cls._load_xarray(
+                    path, variable, pts, region)),
+                ("iris", lambda: cls._load_cube(
+                    path, variable, pts, region))])
+        if values.size == 0:
+            # Region does not overlap field
+            return gridded_forecast.empty_image()
 
-        # Units
+        # Units, values are a private float32 buffer so convert in place
+        if not values.flags.writeable:
+            values = values.copy()
         if variable in ["precipitation_flux", "stratiform_rainfall_rate"]:
-            if units == "mm h-1":
-                values = values
-            else:
-                values = forest.util.convert_units(values, units, "kg m-2 hour-1")
+            if units != "mm h-1":
+                forest.util.convert_units(
+                    values, units, "kg m-2 hour-1", inplace=True)
                 units = "kg m-2 hour-1"
         elif units == "K":
-            values = forest.util.convert_units(values, "K", "Celsius")
+            forest.util.convert_units(values, "K", "Celsius", inplace=True)
             units = "C"
 
         # Coarsify images
         threshold = 200 * 200  # Chosen since TMA WRF is 199 x 199
-        if values.size > threshold:
+        if fraction is not None:
+            pass
+        elif values.size > threshold:
             fraction = 0.25
         else:
             fraction = 1.
@@ -180,60 +461,140 @@ class Loader:
             lons, lats, values, fraction)
 
         # Roll input data into [-180, 180] range
-        if np.any(lons > 180.0):
-            shift_by = np.sum(lons > 180.0)
-            lons[lons > 180.0] -= 360.
-            lons = np.roll(lons, shift_by)
-            values = np.roll(values, shift_by, axis=1)
+        if lons.ndim == 1:
+            forest.util.roll_longitudes(lons, values)
 
-        data = geo.stretch_image(lons, lats, values)
+        data = geo.stretch_image(lons, lats, values, masked=False)
         data["units"] = [units]
         return data
 
     @staticmethod
-    def _load_xarray(path, variable, pts):
+    def _load_xarray(path, variable, pts, region=None):
         with xarray.open_dataset(path, engine="h5netcdf") as nc:
             data_array = nc[variable][pts]
-            lons = np.ma.masked_invalid(data_array.longitude)
-            lats = np.ma.masked_invalid(data_array.latitude)
-            values = np.ma.masked_invalid(data_array)
+            if region is not None:
+                # Hyperslab read, data outside region is never decoded
+                lon, lat = data_array.longitude, data_array.latitude
+                if (lon.ndim == 1) and (lat.ndim == 1):
+                    lon_slice, lat_slice = forest.util.region_slices(
+                        lon.values, lat.values, region)
+                    data_array = data_array.isel({
+                        lon.dims[0]: lon_slice,
+                        lat.dims[0]: lat_slice})
+            # Private copies, later steps modify them in place
+            lons = np.array(data_array.longitude, dtype="f8")
+            lats = np.array(data_array.latitude, dtype="f8")
+            values = np.ascontiguousarray(data_array, dtype="f4")
             units = getattr(data_array, 'units', '')
         return lons, lats, values, units
 
     @staticmethod
-    def _load_cube(path, variable, pts):
+    def _load_cube(path, variable, pts, region=None):
         # TODO: Is this method still needed?
         cube = iris.load_cube(path, iris.Constraint(variable))
+        if len(pts) > 0:
+            cube = cube[pts]
+        if region is not None:
+            lon = cube.coord('longitude')
+            lat = cube.coord('latitude')
+            if (lon.ndim == 1) and (lat.ndim == 1):
+                lon_slice, lat_slice = forest.util.region_slices(
+                    lon.points, lat.points, region)
+                keys = [slice(None)] * cube.ndim
+                keys[cube.coord_dims(lon)[0]] = lon_slice
+                keys[cube.coord_dims(lat)[0]] = lat_slice
+                cube = cube[tuple(keys)]
         units = cube.units
-        lons = cube.coord('longitude').points
+        lons = np.array(cube.coord('longitude').points, dtype="f8")
         if lons.ndim == 2:
             lons = lons[0, :]
-        lats = cube.coord('latitude').points
-        if lons.ndim == 2:
+        lats = np.array(cube.coord('latitude').points, dtype="f8")
+        if lats.ndim == 2:
             lats = lats[:, 0]
-        values = cube.data[pts]
+        values = np.ascontiguousarray(np.ma.filled(
+            np.ma.asarray(cube.data, dtype="f4"), np.nan))
         return lons, lats, values, str(units)  # Needed for tutorial data
 
 
 class Locator(object):
-    def __init__(self, paths):
-        self.paths = paths
+    """Find file and array index given navigation state
+
+    Time and pressure axes are read once per (path, variable) into
+    an :class:`AxisIndex`, so repeat lookups do not open files.
+    Locators made with :meth:`pattern` glob again at most once every
+    ``interval`` and index files that have since appeared.
+    Locators are shared with prefetch threads, the catalogue is
+    guarded by a lock
+    """
+    def __init__(self, paths, pattern=None, interval=dt.timedelta(minutes=1)):
+        self.paths = []
         self.spare = []
         self.catalogue = {}
-        for path in paths:
-            initial_time = self.initial_time(path)
-            if initial_time is None:
-                self.spare.append(path)
-                continue
-            key = self.key(initial_time)
-            if key not in self.catalogue:
-                self.catalogue[key] = [path]
-            else:
-                self.catalogue[key].append(path)
+        self.text = pattern
+        self._glob = forest.util.cached_glob(interval)
+        self._index = {}
+        self._lock = threading.RLock()
+        self.add(paths)
 
     @classmethod
     def pattern(cls, text):
-        return cls(sorted(glob.glob(os.path.expanduser(text))))
+        return cls(sorted(glob.glob(os.path.expanduser(text))), pattern=text)
+
+    def add(self, paths):
+        """Catalogue paths by initial time"""
+        with self._lock:
+            known = set(self.paths)
+            for path in paths:
+                if path in known:
+                    continue
+                known.add(path)
+                self.paths.append(path)
+                initial_time = self.initial_time(path)
+                if initial_time is None:
+                    self.spare.append(path)
+                    continue
+                key = self.key(initial_time)
+                if key not in self.catalogue:
+                    self.catalogue[key] = [path]
+                else:
+                    self.catalogue[key].append(path)
+
+    def remove(self, paths):
+        """Forget paths and their axis indices"""
+        paths = set(paths)
+        with self._lock:
+            self.paths = [p for p in self.paths if p not in paths]
+            self.spare = [p for p in self.spare if p not in paths]
+            for key in list(self.catalogue):
+                self.catalogue[key] = [
+                    p for p in self.catalogue[key] if p not in paths]
+                if len(self.catalogue[key]) == 0:
+                    del self.catalogue[key]
+            for key in list(self._index):
+                if key[0] in paths:
+                    del self._index[key]
+
+    def refresh(self):
+        """Add files found by a (cached) glob of the pattern"""
+        if self.text is None:
+            return
+        found = self._glob(self.text)
+        with self._lock:
+            self.add(found)
+            missing = set(self.paths) - set(found)
+            self.remove([p for p in missing if not os.path.exists(p)])
+
+    def axis_index(self, path, variable):
+        """Cached :class:`AxisIndex`, None if variable not in file"""
+        key = (path, variable)
+        with self._lock:
+            if key in self._index:
+                return self._index[key]
+        # Read outside the lock so other lookups are not blocked
+        result = AxisIndex.read(path, variable)
+        with self._lock:
+            self._index[key] = result
+        return result
 
     def locate(
             self,
@@ -243,51 +604,17 @@ class Locator(object):
             valid_time,
             pressure=None,
             tolerance=0.001):
-        paths = self.find_paths(initial_time) + self.spare
+        self.refresh()
+        with self._lock:
+            paths = self.find_paths(initial_time) + self.spare
         paths = fnmatch.filter(paths, pattern)
         for path in paths:
-            with netCDF4.Dataset(path) as dataset:
-                if variable not in dataset.variables:
-                    continue
-
-                var = dataset.variables[variable]
-                dims = var.dimensions
-                coords = getattr(var, "coordinates", "")
-
-                masks = {}
-                for coord, value in [
-                        ("time", valid_time),
-                        ("pressure", pressure)]:
-                    if not disk.has_coord(coord, dims, coords):
-                        continue
-                    if value is None:
-                        # Coordinate present but value not specified
-                        raise SearchFail("Please specify: '{}'".format(coord))
-                        continue
-                    axis = disk.axis(coord, dims, coords)
-                    coord_var = disk.coord_var(coord, dims, coords)
-                    if coord == "time":
-                        obj = dataset.variables[coord_var]
-                        values = netCDF4.num2date(obj[:], units=obj.units)
-                    else:
-                        values = dataset.variables[coord_var][:]
-                    mask = disk.coord_mask(coord, values, value)
-                    if axis not in masks:
-                        masks[axis] = mask
-                    else:
-                        masks[axis] = masks[axis] & mask
-
-            # Determine if search was successful
-            found = all(mask.any() for mask in masks.values())
-            if not found:
+            index = self.axis_index(path, variable)
+            if index is None:
+                continue
+            pts = index.find(valid_time, pressure)
+            if pts is None:
                 continue
-
-            # Generate multi-dimensional slice from search result
-            slices = []
-            for i in range(max(masks.keys()) + 1):
-                pts = np.where(masks[i])[0][0]
-                slices.append(pts)
-            pts = tuple(slices)
             return path, pts
 
         # Search failure message
@@ -296,7 +623,8 @@ class Locator(object):
         raise SearchFail(msg)
 
     def find_paths(self, initial_time):
-        return self.catalogue.get(self.key(initial_time), [])
+        with self._lock:
+            return list(self.catalogue.get(self.key(initial_time), []))
 
     @staticmethod
     def key(time):
@@ -331,16 +659,110 @@ class Locator(object):
         return result
 
 
+class AxisIndex:
+    """Sorted time and pressure axes of a variable
+
+    Values are sorted once so that lookups are binary searches
+
+    :param ndim: rank of the slice returned by :meth:`find`
+    :param times: datetime64 valid times or None
+    :param time_axis: array axis of times
+    :param pressures: pressure values or None
+    :param pressure_axis: array axis of pressures
+    """
+    def __init__(self, ndim=0, times=None, time_axis=None,
+                 pressures=None, pressure_axis=None):
+        self.ndim = ndim
+        self.axes = {}
+        self.values = {}
+        self.orders = {}
+        for name, values, axis in [
+                ("time", times, time_axis),
+                ("pressure", pressures, pressure_axis)]:
+            if values is None:
+                continue
+            if name == "time":
+                values = np.atleast_1d(
+                    np.asarray(values, dtype="datetime64[s]"))
+            else:
+                values = np.atleast_1d(np.asarray(values, dtype="d"))
+            order = np.argsort(values, kind="stable")
+            self.axes[name] = axis
+            self.orders[name] = order
+            self.values[name] = values[order]
+
+    @classmethod
+    def read(cls, path, variable):
+        """Read axes from NetCDF file, None if variable not present"""
+        with netCDF4.Dataset(path) as dataset:
+            if variable not in dataset.variables:
+                return None
+            var = dataset.variables[variable]
+            dims = var.dimensions
+            coords = getattr(var, "coordinates", "")
+            kwargs = {}
+            for coord in ["time", "pressure"]:
+                if not disk.has_coord(coord, dims, coords):
+                    continue
+                obj = dataset.variables[disk.coord_var(coord, dims, coords)]
+                if coord == "time":
+                    values = np.array(
+                        netCDF4.num2date(obj[:], units=obj.units),
+                        dtype="datetime64[s]")
+                else:
+                    values = obj[:]
+                kwargs[coord + "s"] = values
+                kwargs[coord + "_axis"] = disk.axis(coord, dims, coords)
+        ndim = max([axis + 1 for key, axis in kwargs.items()
+                    if key.endswith("_axis")], default=0)
+        return cls(ndim=ndim, **kwargs)
+
+    def find(self, valid_time, pressure, rtol=0.01):
+        """Multi-dimensional index of first match, None if not found
+
+        :raises SearchFail: if a coordinate is present but not specified
+        """
+        masks = {}
+        for name, value in [("time", valid_time), ("pressure", pressure)]:
+            if name not in self.axes:
+                continue
+            if value is None:
+                # Coordinate present but value not specified
+                raise SearchFail("Please specify: '{}'".format(name))
+            points = self._search(name, value, rtol)
+            axis = self.axes[name]
+            if axis in masks:
+                points = np.intersect1d(masks[axis], points)
+            if len(points) == 0:
+                return None
+            masks[axis] = points
+        return tuple(int(masks[i].min()) for i in range(self.ndim))
+
+    def _search(self, name, value, rtol):
+        """Positions along axis that match value"""
+        values = self.values[name]
+        if name == "time":
+            value = np.datetime64(value, "s")
+            lower, upper = value, value
+            start = np.searchsorted(values, lower, side="left")
+            end = np.searchsorted(values, upper, side="right")
+        else:
+            lower = value - rtol * abs(value)
+            upper = value + rtol * abs(value)
+            start = np.searchsorted(values, lower, side="right")
+            end = np.searchsorted(values, upper, side="left")
+        return np.sort(self.orders[name][start:end])
+
+
 def read_initial_time(path):
     return InitialTimeLocator()(path)
 
 
 class InitialTimeLocator:
     def __call__(self, path):
-        try:
-            return self.netcdf4_strategy(path)
-        except KeyError:
-            return self.cube_strategy(path)
+        return READERS.read("initial_time", path, [
+            ("netcdf4", lambda: self.netcdf4_strategy(path)),
+            ("iris", lambda: self.cube_strategy(path))], errors=KeyError)
 
     @staticmethod
     def netcdf4_strategy(path):
@@ -364,16 +786,20 @@ def read_valid_times(path, variable):
 
 class ValidTimesLocator(object):
     def __call__(self, path, variable):
-        try:
-            t = self.netcdf4_strategy(path, variable)
-        except KeyError:
-            t = self.cube_strategy(path, variable)
-        if t is None:
-            t = self.cube_strategy(path, variable)
-        elif t.ndim == 0:
+        t = READERS.read("valid_times", (path, variable), [
+            ("netcdf4", lambda: self._netcdf4_or_raise(path, variable)),
+            ("iris", lambda: self.cube_strategy(path, variable))],
+            errors=KeyError)
+        if t.ndim == 0:
             t = np.array([t], dtype='datetime64[s]')
         return t
 
+    def _netcdf4_or_raise(self, path, variable):
+        t = self.netcdf4_strategy(path, variable)
+        if t is None:
+            raise KeyError("No time axis: '{}' '{}'".format(path, variable))
+        return t
+
     def netcdf4_strategy(self, path, variable):
         with netCDF4.Dataset(path) as dataset:
             values = self._valid_times(dataset, variable)
@@ -408,10 +834,10 @@ class ValidTimesLocator(object):
 
 class PressuresLocator(object):
     def __call__(self, path, variable):
-        try:
-            return self.netcdf4_strategy(path, variable)
-        except KeyError:
-            return self.cube_strategy(path, variable)
+        return READERS.read("pressures", (path, variable), [
+            ("netcdf4", lambda: self.netcdf4_strategy(path, variable)),
+            ("iris", lambda: self.cube_strategy(path, variable))],
+            errors=KeyError)
 
     def cube_strategy(self, path, variable):
         try:
@@ -30,7 +30,8 @@ except ModuleNotFoundError:
 
 def stretch_image(lons, lats, values,
                   plot_height=None,
-                  plot_width=None):
+                  plot_width=None,
+                  masked=True):
     """
     Do the mapping from image data to the format required by bokeh
     for plotting.
@@ -39,6 +40,8 @@ def stretch_image(lons, lats, values,
     :param lats: Numpy array with longitude values for the image data.
     :param values: Numpy array of image data, with dimensions matching the
                    size of latitude and longitude arrays.
+    :param masked: return a masked array, otherwise a contiguous float32
+                   array with missing data set to NaN
     :return: A dictionary that can be used with the bokeh image glyph.
     """
     if (lons.ndim == 1):
@@ -62,10 +65,14 @@ def stretch_image(lons, lats, values,
         y_range = (gy.min(), gy.max())
         image = datashader_stretch(values, gx, gy, x_range, y_range,
                                    plot_height=plot_height,
-                                   plot_width=plot_width)
+                                   plot_width=plot_width,
+                                   masked=masked)
     else:
         # TODO: Deprecate this method
         image = custom_stretch(values, gx, gy)
+        if not masked:
+            image = np.ascontiguousarray(
+                np.ma.filled(np.ma.asarray(image, dtype="f4"), np.nan))
 
     # Image location
     x = gx.min()
@@ -89,7 +96,8 @@ def stretch_image(lons, lats, values,
 
 def datashader_stretch(values, gx, gy, x_range, y_range,
                        plot_height=None,
-                       plot_width=None):
+                       plot_width=None,
+                       masked=True):
     """
     Use datashader to sample the data mesh in on a regular grid for use in
     image display.
@@ -99,6 +107,8 @@ def datashader_stretch(values, gx, gy, x_range, y_range,
     :param gy: The array of coordinates in projection space.
     :param x_range: The range of the mesh in projection space.
     :param y_range: The range of the mesh in projection space.
+    :param masked: return a masked array, otherwise a float32 array
+                   with missing data set to NaN
     :return: An xarray of image data representing pixels.
     """
     if plot_height is None:
@@ -123,6 +133,8 @@ def datashader_stretch(values, gx, gy, x_range, y_range,
                                 },
                                 name='Z')
         image = canvas.quadmesh(xarr, x='Qx', y='Qy')
+    if not masked:
+        return np.ascontiguousarray(image.values, dtype="f4")
     return np.ma.masked_array(image.values,
                           mask=np.isnan(
                               image.values))
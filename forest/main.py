@@ -18,6 +18,7 @@ from forest import (
         keys,
         plugin,
         presets,
+        prefetch,
         redux,
         rx,
         navigate,
@@ -99,6 +100,10 @@ def main(argv=None):
             "database_path": group.database_path,
             "directory": group.directory
         }
+        # Optional settings only understood by some drivers
+        for key in ["region", "pyramid", "replica", "metadata_cache"]:
+            if getattr(group, key) is not None:
+                settings[key] = getattr(group, key)
         dataset = drivers.get_dataset(group.file_type, settings)
         datasets[group.label] = dataset
         datasets_by_pattern[group.pattern] = dataset
@@ -191,10 +196,27 @@ def main(argv=None):
     colorbar_ui = forest.components.ColorbarUI()
     colorbar_ui.connect(store)
 
+    # Loaders used to fill the image cache ahead of navigation
+    loaders = {}
+    for label, dataset in datasets.items():
+        if hasattr(dataset, "loader"):
+            loader = dataset.loader()
+            if hasattr(loader, "pixels"):
+                loader.pixels = max(f.plot_width for f in figures)
+            loaders[label] = loader
+    prefetcher = prefetch.Prefetcher(loaders).connect(store)
+
     # Add time user interface
-    time_ui = forest.components.TimeUI()
+    playback = forest.components.time.Playback(loaders).connect(store)
+    time_ui = forest.components.TimeUI(playback=playback)
     time_ui.connect(store)
 
+    def on_session_destroyed(context):
+        prefetcher.cancel()
+        playback.stop()
+
+    bokeh.plotting.curdoc().on_session_destroyed(on_session_destroyed)
+
     # Connect MapView orchestration to store
     opacity_slider = forest.layers.OpacitySlider()
     source_limits = colors.SourceLimits().connect(store)
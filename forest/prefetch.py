@@ -0,0 +1,202 @@
+"""
+Prefetch
+--------
+
+Stepping through time loads each frame only after the key press.
+A :class:`Prefetcher` watches application state and loads the
+frames either side of the current valid time, and the pressure
+levels above and below, for every visible layer. Images are loaded
+by a small pool of background threads into the shared
+:func:`forest.cache.image_cache`, so the next step is a cache hit.
+
+Frames that are no longer near the current frame are cancelled
+if they have not yet started, e.g. after jumping to another
+initial time or variable.
+
+Every session shares one pool so the number of frames decoded at
+once is bounded across the server. The default of two threads can
+be changed by setting an environment variable before the server
+starts
+
+.. code-block:: sh
+
+    export FOREST_PREFETCH_WORKERS=4
+
+.. autoclass:: Prefetcher
+    :members:
+
+.. autofunction:: thread_pool
+
+.. autofunction:: neighbours
+
+.. autofunction:: layer_states
+
+"""
+import concurrent.futures
+import os
+import threading
+from forest.db.control import _index, NotFound
+from forest.old_state import _to_old
+
+
+__all__ = [
+    "Prefetcher",
+    "layer_states",
+    "neighbours",
+    "thread_pool",
+]
+
+
+MAX_WORKERS = 2
+
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def thread_pool():
+    """Process-wide thread pool shared by all sessions"""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            max_workers = int(os.environ.get(
+                "FOREST_PREFETCH_WORKERS", MAX_WORKERS))
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers)
+        return _EXECUTOR
+
+
+def neighbours(items, item, k):
+    """Up to k items either side of item ordered by distance
+
+    >>> neighbours([1, 2, 3, 4, 5], 3, 2)
+    [4, 2, 5, 1]
+    >>> neighbours([1, 2, 3], 3, 2)
+    [2, 1]
+    """
+    if (items is None) or (item is None):
+        return []
+    items = list(sorted(items))
+    try:
+        i = _index(items, item)
+    except (ValueError, NotFound):
+        return []
+    result = []
+    for step in range(1, k + 1):
+        for j in [i + step, i - step]:
+            if 0 <= j < len(items):
+                result.append(items[j])
+    return result
+
+
+def layer_states(state, loaders):
+    """Dataset label and state of each layer that has a loader"""
+    layers = state.get("layers", {}).get("index", {})
+    for _, spec in sorted(layers.items()):
+        label = spec.get("dataset", "")
+        if label not in loaders:
+            continue
+        layer_state = dict(state)
+        if spec.get("variable", ""):
+            layer_state["variable"] = spec["variable"]
+        yield label, layer_state
+
+
+class Prefetcher:
+    """Load neighbouring frames of visible layers in the background
+
+    :param loaders: dict mapping dataset label to loader with a
+                    ``prefetch(state)`` method
+    :param k: number of valid times either side of the current frame
+    :param executor: thread pool, defaults to :func:`thread_pool`
+    """
+    def __init__(self, loaders, k=2, executor=None):
+        self.loaders = loaders
+        self.k = k
+        if executor is None:
+            executor = thread_pool()
+        self.executor = executor
+        self.futures = {}
+        self._lock = threading.Lock()
+        self._previous = None
+
+    def connect(self, store):
+        store.add_subscriber(self.render)
+        return self
+
+    def render(self, state):
+        """Schedule neighbouring frames if the current frame changed"""
+        frame = self.frame(state)
+        if frame == self._previous:
+            return
+        self._previous = frame
+        self.schedule(self.targets(state))
+
+    @staticmethod
+    def frame(state):
+        layers = state.get("layers", {}).get("index", {})
+        specs = tuple((spec.get("dataset"), spec.get("variable"))
+                      for _, spec in sorted(layers.items()))
+        return (specs,
+                state.get("initial_time"),
+                state.get("valid_time"),
+                state.get("pressure"))
+
+    def targets(self, state):
+        """(dataset, variable, initial, valid, pressure) keys and states"""
+        result = {}
+        for label, layer_state in layer_states(state, self.loaders):
+            for layer_state in self.nearby(layer_state):
+                key = (label,
+                       layer_state.get("variable"),
+                       layer_state.get("initial_time"),
+                       layer_state.get("valid_time"),
+                       layer_state.get("pressure"))
+                result[key] = layer_state
+        return result
+
+    def nearby(self, state):
+        """States of frames near the current frame, nearest first"""
+        states = []
+        for valid_time in neighbours(state.get("valid_times"),
+                                     state.get("valid_time"), self.k):
+            states.append(dict(state, valid_time=valid_time))
+        for pressure in neighbours(state.get("pressures"),
+                                   state.get("pressure"), 1):
+            states.append(dict(state, pressure=pressure))
+        return states
+
+    def schedule(self, targets):
+        """Cancel stale work and submit new targets"""
+        with self._lock:
+            for key in list(self.futures):
+                future = self.futures[key]
+                if future.done():
+                    del self.futures[key]
+                elif key not in targets:
+                    if future.cancel():
+                        del self.futures[key]
+            for key, state in targets.items():
+                if key in self.futures:
+                    continue
+                loader = self.loaders[key[0]]
+                self.futures[key] = self.executor.submit(
+                    self._load, loader, state)
+
+    @staticmethod
+    def _load(loader, state):
+        try:
+            loader.prefetch(_to_old(state))
+        except Exception as error:
+            # Prefetch is best effort, the frame is loaded again on demand
+            print("prefetch failed: {}".format(error))
+
+    def cancel(self):
+        """Cancel frames that have not started, e.g. at session end
+
+        The shared pool itself keeps running for other sessions
+        """
+        with self._lock:
+            for future in self.futures.values():
+                future.cancel()
+            self.futures = {}
@@ -0,0 +1,224 @@
+"""
+Image pyramids
+--------------
+
+Stretching large fields onto Web Mercator and reducing them to
+screen resolution dominates the time taken to draw a new frame.
+Pyramids move that work offline. Each 2D field in a file is
+stretched once at full resolution and repeatedly halved in size,
+every level is stored as a chunked, compressed HDF5 dataset.
+
+.. code-block:: sh
+
+    forest pyramid --output /data/pyramids /data/*ga7*.nc
+
+Datasets configured with ``pyramid: /data/pyramids`` serve frames
+from the smallest level at least as wide as the plot. Frames
+without a pyramid are rendered from the original file as usual.
+
+.. autoclass:: Pyramid
+    :members:
+
+.. autofunction:: build
+
+.. autofunction:: downsample
+
+"""
+import argparse
+import glob
+import hashlib
+import os
+import numpy as np
+import netCDF4
+import h5py
+
+
+__all__ = [
+    "Pyramid",
+    "build",
+    "downsample",
+]
+
+
+MIN_SIZE = 256
+CHUNK = 256
+
+
+def downsample(image):
+    """Halve resolution of image by averaging 2x2 blocks
+
+    Missing data are ignored, blocks with no valid data are NaN
+
+    >>> downsample(np.arange(16.).reshape(4, 4))
+    array([[ 2.5,  4.5],
+           [10.5, 12.5]])
+    """
+    values = np.ma.filled(np.ma.asarray(image, dtype="f4"), np.nan)
+    ny, nx = values.shape
+    padded = np.full((ny + ny % 2, nx + nx % 2), np.nan, dtype="f4")
+    padded[:ny, :nx] = values
+    blocks = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+    valid = np.isfinite(blocks)
+    count = valid.sum(axis=(1, 3))
+    total = np.where(valid, blocks, 0).sum(axis=(1, 3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def levels(image, min_size=MIN_SIZE):
+    """Full resolution image followed by successive halvings"""
+    result = [np.ma.filled(np.ma.asarray(image, dtype="f4"), np.nan)]
+    while max(result[-1].shape) > min_size:
+        result.append(downsample(result[-1]).astype("f4"))
+    return result
+
+
+def frame_name(variable, pts):
+    """HDF5 group of a 2D field
+
+    >>> frame_name("air_temperature", (1, 2))
+    'air_temperature/frame_1_2'
+    """
+    return "/".join([variable, "_".join(
+        ["frame"] + [str(i) for i in pts])])
+
+
+class Pyramid:
+    """Store of pre-computed image levels, one HDF5 file per source file
+
+    :param directory: location of pyramid files
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def file_name(self, path):
+        """Pyramid file holding images from a source file
+
+        Names include a hash of the absolute path so that source
+        files with the same name in different directories, e.g. one
+        directory per run, do not share a pyramid
+        """
+        digest = hashlib.sha1(
+            os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, "{}.{}.pyramid.h5".format(
+            os.path.basename(path), digest))
+
+    def write(self, path, variable, pts, data, min_size=MIN_SIZE):
+        """Store bokeh image data at every level"""
+        name = frame_name(variable, pts)
+        with h5py.File(self.file_name(path), "a") as stream:
+            if name in stream:
+                del stream[name]
+            group = stream.create_group(name)
+            for key in ["x", "y", "dw", "dh"]:
+                group.attrs[key] = float(data[key][0])
+            group.attrs["units"] = str(data.get("units", [""])[0])
+            for i, image in enumerate(levels(data["image"][0], min_size)):
+                chunks = tuple(min(n, CHUNK) for n in image.shape)
+                group.create_dataset(
+                    str(i), data=image, chunks=chunks,
+                    compression="gzip", shuffle=True)
+
+    def read(self, path, variable, pts, pixels=None):
+        """Bokeh image data from the level that best suits the plot
+
+        :param pixels: plot width, None reads full resolution
+        :returns: dict or None if the frame has no pyramid
+        """
+        file_name = self.file_name(path)
+        if not os.path.exists(file_name):
+            return None
+        with h5py.File(file_name, "r") as stream:
+            name = frame_name(variable, pts)
+            if name not in stream:
+                return None
+            group = stream[name]
+            widths = [group[str(i)].shape[1] for i in range(len(group))]
+            image = group[str(self.level(widths, pixels))][...]
+            data = {key: [group.attrs[key]] for key in ["x", "y", "dw", "dh"]}
+            data["units"] = [group.attrs["units"]]
+        data["image"] = [image]
+        return data
+
+    @staticmethod
+    def level(widths, pixels):
+        """Index of the smallest level at least pixels wide
+
+        >>> Pyramid.level([1024, 512, 256], 400)
+        1
+        """
+        if pixels is None:
+            return 0
+        candidates = [i for i, width in enumerate(widths) if width >= pixels]
+        if len(candidates) == 0:
+            return 0
+        return candidates[-1]
+
+
+def fields(path):
+    """Variables and leading indices of 2D longitude/latitude fields"""
+    with netCDF4.Dataset(path) as dataset:
+        for name, var in dataset.variables.items():
+            dims = var.dimensions
+            if len(dims) < 2:
+                continue
+            horizontal = sorted(d.split("_")[0] for d in dims[-2:])
+            if horizontal != ["latitude", "longitude"]:
+                continue
+            for pts in np.ndindex(*var.shape[:-2]):
+                yield name, tuple(int(i) for i in pts)
+
+
+def build(paths, directory, variables=None, min_size=MIN_SIZE):
+    """Write pyramids for every 2D field in paths
+
+    :param variables: names to include, None includes all
+    :returns: number of fields written
+    """
+    from forest.drivers.unified_model import Loader
+    pyramid = Pyramid(directory)
+    count = 0
+    for path in paths:
+        for variable, pts in fields(path):
+            if (variables is not None) and (variable not in variables):
+                continue
+            try:
+                data = Loader.load_image(path, variable, pts, fraction=1.)
+            except Exception as error:
+                print("skipping: {} {} {} {}".format(
+                    path, variable, pts, error))
+                continue
+            if len(data["image"]) == 0:
+                continue
+            pyramid.write(path, variable, pts, data, min_size=min_size)
+            count += 1
+    return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="forest pyramid")
+    parser.add_argument(
+        "--output", required=True, metavar="DIR",
+        help="directory to write pyramid files")
+    parser.add_argument(
+        "--variable", dest="variables", action="append", metavar="NAME",
+        help="variable to include, may be repeated, default all")
+    parser.add_argument(
+        "--min-size", type=int, default=MIN_SIZE, metavar="N",
+        help="stop halving once images are at most N pixels across")
+    parser.add_argument(
+        "paths", nargs="+", metavar="FILE",
+        help="unified model netcdf files")
+    return parser.parse_args(args=argv)
+
+
+def main(argv=None):
+    args = parse_args(argv=argv)
+    os.makedirs(args.output, exist_ok=True)
+    paths = []
+    for pattern in args.paths:
+        paths += sorted(glob.glob(os.path.expanduser(pattern)))
+    count = build(paths, args.output,
+                  variables=args.variables,
+                  min_size=args.min_size)
+    print("pyramids: {} fields from {} files".format(count, len(paths)))
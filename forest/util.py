@@ -3,6 +3,7 @@ import os
 import re
 import datetime as dt
 import cftime
+from collections import namedtuple
 from functools import partial
 import scipy.ndimage
 import numpy as np
@@ -53,12 +54,101 @@ def _glob(pattern):
 
 
 def coarsify(lons, lats, values, fraction):
-    values = scipy.ndimage.zoom(values, fraction)
-    data = np.ma.masked_array(values, np.isnan(values))
+    """Zoom values by fraction, missing data are NaN
+
+    Inputs are returned unchanged if fraction is 1, otherwise the
+    result has the same dtype as values
+    """
+    if fraction == 1:
+        return lons, lats, values
+    values = scipy.ndimage.zoom(values, fraction, output=values.dtype)
     ny, nx = values.shape
     lons = np.linspace(lons.min(), lons.max(), nx)
     lats = np.linspace(lats.min(), lats.max(), ny)
-    return lons, lats, data
+    return lons, lats, values
+
+
+def roll_longitudes(lons, values):
+    """Shift longitudes in [0, 360] into [-180, 180] in place
+
+    Columns of values are rotated one row at a time so only a
+    single row of extra memory is needed
+
+    >>> lons = np.array([90., 180., 270.])
+    >>> values = np.array([[1., 2., 3.]])
+    >>> roll_longitudes(lons, values)
+    >>> lons, values
+    (array([-90.,  90., 180.]), array([[3., 1., 2.]]))
+    """
+    east = lons > 180.
+    shift = int(np.sum(east))
+    if shift == 0:
+        return
+    lons[east] -= 360.
+    lons[:] = np.roll(lons, shift)
+    buffer = np.empty(shift, dtype=values.dtype)
+    for row in values.reshape(-1, values.shape[-1]):
+        buffer[:] = row[-shift:]
+        row[shift:] = row[:-shift]
+        row[:shift] = buffer
+
+
+Region = namedtuple("Region", ("lon_range", "lat_range"))
+
+
+def parse_region(value):
+    """Region of interest from settings
+
+    >>> parse_region({"lon_range": [100, 130], "lat_range": [-5, 20]})
+    Region(lon_range=(100, 130), lat_range=(-5, 20))
+
+    :param value: dict with lon_range and lat_range, Region or None
+    :returns: :class:`Region` or None
+    """
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        value = Region(**value)
+    return Region(tuple(value.lon_range), tuple(value.lat_range))
+
+
+def region_slice(values, low, high, pad=1):
+    """Index slice of monotonic 1D coordinate covering [low, high]
+
+    >>> region_slice([0, 10, 20, 30, 40], 12, 25)
+    slice(1, 4, None)
+
+    :param pad: extra points either side so the region is fully covered
+    """
+    values = np.asarray(values)
+    if values.ndim != 1:
+        return slice(None)
+    inside = np.where((values >= low) & (values <= high))[0]
+    if len(inside) == 0:
+        return slice(0, 0)
+    start = max(inside[0] - pad, 0)
+    stop = min(inside[-1] + pad + 1, len(values))
+    return slice(int(start), int(stop))
+
+
+def region_slices(lons, lats, region):
+    """Longitude and latitude slices covering a :class:`Region`
+
+    Longitudes in [0, 360] are matched against regions given in
+    [-180, 180], regions that straddle the seam are not subset
+    in longitude
+
+    :returns: (lon_slice, lat_slice)
+    """
+    low, high = region.lon_range
+    lon_slice = slice(None)
+    if np.max(lons) > 180 and low < 0:
+        if high < 0:
+            lon_slice = region_slice(lons, low + 360, high + 360)
+    else:
+        lon_slice = region_slice(lons, low, high)
+    lat_slice = region_slice(lats, *region.lat_range)
+    return lon_slice, lat_slice
 
 
 # TODO: Delete this function in a future PR
@@ -107,10 +197,18 @@ def parse_date(regex, fmt, path):
                                     fmt) # always UTC
 
 
-def convert_units(values, old_unit, new_unit):
-    """Helper to convert units"""
+def convert_units(values, old_unit, new_unit, inplace=False):
+    """Helper to convert units
+
+    :param inplace: overwrite values, float32 arrays stay float32
+    """
     if isinstance(values, list):
         values = np.asarray(values)
+    if inplace:
+        ctype = cf_units.FLOAT32 if values.dtype == np.float32 \
+            else cf_units.FLOAT64
+        return cf_units.Unit(old_unit).convert(
+            values, new_unit, ctype=ctype, inplace=True)
     return cf_units.Unit(old_unit).convert(values, new_unit)
 
 
@@ -108,6 +108,10 @@ class UMView(AbstractMapView):
                 image="image",
                 source=self.source,
                 color_mapper=self.color_mapper)
+        if hasattr(self.loader, "pixels"):
+            # Loaders with pre-computed resolutions choose one to suit
+            self.loader.pixels = max(self.loader.pixels or 0,
+                                     figure.plot_width or 0)
         if self.use_hover_tool:
             tool = bokeh.models.HoverTool(
                     renderers=[renderer],
@@ -0,0 +1,103 @@
+import concurrent.futures
+import threading
+import time
+import numpy as np
+import pytest
+from forest import cache
+
+
+def image(n):
+    return {"image": [np.zeros(n, dtype="u1")], "name": ["label"]}
+
+
+def test_image_cache_hit_and_miss_counters():
+    images = cache.ImageCache(max_bytes=100)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return image(10)
+
+    key = ("unified_model", "label", "air_temperature")
+    assert images.get(key, load) is images.get(key, load)
+    assert len(calls) == 1
+    stats = images.stats()
+    assert (stats["hits"], stats["misses"], stats["bytes"]) == (1, 1, 10)
+
+
+def test_image_cache_evicts_least_recently_used_bytes():
+    images = cache.ImageCache(max_bytes=25)
+    images.put("a", image(10))
+    images.put("b", image(10))
+    images.get("a", lambda: None)
+    images.put("c", image(10))
+    assert "a" in images
+    assert "b" not in images
+    assert images.bytes == 20
+    assert images.stats()["evictions"] == 1
+
+
+def test_image_cache_ignores_values_larger_than_budget():
+    images = cache.ImageCache(max_bytes=5)
+    images.put("a", image(10))
+    assert len(images) == 0
+
+
+def test_image_cache_does_not_store_failures():
+    images = cache.ImageCache()
+
+    def fail():
+        raise KeyError("not found")
+
+    with pytest.raises(KeyError):
+        images.get("a", fail)
+    assert "a" not in images
+
+
+def test_image_cache_is_shared():
+    assert cache.image_cache() is cache.image_cache()
+
+
+def test_image_cache_computes_pending_key_once():
+    images = cache.ImageCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return image(10)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(images.get, "a", load)
+        started.wait()
+        second = executor.submit(images.get, "a", load)
+        while images.stats()["waits"] == 0:
+            time.sleep(0.001)
+        release.set()
+        assert first.result() is second.result()
+    assert len(calls) == 1
+
+
+def test_image_cache_passes_errors_to_waiting_callers():
+    images = cache.ImageCache()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait()
+        raise KeyError("not found")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(images.get, "a", fail)
+        started.wait()
+        second = executor.submit(images.get, "a", fail)
+        while images.stats()["waits"] == 0:
+            time.sleep(0.001)
+        release.set()
+        for future in [first, second]:
+            with pytest.raises(KeyError):
+                future.result()
+    assert "a" not in images
+    assert images.get("a", lambda: image(1))["name"] == ["label"]
@@ -273,6 +273,10 @@ def test_user_limits_render():
     ([
         bokeh.models.ColumnDataSource(
             {"image": [np.linspace(-1, 1, 4).reshape(2, 2)]}
+        )], -1, 1),
+    ([
+        bokeh.models.ColumnDataSource(
+            {"image": [np.array([[np.nan, -1], [1, np.nan]], dtype="f4")]}
         )], -1, 1)
 ])
 def test_source_limits_on_change(listener, sources, low, high):
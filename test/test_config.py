@@ -239,3 +239,17 @@ def test_config_parser_plugin_given_unsupported_key():
                 }
             }
         })
+
+
+def test_file_group_given_driver_specific_settings():
+    data = {
+        "files": [{
+            "label": "UM",
+            "pattern": "*.nc",
+            "replica": True,
+            "metadata_cache": "sidecar.json",
+            "region": {"lon_range": [100, 130], "lat_range": [-10, 20]}}]}
+    group, = forest.config.Config(data).file_groups
+    assert group.replica
+    assert group.metadata_cache == "sidecar.json"
+    assert group.region["lon_range"] == [100, 130]
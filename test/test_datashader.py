@@ -85,3 +85,15 @@ def test_datashader_image_nan():
 
     #Should be returning NumPy masked arrays
     assert numpy.ma.is_masked(result['image'][0])
+
+
+def test_stretch_image_given_masked_false():
+    x = numpy.array([0, 1])
+    y = numpy.array([0, 1, 2])
+    z = numpy.ma.masked_invalid([[0, 1], [2, numpy.nan], [4, 5]])
+    result = geo.stretch_image(x, y, z, masked=False)
+    image = result["image"][0]
+    assert not numpy.ma.isMaskedArray(image)
+    assert image.dtype == numpy.float32
+    assert image.flags.c_contiguous
+    assert numpy.isnan(image).any()
@@ -0,0 +1,190 @@
+import datetime as dt
+import os
+import sqlite3
+import netCDF4
+import pytest
+import forest.db
+import forest.db.main as main
+from forest.db import bulk
+
+
+UNITS = "hours since 1970-01-01 00:00:00"
+
+
+@pytest.fixture
+def netcdf_file(tmpdir):
+    path = str(tmpdir / "file.nc")
+    times = [dt.datetime(2019, 1, 1, 12), dt.datetime(2019, 1, 1, 13)]
+    pressures = [1000.001, 950.001]
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("dim0", len(times))
+        obj = dataset.createVariable("forecast_reference_time", "d", ())
+        obj[:] = netCDF4.date2num(dt.datetime(2019, 1, 1), UNITS)
+        obj.units = UNITS
+        obj = dataset.createVariable("time", "d", ("dim0",))
+        obj.units = UNITS
+        obj[:] = netCDF4.date2num(times, UNITS)
+        obj = dataset.createVariable("pressure", "d", ("dim0",))
+        obj[:] = pressures
+        obj = dataset.createVariable("air_temperature", "f", ("dim0",))
+        obj.coordinates = "forecast_reference_time time pressure"
+    return path
+
+
+def test_read_header(netcdf_file):
+    header = bulk.read_header(netcdf_file)
+    assert header.path == netcdf_file
+    assert header.size == os.stat(netcdf_file).st_size
+    assert header.reference_time == "2019-01-01 00:00:00"
+    assert header.variables == [
+        bulk.VariableHeader(
+            name="air_temperature",
+            time_axis=0,
+            pressure_axis=0,
+            times=["2019-01-01 12:00:00", "2019-01-01 13:00:00"],
+            pressures=[1000.001, 950.001])]
+
+
+def test_read_header_given_360_day_calendar(tmpdir):
+    path = str(tmpdir / "file.nc")
+    units = "days since 2019-02-29 00:00:00"
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("time", 2)
+        obj = dataset.createVariable("forecast_reference_time", "d", ())
+        obj[:] = 0
+        obj.units = units
+        obj.calendar = "360_day"
+        obj = dataset.createVariable("time", "d", ("time",))
+        obj.units = units
+        obj.calendar = "360_day"
+        obj[:] = [1, 2]
+        dataset.createVariable("mslp", "f", ("time",))
+    header = bulk.read_header(path)
+    assert header.reference_time == "2019-02-29 00:00:00"
+    variable, = header.variables
+    assert variable.times == ["2019-02-30 00:00:00", "2019-03-01 00:00:00"]
+
+
+def test_read_headers_skips_files_that_fail_to_decode(monkeypatch):
+    def read_header(path):
+        raise RuntimeError("NetCDF: HDF error")
+
+    monkeypatch.setattr(bulk, "read_header", read_header)
+    assert list(bulk.read_headers(["file.nc"], processes=1)) == []
+
+
+def test_read_headers_skips_unreadable_files(tmpdir, netcdf_file):
+    paths = [str(tmpdir / "missing.nc"), netcdf_file]
+    headers = list(bulk.read_headers(paths, processes=1))
+    assert [h.path for h in headers] == [netcdf_file]
+
+
+def _dump(database_file):
+    connection = sqlite3.connect(database_file)
+    cursor = connection.cursor()
+    result = {}
+    for table, query in [
+            ("file", "SELECT name, reference FROM file"),
+            ("variable", "SELECT name, time_axis, pressure_axis FROM variable"),
+            ("time", """
+                SELECT t.i, t.value FROM time AS t
+                  JOIN variable_to_time AS vt ON vt.time_id = t.id
+                 ORDER BY t.i"""),
+            ("pressure", """
+                SELECT p.i, p.value FROM pressure AS p
+                  JOIN variable_to_pressure AS vp ON vp.pressure_id = p.id
+                 ORDER BY p.i""")]:
+        result[table] = cursor.execute(query).fetchall()
+    connection.close()
+    return result
+
+
+@pytest.mark.parametrize("flags", [
+    ["--bulk", "--processes", "1"],
+    ["--bulk", "--processes", "2"],
+])
+def test_main_bulk_matches_insert_netcdf(tmpdir, netcdf_file, flags):
+    expect_file = str(tmpdir / "expect.db")
+    result_file = str(tmpdir / "result.db")
+    main.main(["--database", expect_file, netcdf_file])
+    main.main(["--database", result_file] + flags + [netcdf_file])
+    assert _dump(result_file) == _dump(expect_file)
+
+
+def test_main_incremental_skips_unchanged_files(tmpdir, netcdf_file):
+    database_file = str(tmpdir / "file.db")
+    main.main(["--database", database_file, "--bulk", "--processes", "1",
+               netcdf_file])
+    connection = sqlite3.connect(database_file)
+    connection.execute("DELETE FROM variable")
+    connection.commit()
+    connection.close()
+
+    main.main(["--database", database_file, "--bulk", "--processes", "1",
+               "--incremental", netcdf_file])
+    assert _dump(database_file)["variable"] == []
+
+    os.utime(netcdf_file, (0, 0))
+    main.main(["--database", database_file, "--bulk", "--processes", "1",
+               "--incremental", netcdf_file])
+    assert _dump(database_file)["variable"] == [("air_temperature", 0, 0)]
+
+
+def test_main_columnar_stores_packed_axes(tmpdir, netcdf_file):
+    database_file = str(tmpdir / "file.db")
+    main.main(["--database", database_file, "--bulk", "--processes", "1",
+               "--columnar", netcdf_file])
+    database = forest.db.Database.connect(database_file)
+    assert database.columnar
+    assert database.valid_times() == [
+        "2019-01-01 12:00:00", "2019-01-01 13:00:00"]
+    assert _dump(database_file)["time"] == []
+
+
+def test_main_bulk_materialises_navigation(tmpdir, netcdf_file):
+    database_file = str(tmpdir / "file.db")
+    main.main(["--database", database_file, "--bulk", "--processes", "1",
+               netcdf_file])
+    locator = forest.db.Locator(sqlite3.connect(database_file))
+    assert locator.navigate(
+        "*.nc",
+        "air_temperature",
+        "2019-01-01 00:00:00",
+        "2019-01-01 13:00:00",
+        950.001) == (netcdf_file, 1, None)
+
+
+def test_read_header_records_grid_and_storage(tmpdir):
+    path = str(tmpdir / "grid.nc")
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("latitude", 3)
+        dataset.createDimension("longitude", 4)
+        obj = dataset.createVariable("latitude", "f", ("latitude",))
+        obj[:] = [0, 1, 2]
+        obj = dataset.createVariable("longitude", "f", ("longitude",))
+        obj[:] = [10, 20, 30, 45]
+        obj = dataset.createVariable(
+            "mslp", "f", ("latitude", "longitude"),
+            zlib=True, complevel=4, shuffle=False, chunksizes=(3, 2))
+        obj.units = "Pa"
+    variable, = bulk.read_header(path).variables
+    assert variable.units == "Pa"
+    assert variable.chunks == (3, 2)
+    assert variable.compression == "zlib:4"
+    assert variable.grid.shape == (3, 4)
+    assert variable.grid.lon_max == 45
+    assert not variable.grid.regular
+
+    database = forest.db.Database.connect(":memory:")
+    database.insert_header(bulk.read_header(path))
+    metadata = database.variable_metadata(path, "mslp")
+    assert metadata.chunks == (3, 2)
+    assert metadata.grid == variable.grid
+
+
+def test_insert_netcdf_records_metadata(tmpdir, netcdf_file):
+    database = forest.db.Database.connect(":memory:")
+    database.insert_netcdf(netcdf_file)
+    metadata = database.variable_metadata(netcdf_file, "air_temperature")
+    assert metadata == forest.db.database.VariableMetadata(
+        units=None, chunks=None, compression=None, grid=None)
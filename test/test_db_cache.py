@@ -0,0 +1,70 @@
+import sqlite3
+import pytest
+from forest import db
+from forest.db.cache import QueryCache
+
+
+@pytest.fixture
+def database_file(tmpdir):
+    return str(tmpdir / "file.db")
+
+
+def test_query_cache_counts_hits_and_misses():
+    cache = QueryCache(sqlite3.connect(":memory:"))
+    calls = []
+
+    def func():
+        calls.append(None)
+        return [1, 2, 3]
+
+    assert cache.get("key", func) == [1, 2, 3]
+    assert cache.get("key", func) == [1, 2, 3]
+    assert len(calls) == 1
+    assert cache.info().hits == 1
+    assert cache.info().misses == 1
+    assert cache.info().currsize == 1
+
+
+def test_query_cache_evicts_least_recently_used():
+    cache = QueryCache(sqlite3.connect(":memory:"), maxsize=2)
+    cache.get("a", lambda: "a")
+    cache.get("b", lambda: "b")
+    cache.get("a", lambda: "a")
+    cache.get("c", lambda: "c")
+    assert cache.get("b", lambda: "new") == "new"
+
+
+def test_database_variables_shared_between_calls(database_file):
+    database = db.Database.connect(database_file)
+    database.insert_variable("file.nc", "air_temperature")
+    database.connection.commit()
+    assert database.variables("*.nc") == ["air_temperature"]
+    assert database.variables("*.nc") == ["air_temperature"]
+    assert database.query_cache.info().hits == 1
+
+
+def test_database_variables_returns_copy(database_file):
+    database = db.Database.connect(database_file)
+    database.insert_variable("file.nc", "air_temperature")
+    database.variables("*.nc").append("relative_humidity")
+    assert database.variables("*.nc") == ["air_temperature"]
+
+
+def test_database_cache_invalidated_by_own_writes(database_file):
+    database = db.Database.connect(database_file)
+    assert database.variables() == []
+    database.insert_variable("file.nc", "air_temperature")
+    assert database.variables() == ["air_temperature"]
+
+
+def test_database_cache_invalidated_by_other_connection(database_file):
+    reader = db.Database.connect(database_file)
+    reader.connection.commit()
+    assert reader.variables() == []
+
+    writer = db.Database.connect(database_file)
+    writer.insert_variable("file.nc", "air_temperature")
+    writer.close()
+
+    assert reader.variables() == ["air_temperature"]
+    assert reader.query_cache.info().invalidations == 1
@@ -0,0 +1,77 @@
+import sqlite3
+import threading
+import datetime as dt
+import pytest
+from forest import db
+from forest.db.connection import ConnectionPool, ThreadLocal
+
+
+@pytest.fixture
+def database_file(tmpdir):
+    path = str(tmpdir / "file.db")
+    with db.Database.connect(path) as database:
+        database.insert_file_name("a.nc", dt.datetime(2019, 1, 1))
+        database.insert_variable("a.nc", "mslp", time_axis=0)
+        database.insert_times("a.nc", "mslp", [dt.datetime(2019, 1, 1)])
+    return path
+
+
+def test_connect_enables_wal(database_file):
+    connection = sqlite3.connect(database_file)
+    mode, = connection.execute("PRAGMA journal_mode").fetchone()
+    assert mode == "wal"
+
+
+def test_connection_pool_is_read_only(database_file):
+    pool = ConnectionPool(database_file)
+    with pytest.raises(sqlite3.OperationalError):
+        pool.connection().execute("DELETE FROM file")
+    pool.close()
+
+
+def test_connection_pool_one_connection_per_thread(database_file):
+    pool = ConnectionPool(database_file)
+    connections = [pool.connection(), pool.connection()]
+
+    def target():
+        connections.append(pool.connection())
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    assert connections[0] is connections[1]
+    assert connections[0] is not connections[2]
+    assert len(pool) == 2
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_locator_pool_used_by_threads(database_file):
+    locator = db.Locator.pool(database_file)
+    results = []
+
+    def target():
+        results.append(locator.locate(
+            "*.nc", "mslp", "2019-01-01 00:00:00", "2019-01-01 00:00:00"))
+
+    threads = [threading.Thread(target=target) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == 3 * [("a.nc", (0,))]
+    locator.close()
+
+
+def test_reader_not_blocked_by_open_write_transaction(database_file):
+    writer = sqlite3.connect(database_file)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO file (name) VALUES ('b.nc')")
+    locator = ThreadLocal(
+        ConnectionPool(database_file), db.Locator)
+    assert locator.file_names(
+        "*.nc", "mslp", "2019-01-01 00:00:00", "2019-01-01 00:00:00"
+    ) == ["a.nc"]
+    writer.rollback()
+    writer.close()
+    locator.close()
@@ -456,6 +456,32 @@ def test_controls_middleware_given_set_variable_no_pressures():
     ]
 
 
+def test_controls_middleware_given_set_variable_uses_dimensions():
+    navigator = unittest.mock.Mock(spec=[
+        "dimensions",
+        "valid_times",
+        "pressures"
+    ])
+    navigator.dimensions.return_value = (["2020-01-01 00:00:00"], [750.])
+    middleware = forest.db.Controls(navigator)
+    store = forest.redux.Store(forest.db.control.reducer)
+    for action in [
+            forest.db.control.set_value("pattern", "*"),
+            forest.db.control.set_value("initial_time", "2020-01-01 00:00:00")]:
+        store.dispatch(action)
+    action = forest.db.control.set_value("variable", "name")
+    assert list(middleware(store, action)) == [
+            action,
+            forest.db.control.set_value("valid_times", ["2020-01-01 00:00:00"]),
+            forest.db.control.set_value("pressures", [750.]),
+            forest.db.control.set_value("pressure", 750.),
+    ]
+    navigator.dimensions.assert_called_once_with(
+        "*", "name", "2020-01-01 00:00:00")
+    navigator.valid_times.assert_not_called()
+    navigator.pressures.assert_not_called()
+
+
 class TestStateStream(unittest.TestCase):
     def test_support_old_style_state(self):
         """Not all components are ready to accept dict() states"""
@@ -1,5 +1,10 @@
 from unittest.mock import Mock, sentinel
 import re
+import datetime as dt
+import sqlite3
+import pytest
+import numpy as np
+import cftime
 
 import forest.db.database as database
 
@@ -38,7 +43,7 @@ def test_Database_valid_times__defaults():
 def test_Database_valid_times__all_args():
     db = _create_db()
 
-    valid_times = db.valid_times(sentinel.pattern, sentinel.variable,
+    valid_times = db.valid_times("*.nc", sentinel.variable,
                                  sentinel.initial_time)
 
     _assert_query_and_params(
@@ -48,7 +53,7 @@ def test_Database_valid_times__all_args():
             ' JOIN file ON v.file_id = file.id'
             ' WHERE file.reference = :initial_time'
             ' AND file.name GLOB :pattern AND v.name = :variable',
-        {'pattern': sentinel.pattern, 'variable': sentinel.variable,
+        {'pattern': "*.nc", 'variable': sentinel.variable,
          'initial_time':sentinel.initial_time})
     assert valid_times == [sentinel.value1, sentinel.value2]
 
@@ -68,7 +73,7 @@ def test_Database_pressures__defaults():
 def test_Database_pressures__all_args():
     db = _create_db()
 
-    pressures = db.pressures(sentinel.pattern, sentinel.variable,
+    pressures = db.pressures("*.nc", sentinel.variable,
                              sentinel.initial_time)
 
     _assert_query_and_params(
@@ -79,6 +84,198 @@ def test_Database_pressures__all_args():
             ' WHERE v.name = :variable AND file.name GLOB :pattern'
             ' AND file.reference = :initial_time'
             ' ORDER BY value',
-        {'pattern': sentinel.pattern, 'variable': sentinel.variable,
+        {'pattern': "*.nc", 'variable': sentinel.variable,
          'initial_time':sentinel.initial_time})
     assert pressures == [sentinel.value1, sentinel.value2]
+
+
+@pytest.mark.parametrize("pattern,expect", [
+    ("*.nc", ("file.name GLOB :pattern", {"pattern": "*.nc"})),
+    ("ga7*.nc", (
+        "file.name GLOB :pattern"
+        " AND file.name >= :prefix_lo AND file.name < :prefix_hi",
+        {"pattern": "ga7*.nc", "prefix_lo": "ga7", "prefix_hi": "ga8"})),
+    ("/data/*ga7*.nc", (
+        "file.directory = :directory AND file.basename GLOB :basename",
+        {"pattern": "/data/*ga7*.nc",
+         "directory": "/data",
+         "basename": "*ga7*.nc"})),
+    ("/*/ga7.nc", (
+        "file.name GLOB :pattern"
+        " AND file.name >= :prefix_lo AND file.name < :prefix_hi",
+        {"pattern": "/*/ga7.nc", "prefix_lo": "/", "prefix_hi": "0"})),
+])
+def test_glob_clause(pattern, expect):
+    assert database.glob_clause(pattern) == expect
+
+
+@pytest.mark.parametrize("pattern,expect", [
+    ("*.nc", ["/a/x.nc", "/a/y.nc", "/b/x.nc"]),
+    ("/a/*.nc", ["/a/x.nc", "/a/y.nc"]),
+    ("/a/x*", ["/a/x.nc"]),
+    ("*/x.nc", ["/a/x.nc", "/b/x.nc"]),
+    ("/c/*.nc", []),
+])
+def test_Database_files_given_pattern(pattern, expect):
+    db = database.Database.connect(":memory:")
+    for path in ["/a/x.nc", "/a/y.nc", "/b/x.nc"]:
+        db.insert_file_name(path)
+    assert db.files(pattern) == expect
+
+
+def test_Database_migrate_backfills_directory_and_basename():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("""
+        CREATE TABLE file (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                reference TEXT,
+                UNIQUE(name))
+    """)
+    connection.execute("INSERT INTO file (name) VALUES ('/a/x.nc')")
+    db = database.Database(connection)
+    assert db.files("/a/*.nc") == ["/a/x.nc"]
+    indexes = [name for name, in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'")]
+    assert "file_directory" in indexes
+
+
+def test_Database_migrate_releases_write_lock(tmpdir):
+    path = str(tmpdir / "file.db")
+    connection = sqlite3.connect(path)
+    connection.execute("""
+        CREATE TABLE file (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                reference TEXT,
+                UNIQUE(name))
+    """)
+    connection.execute("INSERT INTO file (name) VALUES ('/a/x.nc')")
+    connection.execute("CREATE TABLE setting (name TEXT PRIMARY KEY, value TEXT)")
+    connection.execute("INSERT INTO setting VALUES ('coordinates', 'rows')")
+    connection.commit()
+    connection.close()
+    db = database.Database(sqlite3.connect(path))
+    other = sqlite3.connect(path, timeout=0)
+    other.execute("INSERT INTO file (name) VALUES ('/a/y.nc')")
+    other.commit()
+    assert db.files() == ["/a/x.nc", "/a/y.nc"]
+
+
+def test_Database_records_storage_setting_without_write_lock(tmpdir):
+    path = str(tmpdir / "file.db")
+    db = database.Database(sqlite3.connect(path))
+    other = sqlite3.connect(path, timeout=0)
+    other.execute("UPDATE setting SET value = value")
+    other.commit()
+    assert not db.columnar
+
+
+def test_Database_rows_storage_does_not_pack_axes():
+    db = database.Database.connect(":memory:")
+    db.insert_file_name("a.nc", dt.datetime(2019, 1, 1))
+    db.insert_variable("a.nc", "mslp", time_axis=0, pressure_axis=1)
+    db.insert_times("a.nc", "mslp", [dt.datetime(2019, 1, 1, 3)])
+    db.insert_pressures("a.nc", "mslp", [1000., 850.])
+    count, = db.connection.execute(
+        "SELECT COUNT(*) FROM axis_data").fetchone()
+    assert count == 0
+    db.update_navigation(db._file_id("a.nc"))
+    rows = db.connection.execute("""
+        SELECT valid, pressure, time_index, pressure_index
+          FROM navigation ORDER BY pressure_index
+    """).fetchall()
+    assert rows == [
+        (1546311600, 1000., 0, 0),
+        (1546311600, 850., 0, 1)]
+
+
+def _times(*values):
+    return np.array(values, dtype="datetime64[s]")
+
+
+@pytest.fixture(params=[None, True])
+def time_database(request):
+    db = database.Database.connect(":memory:", columnar=request.param)
+    for path, reference in [
+            ("a.nc", dt.datetime(2019, 1, 1)),
+            ("b.nc", dt.datetime(2019, 1, 2)),
+            ("c.nc", dt.datetime(2019, 1, 3))]:
+        db.insert_file_name(path, reference)
+        db.insert_variable(path, "mslp", time_axis=0)
+        db.insert_times(path, "mslp", [
+            reference + dt.timedelta(hours=h) for h in range(3)])
+    return db
+
+
+def test_Database_valid_times_between(time_database):
+    result = time_database.valid_times_between(
+        "2019-01-02 01:00:00", dt.datetime(2019, 1, 3))
+    expect = _times(
+        "2019-01-02T01:00", "2019-01-02T02:00", "2019-01-03T00:00")
+    np.testing.assert_array_equal(result, expect)
+
+
+def test_Database_valid_times_between_given_initial_time(time_database):
+    result = time_database.valid_times_between(
+        start=dt.datetime(2019, 1, 1, 1),
+        pattern="*.nc",
+        variable="mslp",
+        initial_time=dt.datetime(2019, 1, 1))
+    expect = _times("2019-01-01T01:00", "2019-01-01T02:00")
+    np.testing.assert_array_equal(result, expect)
+
+
+def test_Database_latest_initial_times(time_database):
+    result = time_database.latest_initial_times(2)
+    expect = _times("2019-01-02", "2019-01-03")
+    np.testing.assert_array_equal(result, expect)
+    assert result.dtype == np.dtype("datetime64[s]")
+
+
+def test_Database_initial_times_between(time_database):
+    result = time_database.initial_times_between(
+        end="2019-01-02 00:00:00", pattern="[ab].nc")
+    np.testing.assert_array_equal(result, _times("2019-01-01", "2019-01-02"))
+
+
+def test_Database_migrate_backfills_epochs():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("""
+        CREATE TABLE file (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                reference TEXT,
+                UNIQUE(name))
+    """)
+    connection.execute("""
+        INSERT INTO file (name, reference)
+        VALUES ('a.nc', '2019-01-01 00:00:00')
+    """)
+    db = database.Database(connection)
+    np.testing.assert_array_equal(
+        db.latest_initial_times(1), _times("2019-01-01"))
+
+
+@pytest.mark.parametrize("values", [
+    pytest.param(["north", "south"], id="labels"),
+    pytest.param([cftime.Datetime360Day(2019, 2, 30)], id="360_day"),
+])
+def test_pack_values_given_unsupported_values(values):
+    with pytest.raises(ValueError):
+        database.pack_values(values)
+
+
+def test_pack_values_given_standard_calendar():
+    _, dtype, data = database.pack_values([
+        cftime.DatetimeGregorian(2019, 1, 1), dt.datetime(2019, 1, 2)])
+    np.testing.assert_array_equal(database.unpack_axis(dtype, data),
+                                  _times("2019-01-01", "2019-01-02"))
+
+
+def test_Database_insert_times_given_360_day_calendar():
+    db = database.Database.connect(":memory:", columnar=True)
+    db.insert_file_name("a.nc")
+    db.insert_variable("a.nc", "mslp", time_axis=0)
+    db.insert_times("a.nc", "mslp", ["2019-02-30 00:00:00"])
+    assert db.variables() == ["mslp"]
@@ -3,7 +3,10 @@ import os
 import netCDF4
 import datetime as dt
 import sqlite3
+import numpy as np
+import cftime
 import forest.db.future as db
+from forest.exceptions import SearchFail
 
 
 class TestDatabase(unittest.TestCase):
@@ -94,6 +97,20 @@ class TestDatabase(unittest.TestCase):
         expect = [1000., 950., 850.]
         self.assertEqual(expect, result)
 
+    def test_insert_coordinate_skips_labels(self):
+        self.database.insert_coordinate(
+            "file.nc", "air_temperature", "region", axis=0,
+            values=["north", "south"])
+        result = self.database.values("file.nc", "air_temperature", "region")
+        self.assertIsNone(result)
+
+    def test_insert_coordinate_skips_360_day_times(self):
+        self.database.insert_coordinate(
+            "file.nc", "air_temperature", "time", axis=0,
+            values=[cftime.Datetime360Day(2019, 2, 30)])
+        result = self.database.values("file.nc", "air_temperature", "time")
+        self.assertIsNone(result)
+
 
 class TestInsertNetCDF(unittest.TestCase):
     def setUp(self):
@@ -111,6 +128,13 @@ class TestInsertNetCDF(unittest.TestCase):
         expect = [None]
         self.assertEqual(expect, result)
 
+    def test_insert_netcdf_stores_coordinate_values(self):
+        database = db.Database.connect(":memory:")
+        database.insert_netcdf(self.path)
+        result = database.locate(self.path, "air_temperature", {"x": 10.})
+        expect = (self.path, (slice(None), 1))
+        self.assertEqual(expect, result)
+
     def define(self, path):
         units = "hours since 1970-01-01 00:00:00"
         with netCDF4.Dataset(path, "w") as dataset:
@@ -125,3 +149,62 @@ class TestInsertNetCDF(unittest.TestCase):
             obj = dataset.createVariable("air_temperature", "f", ("y", "x"))
             obj.um_stash_source = "m01s16i203"
             obj.coordinates = "time"
+
+
+class TestLocate(unittest.TestCase):
+    def setUp(self):
+        self.database = db.Database.connect(":memory:")
+        self.variable = "air_temperature"
+        for path, realizations in [
+                ("a.nc", [0, 1, 2]),
+                ("b.nc", [3, 4, 5])]:
+            self.database.insert_variable(path, self.variable, ndim=4)
+            for name, axis, values in [
+                    ("forecast_reference_time", None,
+                        [dt.datetime(2019, 1, 1)]),
+                    ("time", 0, [dt.datetime(2019, 1, 1, h)
+                                 for h in range(2)]),
+                    ("realization", 1, realizations),
+                    ("model_level_number", 2, [1, 2, 3, 4])]:
+                self.database.insert_coordinate(
+                    path, self.variable, name, axis=axis, values=values)
+
+    def test_locate_returns_slice_tuple(self):
+        result = self.database.locate("*.nc", self.variable, {
+            "time": dt.datetime(2019, 1, 1, 1),
+            "realization": 4})
+        expect = ("b.nc", (1, 1, slice(None), slice(None)))
+        self.assertEqual(expect, result)
+
+    def test_locate_given_scalar_coordinate(self):
+        result = self.database.locate("*.nc", self.variable, {
+            "forecast_reference_time": dt.datetime(2019, 1, 1),
+            "model_level_number": 3})
+        expect = ("a.nc", (slice(None), slice(None), 2, slice(None)))
+        self.assertEqual(expect, result)
+
+    def test_locate_given_coordinates_sharing_axis(self):
+        self.database.insert_variable("c.nc", "mslp", ndim=1)
+        for name, values in [
+                ("time", [dt.datetime(2019, 1, 1, h) for h in [0, 0, 1]]),
+                ("pressure", [1000., 850., 1000.])]:
+            self.database.insert_coordinate(
+                "c.nc", "mslp", name, axis=0, values=values)
+        result = self.database.locate("*.nc", "mslp", {
+            "time": dt.datetime(2019, 1, 1),
+            "pressure": 850.})
+        self.assertEqual(("c.nc", (1,)), result)
+
+    def test_locate_raises_search_fail(self):
+        with self.assertRaises(SearchFail):
+            self.database.locate("*.nc", self.variable, {"realization": 6})
+
+    def test_coordinate_values(self):
+        result = self.database.coordinate_values(
+            "*.nc", self.variable, "realization")
+        np.testing.assert_array_equal(result, [0, 1, 2, 3, 4, 5])
+
+    def test_identical_values_stored_once(self):
+        count, = self.database.connection.execute(
+            "SELECT COUNT(*) FROM coordinate_data").fetchone()
+        self.assertEqual(count, 5)
@@ -98,3 +98,136 @@ class TestLocator(unittest.TestCase):
             pattern, variable, initial_time, valid_time, pressure)
         expect = ("file_000.nc", (0, 0))
         self.assertEqual(expect, result)
+
+
+class TestColumnarLocator(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.database = db.Database(self.connection, columnar=True)
+        self.locator = db.Locator(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def insert(self, path, initial_time, times, pressures):
+        self.database.insert_file_name(path, initial_time)
+        self.database.insert_variable(
+            path, "temperature", time_axis=0, pressure_axis=1)
+        self.database.insert_times(path, "temperature", times)
+        self.database.insert_pressures(path, "temperature", pressures)
+
+    def test_locate(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        times = [dt.datetime(2019, 1, 1, h) for h in range(3)]
+        self.insert("a.nc", initial_time, times, [1000., 850.])
+        self.insert("b.nc", initial_time, times[1:], [500.])
+        result = self.locator.locate(
+            "*.nc", "temperature", initial_time, times[2], 500.)
+        self.assertEqual(("b.nc", (1, 0)), result)
+
+    def test_identical_axes_stored_once(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        times = [dt.datetime(2019, 1, 1, h) for h in range(3)]
+        for path in ["a.nc", "b.nc", "c.nc"]:
+            self.insert(path, initial_time, times, [1000., 850.])
+        count, = self.connection.execute(
+            "SELECT COUNT(*) FROM axis_data").fetchone()
+        rows, = self.connection.execute(
+            "SELECT COUNT(*) FROM variable_to_time").fetchone()
+        self.assertEqual((count, rows), (2, 0))
+
+    def test_navigation_reads_packed_axes(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        times = [dt.datetime(2019, 1, 1, h) for h in range(2)]
+        self.insert("a.nc", initial_time, times, [1000., 850.])
+        self.assertEqual(
+            self.database.valid_times("*.nc", "temperature", initial_time),
+            ["2019-01-01 00:00:00", "2019-01-01 01:00:00"])
+        self.assertEqual(
+            self.database.pressures("*.nc", "temperature", initial_time),
+            [850., 1000.])
+
+    def test_storage_format_can_not_change(self):
+        with self.assertRaises(ValueError):
+            db.Database(self.connection, columnar=False)
+
+
+class TestNavigationTable(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.database = db.Database(self.connection)
+        self.locator = db.Locator(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def insert(self, path, initial_time, times, pressures,
+               time_axis=0, pressure_axis=1):
+        self.database.insert_file_name(path, initial_time)
+        self.database.insert_variable(
+            path, "temperature", time_axis=time_axis,
+            pressure_axis=pressure_axis)
+        self.database.insert_times(path, "temperature", times)
+        self.database.insert_pressures(path, "temperature", pressures)
+        self.database.rebuild_navigation()
+
+    def test_navigate_returns_indices(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        times = [dt.datetime(2019, 1, 1, h) for h in range(3)]
+        self.insert("a.nc", initial_time, times, [1000., 850.])
+        self.insert("b.nc", initial_time, times[1:], [500.])
+        result = self.locator.navigate(
+            "*.nc", "temperature", initial_time, times[2], 500.)
+        self.assertEqual(("b.nc", 1, 0), result)
+
+    def test_navigate_given_dim0_variable(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        times = [dt.datetime(2019, 1, 1, h) for h in range(3)]
+        self.insert("a.nc", initial_time, times, [1000., 850., 500.],
+                    time_axis=0, pressure_axis=0)
+        result = self.locator.locate(
+            "*.nc", "temperature", initial_time, times[1], 850.)
+        self.assertEqual(("a.nc", (1,)), result)
+
+    def test_navigate_given_pressure_and_surface_variable(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        times = [dt.datetime(2019, 1, 1, h) for h in range(3)]
+        self.insert("a.nc", initial_time, times, [], pressure_axis=None)
+        result = self.locator.navigate(
+            "*.nc", "temperature", initial_time, times[1], 850.)
+        self.assertEqual(("a.nc", 1, None), result)
+
+    def test_navigate_given_unknown_time_returns_none(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        self.insert("a.nc", initial_time, [dt.datetime(2019, 1, 1)], [1000.])
+        result = self.locator.navigate(
+            "*.nc", "temperature", initial_time,
+            dt.datetime(2019, 1, 2), 1000.)
+        self.assertIsNone(result)
+
+    def test_insert_times_removes_stale_rows(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        self.insert("a.nc", initial_time, [dt.datetime(2019, 1, 1)], [1000.])
+        self.database.insert_times(
+            "a.nc", "temperature", [dt.datetime(2019, 1, 2)])
+        count, = self.connection.execute(
+            "SELECT COUNT(*) FROM navigation").fetchone()
+        self.assertEqual(count, 0)
+
+    def test_dimensions(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        times = [dt.datetime(2019, 1, 1, h) for h in range(2)]
+        self.insert("a.nc", initial_time, times, [1000., 850.])
+        valid_times, pressures = self.database.dimensions(
+            "*.nc", "temperature", initial_time)
+        self.assertEqual(
+            valid_times, ("2019-01-01 00:00:00", "2019-01-01 01:00:00"))
+        self.assertEqual(pressures, (850., 1000.))
+
+    def test_dimensions_given_no_pattern(self):
+        initial_time = dt.datetime(2019, 1, 1)
+        self.insert("a.nc", initial_time, [dt.datetime(2019, 1, 1)], [1000.])
+        valid_times, pressures = self.database.dimensions(
+            None, "temperature", initial_time)
+        self.assertEqual(valid_times, ("2019-01-01 00:00:00",))
+        self.assertEqual(pressures, (1000.,))
@@ -0,0 +1,90 @@
+import json
+import time
+import pytest
+import forest.db
+import forest.db.main as main
+from forest.db import profile
+
+
+@pytest.fixture
+def profiler():
+    profiler = profile.enable(threshold=0.)
+    yield profiler
+    profile.disable()
+
+
+def test_wrap_given_profiling_disabled():
+    connection = object()
+    assert profile.wrap(connection) is connection
+
+
+def test_profiler_records_statements_per_shape(profiler):
+    database = forest.db.Database.connect(":memory:")
+    database.insert_variable("a.nc", "mslp")
+    database.insert_variable("b.nc", "mslp")
+    database.variables()
+    stats = profiler.data()["stats"]
+    insert = [k for k in stats if k.startswith("INSERT OR IGNORE INTO variable")]
+    assert stats[insert[0]]["count"] == 2
+
+
+def test_profiler_explains_slow_queries(profiler):
+    database = forest.db.Database.connect(":memory:")
+    database.insert_variable("a.nc", "mslp")
+    assert database.variables("*.nc") == ["mslp"]
+    entry, = [e for e in profiler.slow
+              if e["sql"].startswith("SELECT DISTINCT variable.name")]
+    assert entry["params"]["pattern"] == "*.nc"
+    assert any("file" in line for line in entry["plan"])
+
+
+def test_profiler_records_fetchone_statements(profiler):
+    database = forest.db.Database.connect(":memory:")
+    database.connection.execute("SELECT 1").fetchone()
+    assert profiler.stats["SELECT 1"]["count"] == 1
+
+
+def test_profiler_record_does_not_write_file(tmpdir):
+    path = str(tmpdir / "profile.json")
+    profiler = profile.Profiler(threshold=1., path=path, interval=0.)
+    profiler.record(None, "SELECT 1", None, 0.01)
+    assert not tmpdir.join("profile.json").exists()
+
+
+def test_profiler_start_dumps_in_background(tmpdir):
+    path = str(tmpdir / "profile.json")
+    profiler = profile.Profiler(threshold=1., path=path, interval=0.01)
+    profiler.record(None, "SELECT 1", None, 0.01)
+    profiler.start()
+    try:
+        for _ in range(500):
+            if tmpdir.join("profile.json").exists():
+                break
+            time.sleep(0.01)
+    finally:
+        profiler.stop()
+    with open(path) as stream:
+        assert json.load(stream)["stats"]["SELECT 1"]["count"] == 1
+
+
+def test_percentile():
+    histogram = [0] * len(profile.BUCKETS)
+    histogram[2] = 19
+    histogram[5] = 1
+    assert profile.percentile(histogram, 0.5) == profile.BUCKETS[2]
+    assert profile.percentile(histogram, 1.) == profile.BUCKETS[5]
+
+
+def test_main_report(tmpdir, profiler, capsys):
+    path = str(tmpdir / "profile.json")
+    database = forest.db.Database.connect(":memory:")
+    database.variables()
+    profiler.dump(path)
+    profile.disable()
+    with open(path) as stream:
+        assert "stats" in json.load(stream)
+    capsys.readouterr()
+    main.main(["report", path, "--top", "1"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split()[:2] == ["count", "mean"]
+    assert "slow queries:" in lines
@@ -0,0 +1,74 @@
+import pytest
+import forest.drivers
+from forest import db
+import forest.db.replica
+from forest.db.replica import Replica
+
+
+@pytest.fixture
+def database_file(tmpdir):
+    path = str(tmpdir / "file.db")
+    with db.Database.connect(path) as database:
+        database.insert_variable("a.nc", "mslp")
+    return path
+
+
+def test_replica_answers_queries_from_memory(database_file):
+    replica = Replica(database_file, interval=None)
+    assert replica.variables() == ["mslp"]
+    name, = [row[2] for row in
+             replica.connection.execute("PRAGMA database_list")]
+    assert name == ""
+
+
+def test_replica_load_without_backup_api(database_file, monkeypatch):
+    """Python 3.6 connections have no backup method"""
+    class Connection:
+        def __init__(self, connection):
+            self._connection = connection
+
+        def iterdump(self):
+            return self._connection.iterdump()
+
+        def close(self):
+            self._connection.close()
+
+    connect = forest.db.replica.connect_read_only
+    monkeypatch.setattr(forest.db.replica, "connect_read_only",
+                        lambda path: Connection(connect(path)))
+    replica = Replica(database_file, interval=None)
+    assert replica.variables() == ["mslp"]
+
+
+def test_replica_refresh_given_unchanged_file(database_file):
+    replica = Replica(database_file, interval=None)
+    assert not replica.refresh()
+
+
+def test_replica_refresh_given_changed_file(database_file):
+    replica = Replica(database_file, interval=None)
+    previous = replica.database
+    with db.Database.connect(database_file) as database:
+        database.insert_variable("b.nc", "air_temperature")
+    assert replica.refresh()
+    assert replica.database is not previous
+    assert replica.variables() == ["air_temperature", "mslp"]
+    assert previous.variables() == ["mslp"]
+
+
+def test_replica_background_thread_stops(database_file):
+    replica = Replica(database_file, interval=0.01)
+    replica.stop()
+    assert replica._thread is None
+
+
+def test_dataset_given_replica_setting(database_file):
+    settings = {
+        "pattern": "*.nc",
+        "locator": "database",
+        "database_path": database_file,
+        "replica": True
+    }
+    dataset = forest.drivers.get_dataset("unified_model", settings)
+    navigator = dataset.navigator()
+    assert navigator.variables("*.nc") == ["mslp"]
@@ -0,0 +1,96 @@
+import datetime as dt
+import sqlite3
+import pytest
+import forest.db
+import forest.db.main as main
+from forest.db import bulk, retention
+
+
+NOW = dt.datetime(2019, 1, 10)
+
+
+@pytest.fixture(params=[None, True])
+def database(request):
+    database = forest.db.Database.connect(":memory:", columnar=request.param)
+    for day in range(1, 10):
+        for model in ["ga7", "4p4km"]:
+            path = "/data/{}_{:02d}.nc".format(model, day)
+            reference = dt.datetime(2019, 1, day)
+            database.insert_file_name(path, reference)
+            database.insert_variable(path, "mslp", time_axis=0)
+            database.insert_times(path, "mslp", [
+                reference + dt.timedelta(hours=3 * day)])
+    database.connection.commit()
+    return database
+
+
+def test_expired_given_max_age(database):
+    result = retention.expired(
+        database, "*ga7*", max_age=dt.timedelta(days=7), now=NOW)
+    assert result == ["/data/ga7_01.nc", "/data/ga7_02.nc"]
+
+
+def test_expired_given_keep(database):
+    result = retention.expired(database, "*4p4km*", keep=7, now=NOW)
+    assert result == ["/data/4p4km_01.nc", "/data/4p4km_02.nc"]
+
+
+def test_expired_given_no_policy(database):
+    assert retention.expired(database, now=NOW) == []
+
+
+def test_prune_counts_runs_per_pattern(database):
+    retention.prune(database, patterns=["*ga7*", "*4p4km*"], keep=1)
+    assert database.files() == ["/data/4p4km_09.nc", "/data/ga7_09.nc"]
+
+
+def test_prune_removes_orphaned_coordinates(database):
+    retention.prune(database, keep=1)
+    table = "axis_data" if database.columnar else "time"
+    count, = database.connection.execute(
+        "SELECT COUNT(*) FROM {}".format(table)).fetchone()
+    assert count == 1
+    assert database.valid_times() == ["2019-01-10 03:00:00"]
+
+
+def test_prune_removes_orphaned_grids(database):
+    for day in [1, 9]:
+        path = "/data/ga7_{:02d}.nc".format(day)
+        grid = bulk.Grid(hash=str(day), shape=(2, 2), lon_min=0,
+                         lon_max=1, lat_min=0, lat_max=1, regular=True)
+        variable = bulk.VariableHeader(
+            "mslp", 0, None, None, None, grid=grid)
+        database._update_metadata(database._file_id(path), [variable])
+    retention.prune(database, patterns=["*ga7*"], keep=1)
+    rows = database.connection.execute("SELECT hash FROM grid").fetchall()
+    assert rows == [("9",)]
+
+
+def test_prune_given_dry_run(database):
+    names = retention.prune(database, keep=8, dry_run=True)
+    assert names == ["/data/4p4km_01.nc", "/data/ga7_01.nc"]
+    assert len(database.files()) == 18
+
+
+def test_vacuum_converts_database(tmpdir):
+    path = str(tmpdir / "file.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE file (name TEXT)")
+    connection.commit()
+    retention.vacuum(connection)
+    assert connection.execute("PRAGMA auto_vacuum").fetchone() == (0,)
+    retention.vacuum(connection, full=True)
+    assert connection.execute("PRAGMA auto_vacuum").fetchone() == (2,)
+    retention.vacuum(connection, pages=10)
+    connection.close()
+
+
+def test_main_prune(tmpdir):
+    path = str(tmpdir / "file.db")
+    with forest.db.Database.connect(path) as database:
+        for day in [1, 2]:
+            database.insert_file_name(
+                "a_{}.nc".format(day), dt.datetime(2019, 1, day))
+    main.main(["prune", "--database", path, "--keep", "1"])
+    database = forest.db.Database.connect(path)
+    assert database.files() == ["a_2.nc"]
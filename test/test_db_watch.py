@@ -0,0 +1,141 @@
+import datetime as dt
+import os
+import netCDF4
+import pytest
+import forest.db
+import forest.db.main as main
+from forest.db.watch import Watcher
+
+
+UNITS = "hours since 1970-01-01 00:00:00"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+def write_netcdf(path):
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("time", 1)
+        obj = dataset.createVariable("forecast_reference_time", "d", ())
+        obj[:] = netCDF4.date2num(dt.datetime(2019, 1, 1), UNITS)
+        obj.units = UNITS
+        obj = dataset.createVariable("time", "d", ("time",))
+        obj.units = UNITS
+        obj[:] = netCDF4.date2num([dt.datetime(2019, 1, 1, 3)], UNITS)
+        obj = dataset.createVariable("mslp", "f", ("time",))
+
+
+def test_watcher_debounces_new_files(tmpdir):
+    clock = Clock()
+    path = str(tmpdir / "a.nc")
+    watcher = Watcher([str(tmpdir / "*.nc")], settle=10., clock=clock)
+    assert watcher.poll() == []
+    open(path, "w").close()
+    assert watcher.poll() == []
+    clock.now = 5.
+    with open(path, "w") as stream:
+        stream.write("more data")
+    os.utime(path, (1, 1))
+    assert watcher.poll() == []
+    clock.now = 14.
+    assert watcher.poll() == []
+    clock.now = 15.
+    assert watcher.poll() == [path]
+    assert watcher.poll() == []
+
+
+def test_watcher_ignores_indexed_files(tmpdir):
+    path = str(tmpdir / "a.nc")
+    open(path, "w").close()
+    stat = os.stat(path)
+    watcher = Watcher([str(tmpdir / "*.nc")],
+                      stats={path: (stat.st_size, stat.st_mtime)},
+                      settle=0.)
+    assert watcher.poll() == []
+
+
+def test_watcher_does_not_stat_indexed_files(tmpdir, monkeypatch):
+    path = str(tmpdir / "a.nc")
+    open(path, "w").close()
+    stat = os.stat(path)
+    watcher = Watcher([str(tmpdir / "*.nc")],
+                      stats={path: (stat.st_size, stat.st_mtime)},
+                      settle=0.)
+    calls = []
+    original = forest.db.watch.os.stat
+
+    def spy(name, *args, **kwargs):
+        calls.append(name)
+        return original(name, *args, **kwargs)
+
+    monkeypatch.setattr(forest.db.watch.os, "stat", spy)
+    for _ in range(2):
+        assert watcher.poll() == []
+    assert path not in calls
+
+
+def test_watcher_lists_unchanged_directory_once(tmpdir, monkeypatch):
+    calls = []
+    original = forest.db.watch.glob.glob
+
+    def spy(pattern):
+        calls.append(pattern)
+        return original(pattern)
+
+    monkeypatch.setattr(forest.db.watch.glob, "glob", spy)
+    watcher = Watcher([str(tmpdir / "*.nc")], settle=0.)
+    watcher.poll()
+    watcher.poll()
+    assert len(calls) == 1
+
+
+def test_main_watch_indexes_new_files(tmpdir):
+    database_file = str(tmpdir / "file.db")
+    path = str(tmpdir / "a.nc")
+    write_netcdf(path)
+    forest.db.watch.main([
+        "--database", database_file,
+        "--settle", "0",
+        "--interval", "0",
+        "--processes", "1",
+        str(tmpdir / "*.nc")], iterations=2)
+    database = forest.db.Database.connect(database_file)
+    assert database.files() == [path]
+    assert database.variables() == ["mslp"]
+
+
+def test_main_dispatches_watch_command(monkeypatch):
+    calls = []
+    monkeypatch.setitem(main.COMMANDS, "watch", calls.append)
+    main.main(["watch", "--database", "file.db", "*.nc"])
+    assert calls == [["--database", "file.db", "*.nc"]]
+
+
+def test_watcher_retries_failed_files_once_changed(tmpdir):
+    path = str(tmpdir / "a.nc")
+    open(path, "w").close()
+    watcher = Watcher([str(tmpdir / "*.nc")], settle=0.)
+    assert watcher.poll() == [path]
+    watcher.fail(path)
+    assert watcher.poll() == []
+    with open(path, "w") as stream:
+        stream.write("more data")
+    assert watcher.poll() == [path]
+
+
+def test_main_watch_skips_unreadable_file_once(tmpdir, capsys):
+    database_file = str(tmpdir / "file.db")
+    with open(str(tmpdir / "a.nc"), "w") as stream:
+        stream.write("not netcdf")
+    forest.db.watch.main([
+        "--database", database_file,
+        "--settle", "0",
+        "--interval", "0",
+        "--processes", "1",
+        str(tmpdir / "*.nc")], iterations=3)
+    assert capsys.readouterr().out.count("skipping") == 1
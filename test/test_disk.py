@@ -412,3 +412,57 @@ class TestNumpy(unittest.TestCase):
         result = x[pts].shape
         expect = (2, 2)
         self.assertEqual(expect, result)
+
+
+def _write_time_pressure(path, reference_time, times, pressures):
+    with netCDF4.Dataset(path, "w") as dataset:
+        um = tutorial.UM(dataset)
+        dataset.createDimension("longitude", 1)
+        dataset.createDimension("latitude", 1)
+        var = um.times("time", length=len(times))
+        var[:] = netCDF4.date2num(times, units=var.units)
+        um.forecast_reference_time(reference_time)
+        var = um.pressures("pressure", length=len(pressures))
+        var[:] = pressures
+        dims = ("time", "pressure", "longitude", "latitude")
+        coordinates = "forecast_period_1 forecast_reference_time"
+        var = um.relative_humidity(dims, coordinates=coordinates)
+        var[:] = 100.
+
+
+def test_locator_repeat_lookups_do_not_open_file(tmpdir):
+    path = str(tmpdir / "file.nc")
+    reference_time = dt.datetime(2019, 1, 1)
+    times = [dt.datetime(2019, 1, 2, 3), dt.datetime(2019, 1, 2)]
+    _write_time_pressure(path, reference_time, times, [1000, 850])
+    locator = unified_model.Locator([path])
+    args = (path, "relative_humidity", reference_time)
+    assert locator.locate(*args, times[0], 850) == (path, (0, 1))
+    os.remove(path)
+    assert locator.locate(*args, times[1], 1000) == (path, (1, 0))
+
+
+def test_locator_pattern_indexes_new_files(tmpdir):
+    pattern = str(tmpdir / "*.nc")
+    locator = unified_model.Locator(
+        [], pattern=pattern, interval=dt.timedelta(0))
+    reference_time = dt.datetime(2019, 1, 1)
+    time = dt.datetime(2019, 1, 2)
+    path = str(tmpdir / "file.nc")
+    _write_time_pressure(path, reference_time, [time], [1000])
+    result = locator.locate(
+        pattern, "relative_humidity", reference_time, time, 1000)
+    assert result == (path, (0, 0))
+
+
+def test_axis_index_given_shared_axis():
+    times = np.array(["2019-01-01T00", "2019-01-01T03"] * 2,
+                     dtype="datetime64[s]")
+    pressures = [1000., 1000., 850., 850.]
+    index = unified_model.AxisIndex(
+        ndim=1, times=times, time_axis=0,
+        pressures=pressures, pressure_axis=0)
+    assert index.find(dt.datetime(2019, 1, 1, 3), 850.) == (3,)
+    assert index.find(dt.datetime(2019, 1, 1, 6), 850.) is None
+    with pytest.raises(SearchFail):
+        index.find(None, 850.)
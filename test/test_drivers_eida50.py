@@ -301,3 +301,59 @@ def test_database_insert_times_supported_types(value, expect):
     database = forest.drivers.eida50.Database()
     database.insert_times([value], "file.nc")
     assert database.fetch_times() == [expect]
+
+
+def test_timestamp_index_parses_new_paths_only():
+    parse = Mock(side_effect=eida50.Locator.parse_date)
+    index = eida50.TimestampIndex(parse)
+    index.update(["eida50_20200102.nc", "eida50_20200101.nc"])
+    index.update(["eida50_20200102.nc", "eida50_20200101.nc",
+                  "eida50_20200103.nc"])
+    assert parse.call_count == 3
+    assert index.paths == ["eida50_20200101.nc", "eida50_20200102.nc",
+                           "eida50_20200103.nc"]
+
+
+def test_timestamp_index_forgets_removed_paths():
+    index = eida50.TimestampIndex(eida50.Locator.parse_date)
+    index.update(["eida50_20200101.nc", "eida50_20200102.nc"])
+    index.update(["eida50_20200102.nc"])
+    assert index.paths == ["eida50_20200102.nc"]
+    with pytest.raises(FileNotFound):
+        index.find(dt.datetime(2020, 1, 1, 12))
+
+
+@pytest.mark.parametrize("date,expect", [
+    (dt.datetime(2020, 1, 1), "eida50_20200101.nc"),
+    (dt.datetime(2020, 1, 2, 23), "eida50_20200102.nc"),
+    (np.datetime64("2020-01-05T00:00:00", "ns"), "eida50_20200103.nc"),
+])
+def test_timestamp_index_find(date, expect):
+    index = eida50.TimestampIndex(eida50.Locator.parse_date)
+    index.update(["eida50.nc", "eida50_20200101.nc", "eida50_20200102.nc",
+                  "eida50_20200103.nc"])
+    assert index.find(date) == expect
+
+
+def test_timestamp_index_find_during_update_sees_previous_index():
+    found = []
+
+    def parse(path):
+        found.append(index.find(dt.datetime(2020, 1, 3)))
+        return eida50.Locator.parse_date(path)
+
+    index = eida50.TimestampIndex(eida50.Locator.parse_date)
+    index.update(["eida50_20200102.nc"])
+    index.parse = parse
+    index.update(["eida50_20200101.nc", "eida50_20200102.nc"])
+    assert found == ["eida50_20200102.nc"]
+    assert index.find(dt.datetime(2020, 1, 1)) == "eida50_20200101.nc"
+
+
+def test_database_has_path():
+    database = forest.drivers.eida50.Database()
+    database.insert_times([dt.datetime(2020, 1, 1)], "a.nc")
+    assert database.has_path("a.nc")
+    assert not database.has_path("b.nc")
+    database.insert_times([dt.datetime(2020, 1, 2)], "b.nc")
+    assert database.has_path("b.nc")
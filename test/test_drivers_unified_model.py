@@ -1,7 +1,11 @@
 import pytest
+import os
 import datetime as dt
+import numpy as np
 import bokeh.models
 import forest.drivers
+import forest.util
+from forest import geo
 from forest.drivers import unified_model
 import forest.db
 import sqlite3
@@ -117,3 +121,198 @@ def insert_lonlat(dataset, lons, lats):
     var[:] = lons
     var = dataset.createVariable("latitude", "f", ("latitude",))
     var[:] = lats
+
+
+def _um_file(path, times):
+    with netCDF4.Dataset(path, "w") as dataset:
+        insert_lonlat(dataset, [0, 1], [0, 1])
+        insert_times(dataset, times)
+        var = dataset.createVariable(
+            "forecast_reference_time", "d", ())
+        var.units = "hours since 1970-01-01 00:00:00"
+        var[:] = netCDF4.date2num(times[0], units=var.units)
+        dataset.createVariable(
+            "air_temperature", "f", ("time", "latitude", "longitude"))
+
+
+def test_metadata_cache_reads_file_once(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _um_file(path, [dt.datetime(2020, 1, 1)])
+    calls = []
+
+    def func(path, variable):
+        calls.append(path)
+        return variable
+
+    cache = unified_model.MetadataCache()
+    assert cache.get(path, "valid", func, variable="x") == "x"
+    assert cache.get(path, "valid", func, variable="x") == "x"
+    assert len(calls) == 1
+
+
+def test_metadata_cache_invalidated_by_file_change(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _um_file(path, [dt.datetime(2020, 1, 1)])
+    cache = unified_model.MetadataCache()
+    assert cache.get(path, "initial", lambda p: 1) == 1
+    _um_file(path, [dt.datetime(2020, 1, 1), dt.datetime(2020, 1, 2)])
+    assert cache.get(path, "initial", lambda p: 2) == 2
+
+
+def test_metadata_cache_sidecar_warm_start(tmpdir):
+    path = str(tmpdir / "file.nc")
+    sidecar = str(tmpdir / "sidecar.json")
+    times = [dt.datetime(2020, 1, 1), dt.datetime(2020, 1, 1, 3)]
+    _um_file(path, times)
+    navigator = unified_model.Navigator(
+        path, cache=unified_model.MetadataCache(sidecar))
+    expect = navigator.valid_times(path, "air_temperature", None)
+
+    cache = unified_model.MetadataCache(sidecar)
+
+    def fail(*args):
+        raise AssertionError("file opened")
+
+    navigator = unified_model.Navigator(path, cache=cache)
+    navigator._locators["valid"] = fail
+    result = navigator.valid_times(path, "air_temperature", None)
+    np.testing.assert_array_equal(result, expect)
+
+
+def test_navigator_initial_times_uses_cache(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _um_file(path, [dt.datetime(2020, 1, 1)])
+    cache = unified_model.MetadataCache()
+    navigator = unified_model.Navigator(path, cache=cache)
+    assert navigator.initial_times(path, None) == [dt.datetime(2020, 1, 1)]
+    navigator._locators["initial"] = None
+    assert navigator.initial_times(path, None) == [dt.datetime(2020, 1, 1)]
+
+
+def test_metadata_cache_save_is_throttled(tmpdir):
+    path = str(tmpdir / "file.nc")
+    sidecar = str(tmpdir / "sidecar.json")
+    _um_file(path, [dt.datetime(2020, 1, 1)])
+    cache = unified_model.MetadataCache(sidecar, interval=60.)
+    cache.get(path, "initial", unified_model.read_initial_time)
+    cache.save()
+    cache.get(path, "variables", lambda p: ["x"])
+    cache.save()
+    assert "variables" not in unified_model.MetadataCache(
+        sidecar)._entries[path]["values"]
+    cache.flush()
+    entries = unified_model.MetadataCache(sidecar)._entries
+    assert entries[path]["values"] == {
+        "initial": dt.datetime(2020, 1, 1), "variables": ["x"]}
+    assert sorted(os.listdir(str(tmpdir))) == ["file.nc", "sidecar.json"]
+
+
+def test_load_image_given_region(tmpdir):
+    path = str(tmpdir / "file.nc")
+    variable = "air_temperature"
+    with netCDF4.Dataset(path, "w") as dataset:
+        insert_lonlat(dataset, np.arange(0, 360, 10), np.arange(-80, 90, 10))
+        var = dataset.createVariable(variable, "f", ("latitude", "longitude"))
+        var[:] = np.ones((17, 36))
+    region = forest.util.Region((100, 130), (-10, 20))
+    data = unified_model.Loader.load_image(path, variable, (), region=region)
+    assert data["x"][0] == pytest.approx(geo.web_mercator(90, 0)[0][0])
+    assert data["image"][0].shape[1] == 6
+
+
+def test_load_image_given_region_outside_field(tmpdir):
+    path = str(tmpdir / "file.nc")
+    variable = "air_temperature"
+    with netCDF4.Dataset(path, "w") as dataset:
+        insert_lonlat(dataset, [100, 110], [0, 10])
+        var = dataset.createVariable(variable, "f", ("latitude", "longitude"))
+        var[:] = np.ones((2, 2))
+    region = forest.util.Region((-50, -40), (0, 10))
+    data = unified_model.Loader.load_image(path, variable, (), region=region)
+    assert data["image"] == []
+
+
+def test_load_image_returns_float32_with_nan(tmpdir):
+    path = str(tmpdir / "file.nc")
+    variable = "air_temperature"
+    with netCDF4.Dataset(path, "w") as dataset:
+        insert_lonlat(dataset, [0, 90, 180, 270], [0, 10])
+        var = dataset.createVariable(variable, "f", ("latitude", "longitude"),
+                                     fill_value=-1e30)
+        var.units = "K"
+        var[:] = np.ma.masked_array(
+            np.full((2, 4), 273.15), mask=[[1, 0, 0, 0], [0, 0, 0, 0]])
+    data = unified_model.Loader.load_image(path, variable, ())
+    image = data["image"][0]
+    assert data["units"] == ["C"]
+    assert image.dtype == np.float32
+    assert image.flags.c_contiguous
+    assert not np.ma.isMaskedArray(image)
+    assert np.isnan(image).sum() > 0
+    assert np.nanmax(np.abs(image)) == pytest.approx(0, abs=1e-4)
+
+
+def test_dataset_given_region_settings():
+    settings = {
+        "pattern": "*.nc",
+        "region": {"lon_range": [100, 130], "lat_range": [-10, 20]}}
+    dataset = forest.drivers.get_dataset("unified_model", settings)
+    assert dataset.region == forest.util.Region((100, 130), (-10, 20))
+
+
+def test_reader_cache_remembers_successful_reader():
+    readers = unified_model.ReaderCache()
+    calls = []
+
+    def fail():
+        calls.append("netcdf4")
+        raise KeyError("time")
+
+    def succeed():
+        calls.append("iris")
+        return 42
+
+    for _ in range(2):
+        result = readers.read("valid_times", ("file.nc", "x"), [
+            ("netcdf4", fail), ("iris", succeed)], errors=KeyError)
+        assert result == 42
+    assert calls == ["netcdf4", "iris", "iris"]
+    stats = readers.stats()
+    assert stats["valid_times.netcdf4"]["failures"] == 1
+    assert stats["valid_times.iris"]["calls"] == 2
+    assert stats["valid_times.iris"]["failures"] == 0
+
+
+def test_reader_cache_raises_unexpected_errors():
+    readers = unified_model.ReaderCache()
+
+    def fail():
+        raise ValueError("bad file")
+
+    with pytest.raises(ValueError):
+        readers.read("pressures", "file.nc", [
+            ("netcdf4", fail), ("iris", lambda: 1)], errors=KeyError)
+
+
+def test_reader_cache_forgets_least_recently_used_choice():
+    readers = unified_model.ReaderCache(maxsize=2)
+    for path in ["a.nc", "b.nc", "a.nc", "c.nc"]:
+        readers.read("load_image", path, [("iris", lambda: 1)])
+    calls = []
+
+    def iris():
+        calls.append("iris")
+        return 1
+
+    for path in ["a.nc", "b.nc"]:
+        readers.read("load_image", path, [
+            ("xarray", lambda: calls.append("xarray")), ("iris", iris)])
+    assert calls == ["iris", "xarray"]
+
+
+def test_reader_cache_falls_back_if_remembered_reader_fails():
+    readers = unified_model.ReaderCache()
+    readers.read("load_image", "file.nc", [("iris", lambda: 1)])
+    result = readers.read("load_image", "file.nc", [
+        ("xarray", lambda: 2), ("iris", lambda: 1 / 0)])
+    assert result == 2
@@ -5,6 +5,8 @@ import unittest
 import iris
 import numpy as np
 
+import forest.util
+from forest.cache import ImageCache
 from forest.drivers import ghrsstl4
 
 
@@ -128,79 +130,97 @@ class Test_load(unittest.TestCase):
 
 
 class Test_ImageLoader(unittest.TestCase):
-    @patch('forest.drivers.ghrsstl4._load')
-    def test_init(self, load):
-        load.return_value = sentinel.cubes
-        result = ghrsstl4.ImageLoader(sentinel.label, sentinel.pattern)
-        load.assert_called_once_with(sentinel.pattern)
+    def test_init(self):
+        result = ghrsstl4.ImageLoader(sentinel.label, sentinel.catalogue)
         self.assertEqual(result._label, sentinel.label)
-        self.assertEqual(result._cubes, sentinel.cubes)
+        self.assertEqual(result._catalogue, sentinel.catalogue)
 
-    @patch('forest.drivers.ghrsstl4.empty_image')
-    @patch('iris.Constraint')
-    @patch('forest.drivers.ghrsstl4._to_datetime')
-    def test_empty(self, to_datetime, constraint, empty_image):
-        # To avoid re-testing the constructor, just make a fake ImageLoader
-        # instance.
-        original_cube = Mock()
-        original_cube.extract.return_value = None
-        image_loader = Mock(_cubes={'foo': original_cube})
+    @patch('forest.drivers.ghrsstl4.image_cache')
+    def test_empty(self, image_cache):
+        image_cache.return_value = ImageCache()
+        catalogue = Mock()
+        catalogue.frame.return_value = None
+        image_loader = ghrsstl4.ImageLoader('my-label', catalogue)
+        valid = datetime(2019, 10, 10)
 
-        to_datetime.return_value = sentinel.valid_datetime
-        constraint.return_value = sentinel.constraint
-        empty_image.return_value = sentinel.empty_image
+        result = image_loader.image(Mock(variable='foo', valid_time=valid))
 
-        result = ghrsstl4.ImageLoader.image(
-            image_loader, Mock(variable='foo', valid_time=sentinel.valid))
-
-        to_datetime.assert_called_once_with(sentinel.valid)
-        constraint.assert_called_once_with(time=sentinel.valid_datetime)
-        original_cube.extract.assert_called_once_with(sentinel.constraint)
-        self.assertEqual(result, sentinel.empty_image)
+        catalogue.frame.assert_called_once_with('foo', valid)
+        self.assertEqual(result, ghrsstl4.empty_image())
 
+    @patch('forest.drivers.ghrsstl4.image_cache')
+    @patch('forest.drivers.ghrsstl4.decimate')
     @patch('forest.drivers.ghrsstl4.coordinates')
     @patch('forest.geo.stretch_image')
-    @patch('iris.Constraint')
-    @patch('forest.drivers.ghrsstl4._to_datetime')
-    def test_image(self, to_datetime, constraint, stretch_image, coordinates):
-        # To avoid re-testing the constructor, just make a fake ImageLoader
-        # instance.
+    def test_image(self, stretch_image, coordinates, decimate, image_cache):
+        image_cache.return_value = ImageCache()
         cube = Mock()
         cube.coord.side_effect = [Mock(points=sentinel.longitudes),
                                   Mock(points=sentinel.latitudes)]
         cube.units.__str__ = lambda self: 'my-units'
-        original_cube = Mock()
-        original_cube.extract.return_value = cube
-        image_loader = Mock(_cubes={'foo': original_cube}, _label='my-label')
-
-        to_datetime.return_value = sentinel.valid_datetime
-        constraint.return_value = sentinel.constraint
-        stretch_image.return_value = {'stretched_image': True}
+        decimate.return_value = cube
+        catalogue = Mock()
+        catalogue.frame.return_value = sentinel.frame
+        image_loader = ghrsstl4.ImageLoader('my-label', catalogue,
+                                            region=sentinel.region)
+        image_loader.pixels = 400
+
+        stretch_image.return_value = {'image': [sentinel.image]}
         coordinates.return_value = {'coordinates': True}
 
-        result = ghrsstl4.ImageLoader.image(
-            image_loader, Mock(variable='foo', valid_time=sentinel.valid,
-                               initial_time=sentinel.initial,
-                               pressures=sentinel.pressures,
-                               pressure=sentinel.pressure))
+        state = Mock(variable='foo', valid_time=datetime(2019, 10, 10),
+                     initial_time=sentinel.initial,
+                     pressures=sentinel.pressures,
+                     pressure=sentinel.pressure)
+        result = image_loader.image(state)
+        image_loader.image(state)
 
+        decimate.assert_called_once_with(sentinel.frame,
+                                         region=sentinel.region, pixels=400)
         self.assertEqual(cube.coord.mock_calls, [call('longitude'),
                                                  call('latitude')])
         stretch_image.assert_called_once_with(sentinel.longitudes,
                                               sentinel.latitudes, cube.data)
-        coordinates.assert_called_once_with(sentinel.valid, sentinel.initial,
-                                            sentinel.pressures,
-                                            sentinel.pressure)
-        self.assertEqual(result, {'stretched_image': True, 'coordinates': True,
+        coordinates.assert_called_with(state.valid_time, sentinel.initial,
+                                       sentinel.pressures,
+                                       sentinel.pressure)
+        self.assertEqual(result, {'image': [sentinel.image],
+                                  'coordinates': True,
                                   'name': ['my-label'], 'units': ['my-units']})
 
 
+class Test_decimate(unittest.TestCase):
+    def setUp(self):
+        import dask.array
+        lon = iris.coords.DimCoord(np.arange(-180, 180, 1.), 'longitude')
+        lat = iris.coords.DimCoord(np.arange(-90, 90, 1.), 'latitude')
+        data = dask.array.zeros((180, 360), chunks=(60, 60), dtype='f4')
+        self.cube = iris.cube.Cube(
+            data, 'sea_surface_foundation_temperature',
+            dim_coords_and_dims=[(lat, 0), (lon, 1)])
+
+    def test_pixels(self):
+        result = ghrsstl4.decimate(self.cube, pixels=100)
+        self.assertEqual(result.shape, (45, 90))
+        self.assertTrue(result.has_lazy_data())
+
+    def test_region_aligned_to_chunks(self):
+        region = forest.util.Region((10, 20), (-5, 5))
+        result = ghrsstl4.decimate(self.cube, region=region, pixels=1000)
+        lons = result.coord('longitude').points
+        lats = result.coord('latitude').points
+        self.assertEqual((lons[0], lons[-1]), (0, 59))
+        self.assertEqual((lats[0], lats[-1]), (-30, 29))
+
+    def test_region_outside_grid(self):
+        region = forest.util.Region((10, 20), (100, 110))
+        self.assertIsNone(ghrsstl4.decimate(self.cube, region=region))
+
+
 class Test_Navigator(unittest.TestCase):
-    @patch('forest.drivers.ghrsstl4._load')
-    def test_init(self, load):
-        load.return_value = sentinel.cubes
-        result = ghrsstl4.Navigator(sentinel.paths)
-        load.assert_called_once_with(sentinel.paths)
+    def test_init(self):
+        catalogue = Mock(cubes=sentinel.cubes)
+        result = ghrsstl4.Navigator(catalogue)
         self.assertEqual(result._cubes, sentinel.cubes)
 
     def test_variables(self):
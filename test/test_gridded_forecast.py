@@ -1,5 +1,6 @@
 import pytest
 import cftime
+import cf_units
 from datetime import datetime
 from unittest.mock import Mock, call, patch, sentinel
 import unittest
@@ -141,54 +142,112 @@ class Test_load(unittest.TestCase):
             gridded_forecast._load(None)
 
 
+class Test_Catalogue(unittest.TestCase):
+    def setUp(self):
+        import dask.array
+        lon = iris.coords.DimCoord(range(5), 'longitude')
+        lat = iris.coords.DimCoord(range(4), 'latitude')
+        time = iris.coords.DimCoord([0, 6, 12], 'time',
+                                    units='hours since 2019-10-10 00:00:00')
+        frt = iris.coords.AuxCoord(0, 'forecast_reference_time',
+                                   units='hours since 2019-10-10 00:00:00')
+        data = dask.array.arange(60, dtype='f4').reshape(3, 4, 5)
+        self.cube = iris.cube.Cube(data, 'air_temperature',
+                                   dim_coords_and_dims=[(time, 0), (lat, 1),
+                                                        (lon, 2)],
+                                   aux_coords_and_dims=[(frt, ())])
+        self.load = Mock(return_value={'air_temperature': self.cube})
+
+    def test_loads_once_on_first_use(self):
+        catalogue = gridded_forecast.Catalogue(sentinel.paths, load=self.load)
+        self.load.assert_not_called()
+        navigator = gridded_forecast.Navigator(catalogue)
+        loader = gridded_forecast.ImageLoader('label', catalogue)
+        navigator.variables(None)
+        catalogue.frame('air_temperature', datetime(2019, 10, 10, 6))
+        self.load.assert_called_once_with(sentinel.paths)
+
+    def test_time_index(self):
+        catalogue = gridded_forecast.Catalogue(None, load=self.load)
+        result = catalogue.time_index('air_temperature')
+        self.assertEqual(result, {
+            np.datetime64('2019-10-10T00:00:00'): 0,
+            np.datetime64('2019-10-10T06:00:00'): 1,
+            np.datetime64('2019-10-10T12:00:00'): 2})
+
+    def test_time_index_given_proleptic_gregorian_calendar(self):
+        self.cube.coord('time').units = cf_units.Unit(
+            'hours since 2019-10-10 00:00:00', calendar='proleptic_gregorian')
+        catalogue = gridded_forecast.Catalogue(None, load=self.load)
+        result = catalogue.time_index('air_temperature')
+        self.assertEqual(result, {
+            np.datetime64('2019-10-10T00:00:00'): 0,
+            np.datetime64('2019-10-10T06:00:00'): 1,
+            np.datetime64('2019-10-10T12:00:00'): 2})
+        value = cftime.DatetimeProlepticGregorian(2019, 10, 10, 6)
+        self.assertEqual(
+            catalogue.frame('air_temperature', value).data[0, 0], 20)
+
+    def test_time_index_skips_dates_missing_from_real_calendar(self):
+        self.cube.coord('time').units = cf_units.Unit(
+            'days since 2019-02-24 00:00:00', calendar='360_day')
+        catalogue = gridded_forecast.Catalogue(None, load=self.load)
+        result = catalogue.time_index('air_temperature')
+        self.assertEqual(result, {
+            np.datetime64('2019-02-24T00:00:00'): 0,
+            np.datetime64('2019-03-06T00:00:00'): 2})
+
+    def test_frame_is_lazy_2d_slice(self):
+        catalogue = gridded_forecast.Catalogue(None, load=self.load)
+        result = catalogue.frame('air_temperature',
+                                 np.datetime64('2019-10-10T12:00:00', 'ns'))
+        self.assertEqual(result.shape, (4, 5))
+        self.assertTrue(result.has_lazy_data())
+        self.assertEqual(result.data[0, 0], 40)
+        self.assertTrue(self.cube.has_lazy_data())
+
+    def test_frame_not_found(self):
+        catalogue = gridded_forecast.Catalogue(None, load=self.load)
+        result = catalogue.frame('air_temperature',
+                                 datetime(2019, 10, 10, 3))
+        self.assertIsNone(result)
+
+
 class Test_ImageLoader(unittest.TestCase):
-    @patch('forest.drivers.gridded_forecast._load')
-    def test_init(self, load):
-        load.return_value = sentinel.cubes
-        result = gridded_forecast.ImageLoader(sentinel.label, sentinel.pattern)
-        load.assert_called_once_with(sentinel.pattern)
+    def test_init(self):
+        result = gridded_forecast.ImageLoader(sentinel.label, sentinel.catalogue)
         self.assertEqual(result._label, sentinel.label)
-        self.assertEqual(result._cubes, sentinel.cubes)
+        self.assertEqual(result._catalogue, sentinel.catalogue)
 
     @patch('forest.drivers.gridded_forecast.empty_image')
-    @patch('iris.Constraint')
-    @patch('forest.drivers.gridded_forecast._to_datetime')
-    def test_empty(self, to_datetime, constraint, empty_image):
+    def test_empty(self, empty_image):
         # To avoid re-testing the constructor, just make a fake ImageLoader
         # instance.
-        original_cube = Mock()
-        original_cube.extract.return_value = None
-        image_loader = Mock(_cubes={'foo': original_cube})
+        catalogue = Mock()
+        catalogue.frame.return_value = None
+        image_loader = Mock(_catalogue=catalogue)
 
-        to_datetime.return_value = sentinel.valid_datetime
-        constraint.return_value = sentinel.constraint
         empty_image.return_value = sentinel.empty_image
 
         result = gridded_forecast.ImageLoader.image(
             image_loader, Mock(variable='foo', valid_time=sentinel.valid))
 
-        to_datetime.assert_called_once_with(sentinel.valid)
-        constraint.assert_called_once_with(time=sentinel.valid_datetime)
-        original_cube.extract.assert_called_once_with(sentinel.constraint)
+        catalogue.frame.assert_called_once_with('foo', sentinel.valid)
         self.assertEqual(result, sentinel.empty_image)
 
     @patch('forest.drivers.gridded_forecast.coordinates')
     @patch('forest.geo.stretch_image')
-    @patch('iris.Constraint')
-    @patch('forest.drivers.gridded_forecast._to_datetime')
-    def test_image(self, to_datetime, constraint, stretch_image, coordinates):
+    def test_image(self, stretch_image, coordinates):
         # To avoid re-testing the constructor, just make a fake ImageLoader
         # instance.
         cube = Mock()
         cube.coord.side_effect = [Mock(points=sentinel.longitudes),
                                   Mock(points=sentinel.latitudes)]
         cube.units.__str__ = lambda self: 'my-units'
-        original_cube = Mock()
-        original_cube.extract.return_value = cube
-        image_loader = Mock(_cubes={'foo': original_cube}, _label='my-label')
+        catalogue = Mock()
+        catalogue.frame.return_value = cube
+        image_loader = Mock(_catalogue=catalogue, _label='my-label')
 
-        to_datetime.return_value = sentinel.valid_datetime
-        constraint.return_value = sentinel.constraint
         stretch_image.return_value = {'stretched_image': True}
         coordinates.return_value = {'coordinates': True}
 
@@ -210,11 +269,9 @@ class Test_ImageLoader(unittest.TestCase):
 
 
 class Test_Navigator(unittest.TestCase):
-    @patch('forest.drivers.gridded_forecast._load')
-    def test_init(self, load):
-        load.return_value = sentinel.cubes
-        result = gridded_forecast.Navigator(sentinel.paths)
-        load.assert_called_once_with(sentinel.paths)
+    def test_init(self):
+        catalogue = Mock(cubes=sentinel.cubes)
+        result = gridded_forecast.Navigator(catalogue)
         self.assertEqual(result._cubes, sentinel.cubes)
 
     def test_variables(self):
@@ -76,5 +76,6 @@ def test_drivers__get_dataset_from__griddedforecast(glob, navigator_cls):
     dataset = forest.drivers.gridded_forecast.Dataset("gridded_forecast", sentinel.settings)
     navigator = dataset.navigator()
 
-    navigator_cls.assert_called_once_with(sentinel.paths)
+    navigator_cls.assert_called_once_with(dataset._catalogue)
+    assert dataset._catalogue.paths == sentinel.paths
     assert navigator == sentinel.navigator
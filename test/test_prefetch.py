@@ -0,0 +1,93 @@
+import concurrent.futures
+import datetime as dt
+import threading
+from forest import prefetch
+
+
+class FakeLoader:
+    def __init__(self, block=None):
+        self.states = []
+        self.block = block
+
+    def prefetch(self, state):
+        if self.block is not None:
+            self.block.wait()
+        self.states.append((state.variable, state.valid_time, state.pressure))
+
+
+def pool():
+    return concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+
+def app_state(valid_time, pressure=None, dataset="UM"):
+    return {
+        "layers": {"index": {0: {"dataset": dataset,
+                                 "variable": "air_temperature"}}},
+        "initial_time": dt.datetime(2020, 1, 1),
+        "valid_time": valid_time,
+        "valid_times": [dt.datetime(2020, 1, 1, i) for i in range(6)],
+        "pressure": pressure,
+        "pressures": [1000., 850., 500.],
+    }
+
+
+def test_prefetch_neighbouring_valid_times_and_pressures():
+    loader = FakeLoader()
+    prefetcher = prefetch.Prefetcher({"UM": loader}, k=1, executor=pool())
+    prefetcher.render(app_state(dt.datetime(2020, 1, 1, 2), 850.))
+    prefetcher.executor.shutdown(wait=True)
+    assert sorted(loader.states) == sorted([
+        ("air_temperature", dt.datetime(2020, 1, 1, 3), 850.),
+        ("air_temperature", dt.datetime(2020, 1, 1, 1), 850.),
+        ("air_temperature", dt.datetime(2020, 1, 1, 2), 1000.),
+        ("air_temperature", dt.datetime(2020, 1, 1, 2), 500.),
+    ])
+
+
+def test_prefetch_ignores_unknown_datasets():
+    prefetcher = prefetch.Prefetcher({}, k=1)
+    state = app_state(dt.datetime(2020, 1, 1, 2), dataset="RDT")
+    assert prefetcher.targets(state) == {}
+
+
+def test_prefetch_cancels_pending_frames_after_jump():
+    block = threading.Event()
+    loader = FakeLoader(block=block)
+    prefetcher = prefetch.Prefetcher({"UM": loader}, k=2, executor=pool())
+    prefetcher.render(app_state(dt.datetime(2020, 1, 1, 0)))
+    before = set(prefetcher.futures)
+    prefetcher.render(app_state(dt.datetime(2020, 1, 1, 5)))
+    block.set()
+    prefetcher.executor.shutdown(wait=True)
+    valid_times = [valid_time for _, valid_time, _ in loader.states]
+    # First frame was already running, the rest were cancelled
+    assert dt.datetime(2020, 1, 1, 2) not in valid_times
+    assert dt.datetime(2020, 1, 1, 4) in valid_times
+    assert len(before) == 2
+
+
+def test_prefetch_same_frame_is_not_rescheduled():
+    loader = FakeLoader()
+    prefetcher = prefetch.Prefetcher({"UM": loader}, k=1, executor=pool())
+    state = app_state(dt.datetime(2020, 1, 1, 2))
+    prefetcher.render(state)
+    prefetcher.render(state)
+    prefetcher.executor.shutdown(wait=True)
+    assert len(loader.states) == 2
+
+
+def test_prefetchers_share_thread_pool():
+    assert prefetch.Prefetcher({}).executor is prefetch.Prefetcher({}).executor
+
+
+def test_prefetch_cancel_keeps_shared_pool_running():
+    block = threading.Event()
+    loader = FakeLoader(block=block)
+    executor = pool()
+    prefetcher = prefetch.Prefetcher({"UM": loader}, k=2, executor=executor)
+    prefetcher.render(app_state(dt.datetime(2020, 1, 1, 0)))
+    prefetcher.cancel()
+    block.set()
+    assert executor.submit(lambda: 42).result() == 42
+    executor.shutdown(wait=True)
+    assert len(loader.states) <= 1
@@ -0,0 +1,86 @@
+import datetime as dt
+import numpy as np
+import netCDF4
+from forest import pyramid
+from forest.drivers import unified_model
+import forest.cli.main
+
+
+def write_field(path, nx=40, ny=20):
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("time", 2)
+        dataset.createDimension("longitude", nx)
+        dataset.createDimension("latitude", ny)
+        var = dataset.createVariable("longitude", "f", ("longitude",))
+        var[:] = np.linspace(90, 130, nx)
+        var = dataset.createVariable("latitude", "f", ("latitude",))
+        var[:] = np.linspace(-10, 10, ny)
+        var = dataset.createVariable("time", "d", ("time",))
+        var.units = "hours since 1970-01-01 00:00:00"
+        var[:] = [0, 3]
+        var = dataset.createVariable(
+            "air_pressure", "f", ("time", "latitude", "longitude"))
+        var.units = "Pa"
+        var[:] = np.arange(2 * nx * ny).reshape(2, ny, nx)
+
+
+def test_downsample_ignores_nan():
+    image = np.array([[1, np.nan], [3, np.nan]])
+    np.testing.assert_array_equal(pyramid.downsample(image), [[2]])
+
+
+def test_downsample_given_odd_shape():
+    assert pyramid.downsample(np.ones((5, 3))).shape == (3, 2)
+
+
+def test_levels_halve_until_min_size():
+    result = pyramid.levels(np.zeros((10, 40)), min_size=10)
+    assert [image.shape for image in result] == [(10, 40), (5, 20), (3, 10)]
+
+
+def test_build_and_read(tmpdir):
+    path = str(tmpdir / "file.nc")
+    write_field(path)
+    count = pyramid.build([path], str(tmpdir), min_size=10)
+    assert count == 2
+    store = pyramid.Pyramid(str(tmpdir))
+    full = store.read(path, "air_pressure", (1,))
+    small = store.read(path, "air_pressure", (1,), pixels=15)
+    assert full["image"][0].shape[1] == 40
+    assert small["image"][0].shape[1] == 20
+    assert full["x"] == small["x"]
+    assert full["units"] == ["Pa"]
+
+
+def test_file_name_given_same_name_in_different_directories(tmpdir):
+    store = pyramid.Pyramid(str(tmpdir))
+    first = store.file_name("/data/run_00/file.nc")
+    second = store.file_name("/data/run_12/file.nc")
+    assert first != second
+    assert first == store.file_name("/data/run_00/../run_00/file.nc")
+
+
+def test_read_given_missing_frame_returns_none(tmpdir):
+    store = pyramid.Pyramid(str(tmpdir))
+    assert store.read("file.nc", "air_pressure", (0,)) is None
+
+
+def test_loader_falls_back_to_file(tmpdir):
+    path = str(tmpdir / "file.nc")
+    write_field(path)
+    store = pyramid.Pyramid(str(tmpdir / "empty"))
+    locator = unified_model.Locator([path])
+    loader = unified_model.Loader("label", path, locator, pyramid=store)
+    data = loader._read(path, "air_pressure", dt.datetime(1970, 1, 1),
+                        dt.datetime(1970, 1, 1, 3), None)
+    assert data["name"] == ["label"]
+    assert data["image"][0].shape[1] == 40
+
+
+def test_forest_pyramid_command(tmpdir):
+    path = str(tmpdir / "file.nc")
+    write_field(path)
+    output = str(tmpdir / "pyramids")
+    forest.cli.main.main(["pyramid", "--output", output, path])
+    store = pyramid.Pyramid(output)
+    assert store.read(path, "air_pressure", (0,)) is not None
@@ -1,8 +1,111 @@
+import concurrent.futures
 import datetime as dt
 import forest.components.time
+import forest.db.control
+import forest.prefetch
 
 
 def test_time_ui_render():
     time = dt.datetime(2020, 1, 1)
     ui = forest.components.time.TimeUI()
     ui.render(time, [time])
+
+
+class FakeLoader:
+    def __init__(self):
+        self.valid_times = []
+
+    def prefetch(self, state):
+        self.valid_times.append(state.valid_time)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+def playback_state(n=5):
+    times = [dt.datetime(2020, 1, 1, i) for i in range(n)]
+    return {
+        "layers": {"index": {0: {"dataset": "UM",
+                                 "variable": "air_temperature"}}},
+        "valid_time": times[0],
+        "valid_times": times,
+    }
+
+
+class Immediate:
+    """Executor that runs jobs on submit"""
+    def submit(self, func, *args):
+        future = concurrent.futures.Future()
+        future.set_result(func(*args))
+        return future
+
+
+def started_playback(loader, clock, monkeypatch):
+    playback = forest.components.time.Playback(
+        {"UM": loader}, fps=2, size=3, clock=clock)
+    playback.executor = Immediate()
+    monkeypatch.setattr(playback, "_schedule", lambda: None)
+    actions = []
+    playback.add_subscriber(actions.append)
+    playback.on_state(playback_state())
+    playback.play()
+    return playback, actions
+
+
+def test_playback_fills_buffer_ahead_of_playhead(monkeypatch):
+    loader = FakeLoader()
+    playback, _ = started_playback(loader, Clock(), monkeypatch)
+    assert sorted(loader.valid_times) == [
+        dt.datetime(2020, 1, 1, i) for i in (1, 2, 3)]
+    assert all(playback.buffer.ready(i) for i in (1, 2, 3))
+
+
+def test_playback_tick_advances_one_frame(monkeypatch):
+    clock = Clock()
+    playback, actions = started_playback(FakeLoader(), clock, monkeypatch)
+    clock.now = 0.5
+    playback.tick()
+    assert actions == [forest.db.control.set_value(
+        "valid_time", dt.datetime(2020, 1, 1, 1))]
+    assert playback.dropped == 0
+
+
+def test_playback_drops_frames_when_behind(monkeypatch):
+    clock = Clock()
+    playback, actions = started_playback(FakeLoader(), clock, monkeypatch)
+    clock.now = 1.5
+    playback.tick()
+    assert actions == [forest.db.control.set_value(
+        "valid_time", dt.datetime(2020, 1, 1, 3))]
+    assert playback.dropped == 2
+
+
+def test_playback_waits_for_unloaded_frames(monkeypatch):
+    clock = Clock()
+    playback, actions = started_playback(FakeLoader(), clock, monkeypatch)
+    playback.buffer.clear()
+    clock.now = 0.5
+    playback.tick()
+    assert actions == []
+
+
+def test_playback_achieved_fps():
+    playback = forest.components.time.Playback({})
+    playback.shown.extend([0., 0.5, 1.])
+    assert playback.achieved_fps() == 2.
+
+
+def test_time_ui_given_playback():
+    playback = forest.components.time.Playback({})
+    ui = forest.components.time.TimeUI(playback=playback)
+    assert playback.slider in ui.layout.children[1].children
+
+
+def test_playback_shares_prefetch_thread_pool():
+    playback = forest.components.time.Playback({})
+    assert playback.executor is forest.prefetch.thread_pool()
@@ -77,3 +77,36 @@ def test_parse_date(regex, fmt, path, expect):
 def test_replace(given, expect):
     result = util.replace(given, year=2021)
     assert result == expect
+
+
+def test_coarsify_keeps_float32_and_nan():
+    lons, lats = np.arange(4.), np.arange(4.)
+    values = np.ones((4, 4), dtype="f4")
+    values[0, 0] = np.nan
+    _, _, result = util.coarsify(lons, lats, values, 0.5)
+    assert result.dtype == np.float32
+    assert not np.ma.isMaskedArray(result)
+    assert np.isnan(result[0, 0])
+
+
+def test_coarsify_given_fraction_one_returns_input():
+    lons, lats = np.arange(2.), np.arange(2.)
+    values = np.zeros((2, 2), dtype="f4")
+    _, _, result = util.coarsify(lons, lats, values, 1)
+    assert result is values
+
+
+def test_roll_longitudes_in_place():
+    lons = np.array([0., 90., 180., 270.])
+    values = np.array([[0, 1, 2, 3], [4, 5, 6, 7]], dtype="f4")
+    util.roll_longitudes(lons, values)
+    np.testing.assert_array_equal(lons, [-90., 0., 90., 180.])
+    np.testing.assert_array_equal(values, [[3, 0, 1, 2], [7, 4, 5, 6]])
+
+
+def test_convert_units_inplace_float32():
+    values = np.array([273.15, np.nan], dtype="f4")
+    result = util.convert_units(values, "K", "Celsius", inplace=True)
+    assert result.dtype == np.float32
+    assert values[0] == pytest.approx(0, abs=1e-4)
+    assert np.isnan(values[1])